@@ -1,9 +1,16 @@
+import os
+import sys
+# The shared data-access package (spai_data) lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output
 from layouts.upload_page import create_upload_page
 from layouts.admin_dashboard import create_admin_dashboard
 from layouts.contact_messages import create_contact_messages_page
+from spai_data import register_health_routes
+from services.video_uploads import register_upload_routes, start_upload_sweeper
 
 # Initialize the Dash app
 app = dash.Dash(
@@ -12,6 +19,13 @@ app = dash.Dash(
     suppress_callback_exceptions=True
 )
 
+# Liveness and cached database readiness checks
+register_health_routes(app.server, "admin")
+
+# Chunk endpoints of resumable video uploads, and removal of abandoned ones
+register_upload_routes(app.server)
+start_upload_sweeper()
+
 # Define the navigation bar
 navbar = dbc.NavbarSimple(
     brand=html.Div([
@@ -0,0 +1,11 @@
+// assets/polling.js
+// Change polling of the admin tables only runs in visible tabs: a tick of a
+// dcc.Interval is passed on to the server only while the page is shown.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    admin: Object.assign({}, (window.dash_clientside || {}).admin, {
+        visible_tick: function (nIntervals) {
+            return document.hidden ? window.dash_clientside.no_update : nIntervals;
+        }
+    })
+});
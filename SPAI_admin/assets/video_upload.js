@@ -0,0 +1,182 @@
+// assets/video_upload.js
+// Chunked, resumable upload of match videos (see services/video_uploads.py).
+// The selected file is sliced into chunks that are hashed (SHA-256) and sent
+// a few at a time; the server keeps the verified ones. Only the chunks it does
+// not have yet are sent, so submitting the same file again after a disconnect
+// or a reload resumes the upload.
+
+(function () {
+    // Retries of a chunk before the upload is reported as interrupted
+    const CHUNK_RETRIES = 5;
+    // Rounds of (re)sending missing chunks, e.g. after one is found corrupted
+    const MAX_ROUNDS = 3;
+    const ASSEMBLY_POLL_MS = 2000;
+
+    const state = { file: null, upload: null, done: 0, phase: null, message: '' };
+
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+    const toHex = buffer => Array.from(new Uint8Array(buffer))
+        .map(byte => byte.toString(16).padStart(2, '0')).join('');
+
+    const fetchJson = async (url, options) => {
+        const response = await fetch(url, options);
+        const body = await response.json().catch(() => ({}));
+        return { status: response.status, ok: response.ok, body };
+    };
+
+    // Dash renders no file inputs, so add one to the placeholder when it shows up
+    const addPicker = () => {
+        const picker = document.getElementById('video-file-picker');
+        if (!picker || picker.querySelector('input')) {
+            return;
+        }
+        const input = document.createElement('input');
+        input.type = 'file';
+        input.accept = 'video/*';
+        input.className = 'form-control shadow-sm';
+        input.addEventListener('change', () => { state.file = input.files[0] || null; });
+        picker.appendChild(input);
+        state.file = null;
+    };
+    new MutationObserver(addPicker).observe(document.documentElement, { childList: true, subtree: true });
+    document.addEventListener('DOMContentLoaded', addPicker);
+
+    const sendChunk = async (upload, index) => {
+        const start = index * upload.chunk_size;
+        const data = await state.file.slice(start, Math.min(start + upload.chunk_size, upload.size)).arrayBuffer();
+        const checksum = toHex(await crypto.subtle.digest('SHA-256', data));
+
+        for (let attempt = 0; ; attempt++) {
+            try {
+                const response = await fetch(`/uploads/${upload.upload_id}/chunks/${index}`, {
+                    method: 'PUT',
+                    headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-Sha256': checksum },
+                    body: data
+                });
+                if (response.ok) {
+                    return;
+                }
+                if (response.status === 404 || response.status === 409) {
+                    throw new Error((await response.json()).error);
+                }
+            } catch (error) {
+                if (!(error instanceof TypeError) || attempt >= CHUNK_RETRIES) {
+                    throw error;
+                }
+            }
+            // Network error, verification failure or server error: back off and retry
+            if (attempt >= CHUNK_RETRIES) {
+                throw new Error(`chunk ${index} could not be stored`);
+            }
+            await sleep(1000 * 2 ** attempt);
+        }
+    };
+
+    const sendMissing = async (upload, status) => {
+        const received = new Set(status.received);
+        const missing = [];
+        for (let index = 0; index < upload.chunks; index++) {
+            if (!received.has(index)) {
+                missing.push(index);
+            }
+        }
+        state.done = upload.chunks - missing.length;
+        const worker = async () => {
+            while (missing.length) {
+                await sendChunk(upload, missing.shift());
+                state.done += 1;
+            }
+        };
+        await Promise.all(Array.from({ length: status.parallelism || 1 }, worker));
+    };
+
+    const run = async upload => {
+        for (let round = 0; round < MAX_ROUNDS; round++) {
+            let status = (await fetchJson(`/uploads/${upload.upload_id}`)).body;
+            if (status.state === 'uploading') {
+                state.phase = 'uploading';
+                await sendMissing(upload, status);
+                const completed = await fetchJson(`/uploads/${upload.upload_id}/complete`, { method: 'POST' });
+                if (!completed.ok) {
+                    continue;
+                }
+                status = completed.body;
+            }
+
+            state.phase = 'assembling';
+            while (status.state === 'assembling') {
+                await sleep(ASSEMBLY_POLL_MS);
+                status = (await fetchJson(`/uploads/${upload.upload_id}`)).body;
+            }
+            if (status.state === 'assembled') {
+                state.phase = 'done';
+                state.message = `Video verified and stored at ${status.video_path}; the game is queued for processing.`;
+                return;
+            }
+            if (status.state === 'failed') {
+                throw new Error(status.error);
+            }
+            // Back to uploading: a chunk was corrupted and has to be sent again
+        }
+        throw new Error('the video could not be assembled');
+    };
+
+    const start = upload => {
+        state.upload = upload;
+        state.done = upload.received.length;
+        if (!state.file || state.file.size !== upload.size) {
+            state.phase = 'error';
+            state.message = 'Select the video file again to resume its upload.';
+            return;
+        }
+        if (!window.crypto || !crypto.subtle) {
+            state.phase = 'error';
+            state.message = 'Video uploads need the admin site to be served over HTTPS.';
+            return;
+        }
+        state.phase = 'uploading';
+        state.message = '';
+        run(upload).catch(error => {
+            state.phase = 'error';
+            state.message = `Upload interrupted (${error.message}). Submit the same file again to resume.`;
+        });
+    };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        admin: Object.assign({}, (window.dash_clientside || {}).admin, {
+            video_file_info: function (nClicks) {
+                const file = state.file;
+                return {
+                    clicks: nClicks,
+                    file: file ? { name: file.name, size: file.size, last_modified: file.lastModified } : null
+                };
+            },
+
+            video_upload_progress: function (upload, nIntervals) {
+                const triggered = window.dash_clientside.callback_context.triggered.map(t => t.prop_id);
+                if (triggered.includes('video-upload-start.data') && upload) {
+                    start(upload);
+                }
+                const current = state.upload;
+                if (!current) {
+                    return window.dash_clientside.no_update;
+                }
+
+                const percent = Math.round(state.done / current.chunks * 100);
+                const sizeMb = Math.round(current.size / 1048576);
+                const messages = {
+                    uploading: `Uploading ${current.filename}: ${state.done}/${current.chunks} chunks of ${sizeMb} MB`,
+                    assembling: 'All chunks received; verifying and assembling the video…'
+                };
+                const finished = state.phase === 'done' || state.phase === 'error';
+                return [
+                    state.phase === 'done' ? 100 : percent,
+                    `${state.phase === 'done' ? 100 : percent}%`,
+                    messages[state.phase] || state.message,
+                    finished
+                ];
+            }
+        })
+    });
+})();
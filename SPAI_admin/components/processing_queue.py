@@ -0,0 +1,79 @@
+from dash import html
+import dash_bootstrap_components as dbc
+from components.processing_status import format_duration
+from config.queue import JOB_PRIORITIES, REQUEUE_STATES
+
+JOB_STATUS_COLORS = {"running": "warning", "queued": "primary", "dead": "danger"}
+
+def format_seconds(seconds):
+    return format_duration(seconds) if seconds is not None else "-"
+
+def format_timestamp(value):
+    return value.replace('T', ' ')[:16] if value else "-"
+
+def create_queue_metrics_table(metrics):
+    """Queue depth, throughput and latency per priority class"""
+    header = ["Priority", "Queued", "Running", "Dead", "Done (24h)", "Jobs/h",
+              "Wait avg / p95", "Latency avg / p95"]
+    return dbc.Table([
+        html.Thead(html.Tr([
+            html.Th(title, className="text-center text-dark") for title in header
+        ], style={"backgroundColor": "#f8f9fa"})),
+        html.Tbody([
+            html.Tr([
+                html.Td(JOB_PRIORITIES.get(row['priority'], row['priority']), className="text-center fw-bold"),
+                html.Td(row['queued'], className="text-center"),
+                html.Td(row['running'], className="text-center"),
+                html.Td(row['dead'], className="text-center"),
+                html.Td(row['succeeded_24h'], className="text-center"),
+                html.Td(row['jobs_per_hour'], className="text-center"),
+                html.Td(f"{format_seconds(row['avg_wait_seconds'])} / {format_seconds(row['p95_wait_seconds'])}",
+                        className="text-center"),
+                html.Td(f"{format_seconds(row['avg_latency_seconds'])} / {format_seconds(row['p95_latency_seconds'])}",
+                        className="text-center")
+            ]) for row in metrics
+        ])
+    ], bordered=True, size="sm", responsive=True, className="shadow-sm")
+
+def create_queue_table(jobs):
+    """Running, waiting and dead jobs; waiting and dead ones can be requeued"""
+    if not jobs:
+        return html.Div("The processing queue is empty", className="text-center text-muted mb-3")
+
+    return dbc.Table([
+        html.Thead(html.Tr([
+            html.Th(title, className="text-center text-dark")
+            for title in ("Game", "Priority", "Status", "Attempts", "Due / Lease", "Last Error", "")
+        ], style={"backgroundColor": "#f8f9fa"})),
+        html.Tbody([create_job_row(job) for job in jobs])
+    ], bordered=True, hover=True, responsive=True, className="shadow-sm")
+
+def create_job_row(job):
+    game = job.get('games') or {}
+    return html.Tr([
+        html.Td(
+            f"{game['home_team']} vs {game['away_team']}" if game else f"Game {job['game_id']}",
+            className="text-center align-middle fw-bold"
+        ),
+        html.Td(JOB_PRIORITIES.get(job['priority'], job['priority']), className="text-center align-middle"),
+        html.Td(
+            dbc.Badge(job['status'], color=JOB_STATUS_COLORS.get(job['status'], "secondary"), className="px-3 py-2"),
+            className="text-center align-middle"
+        ),
+        html.Td(f"{job['attempts']}/{job['max_attempts']}", className="text-center align-middle"),
+        html.Td(
+            format_timestamp(job['locked_until'] if job['status'] == 'running' else job['run_after']),
+            className="text-center align-middle"
+        ),
+        html.Td(job.get('last_error') or "-", className="align-middle small text-muted"),
+        html.Td(
+            dbc.Button(
+                "Requeue",
+                id={"type": "requeue-job", "index": job['id']},
+                size="sm",
+                color="secondary",
+                outline=True
+            ) if job['status'] in REQUEUE_STATES else None,
+            className="text-center align-middle"
+        )
+    ])
@@ -1,11 +1,23 @@
 from dash import html
 import dash_bootstrap_components as dbc
+from datetime import datetime, timezone
 
-def create_processing_status(status, progress, logs):
+# A running job whose progress has not been updated for this long is stalled
+STALL_SECONDS = 120
+
+# Stages after which a job no longer reports progress
+FINAL_STAGES = ('done', 'error')
+
+def create_processing_status(status, progress, logs, title="Processing Status", details=None, color="primary"):
+    running = status not in FINAL_STAGES
     return dbc.Card(
         dbc.CardBody([
-            html.H4("Processing Status"),
-            dbc.Progress(value=progress, striped=True, animated=True),
+            html.Div([
+                html.H4(title, className="mb-0"),
+                dbc.Badge(status, color=color, className="px-3 py-2")
+            ], className="d-flex justify-content-between align-items-center mb-2"),
+            dbc.Progress(value=progress, striped=running, animated=running, color=color),
+            html.Small(details, className="text-muted d-block mt-2") if details else None,
             html.Pre(
                 logs,
                 style={
@@ -16,5 +28,46 @@ def create_processing_status(status, progress, logs):
                     'marginTop': '10px'
                 }
             )
-        ])
-    )
\ No newline at end of file
+        ]),
+        className="mb-3 shadow-sm"
+    )
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {seconds:02d}s"
+
+def create_job_status(job, now=None):
+    """Processing status card of one row of processing_progress"""
+    now = now or datetime.now(timezone.utc)
+    updated_at = datetime.fromisoformat(job['updated_at'].replace('Z', '+00:00'))
+    idle = (now - updated_at).total_seconds()
+
+    stage = job['stage']
+    if stage not in FINAL_STAGES and idle > STALL_SECONDS:
+        status, color = f"stalled ({stage})", "danger"
+    else:
+        status = stage
+        color = {"done": "success", "error": "danger"}.get(stage, "primary")
+
+    total = job.get('total_frames') or 0
+    progress = 100 if stage == 'done' else min(100, job['frames_processed'] / total * 100) if total else 0
+
+    details = [f"{job['frames_processed']:,}/{total:,} frames" if total else f"{job['frames_processed']:,} frames"]
+    if job.get('frames_per_second'):
+        details.append(f"{job['frames_per_second']:.1f} frames/s")
+    if job.get('eta_seconds') is not None and stage not in FINAL_STAGES:
+        details.append(f"ETA {format_duration(job['eta_seconds'])}")
+    details.append(f"updated {format_duration(idle)} ago")
+
+    game = job.get('games') or {}
+    title = f"{game['home_team']} vs {game['away_team']}" if game else f"Game {job['game_id']}"
+
+    return create_processing_status(
+        status,
+        progress,
+        "\n".join(job.get('log_lines') or []),
+        title=title,
+        details=" • ".join(details),
+        color=color
+    )
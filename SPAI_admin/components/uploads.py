@@ -0,0 +1,34 @@
+from dash import html
+import dash_bootstrap_components as dbc
+
+def format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M')
+
+def create_uploads_table(entries):
+    """Games waiting for their video upload, with its progress and expiry"""
+    return dbc.Table([
+        html.Thead(html.Tr([
+            html.Th(title, className="text-center text-dark")
+            for title in ("Game", "Match Date", "Received", "Last Activity", "Expires")
+        ], style={"backgroundColor": "#f8f9fa"})),
+        html.Tbody([create_upload_row(entry) for entry in entries])
+    ], bordered=True, hover=True, responsive=True, className="shadow-sm")
+
+def create_upload_row(entry):
+    game, upload = entry['game'], entry['upload']
+    if upload is None:
+        received = "No upload data"
+    elif upload['state'] != 'uploading':
+        received = upload['state']
+    else:
+        received = f"{entry['received']}/{upload['chunks']} chunks"
+    return html.Tr([
+        html.Td(f"{game['home_team']} vs {game['away_team']}", className="text-center align-middle fw-bold"),
+        html.Td(
+            game['match_date'].split('T')[0] if game['match_date'] else "-",
+            className="text-center align-middle"
+        ),
+        html.Td(received, className="text-center align-middle"),
+        html.Td(format_time(entry['last_activity']), className="text-center align-middle"),
+        html.Td(format_time(entry['expires_at']), className="text-center align-middle")
+    ])
@@ -0,0 +1,18 @@
+import os
+
+# Interval between change polls of an open, visible admin tab. Polls only
+# fetch rows changed since the last one seen, so idle tabs cost one small
+# indexed query each.
+POLL_INTERVAL_MS = int(os.getenv("SPAI_ADMIN_POLL_SECONDS", "15")) * 1000
+
+# Faster polling of the processing progress while a job is running
+PROGRESS_INTERVAL_MS = int(os.getenv("SPAI_PROGRESS_POLL_SECONDS", "5")) * 1000
+
+# Refresh of the processing queue metrics, which also change without any game
+# changing (e.g. jobs leaving the 24 hour window)
+QUEUE_INTERVAL_MS = int(os.getenv("SPAI_QUEUE_POLL_SECONDS", "60")) * 1000
+
+# Change polls look this far back before the newest change seen. Timestamps
+# come from now() at transaction start, so a transaction that commits after a
+# poll can carry an older timestamp than the rows that poll returned.
+CHANGE_OVERLAP_SECONDS = int(os.getenv("SPAI_CHANGE_OVERLAP_SECONDS", "60"))
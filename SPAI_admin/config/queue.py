@@ -0,0 +1,12 @@
+# Priority classes of the processing queue; lower values are claimed first
+JOB_PRIORITIES = {
+    0: "High",
+    1: "Normal",
+    2: "Backlog",
+}
+
+DEFAULT_PRIORITY = 1
+
+# Queue states shown on the dashboard, and the ones an admin can requeue
+QUEUE_STATES = ('running', 'queued', 'dead')
+REQUEUE_STATES = ('queued', 'dead')
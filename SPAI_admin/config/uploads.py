@@ -0,0 +1,21 @@
+import os
+import tempfile
+from datetime import timedelta
+
+# Chunks of resumable video uploads are kept here until the file is assembled
+UPLOAD_DIR = os.getenv("SPAI_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "spai_uploads"))
+
+# Assembled videos are stored here; the processing worker must be able to read
+# this directory, under the path given by SPAI_WORKER_VIDEO_DIR when it mounts
+# it elsewhere (e.g. a synced drive)
+VIDEO_DIR = os.getenv("SPAI_VIDEO_DIR", os.path.join(tempfile.gettempdir(), "spai_videos"))
+WORKER_VIDEO_DIR = os.getenv("SPAI_WORKER_VIDEO_DIR", VIDEO_DIR)
+
+# Size of an upload chunk, and how many chunks a browser sends at once
+CHUNK_SIZE = int(os.getenv("SPAI_UPLOAD_CHUNK_MB", "8")) * 1024 * 1024
+UPLOAD_PARALLELISM = int(os.getenv("SPAI_UPLOAD_PARALLELISM", "4"))
+
+# Unfinished uploads idle for this long are abandoned: their chunks and their
+# `uploading` game are removed. The admin server looks for them every hour.
+UPLOAD_EXPIRY = timedelta(hours=int(os.getenv("SPAI_UPLOAD_EXPIRY_HOURS", "48")))
+UPLOAD_SWEEP_INTERVAL = 3600
@@ -1,20 +1,49 @@
-from dash import html, dcc, Input, Output, callback
+import dash
+from dash import html, dcc, Input, Output, State, ALL, callback, clientside_callback, ClientsideFunction, ctx
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from config.supabase_client import supabase
+import math
+from datetime import datetime, timedelta, timezone
+from spai_data import GameRepository, ProgressRepository, JobRepository, is_missing_schema_error
+from config.polling import POLL_INTERVAL_MS, PROGRESS_INTERVAL_MS, QUEUE_INTERVAL_MS
+from config.queue import JOB_PRIORITIES, QUEUE_STATES
+from components.processing_status import create_job_status, FINAL_STAGES
+from components.processing_queue import create_queue_metrics_table, create_queue_table
+from components.uploads import create_uploads_table
+from services.change_cursors import new_cursor, advance_cursor, window_start
+from services.video_uploads import uploading_games
 import logging
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def create_admin_dashboard():
-    # Fetch stats from Supabase
-    response = supabase.table('games').select("*").execute()
-    games = response.data if response.data else []
+# Games per page of the games table
+GAMES_PAGE_SIZE = 25
+
+# Changed games patched in place per poll; more than that reloads the page
+MAX_PATCHED_CHANGES = 100
+
+# Finished jobs stay on the dashboard for this long
+RECENT_JOBS_WINDOW = timedelta(hours=1)
 
-    total_games = len(games)
-    pending_games = len([game for game in games if game['status'] == 'pending'])
-    processed_games = len([game for game in games if game['status'] == 'processed'])
+GAME_TABLE_COLUMNS = ['id', 'competition', 'home_team', 'away_team', 'match_date', 'status']
+
+def fetch_status_counts():
+    """Return (total, pending, processed) game counts, computed by the database"""
+    try:
+        counts = GameRepository.status_counts()
+        total = sum(counts.values())
+    except Exception as e:
+        if not is_missing_schema_error(e):
+            raise
+        # Counter table not migrated yet: let the database count each status
+        logger.warning(f"Game status counters unavailable, counting games: {str(e)}")
+        counts = {status: GameRepository.count(status) for status in ('pending', 'processed')}
+        total = GameRepository.count()
+    return total, counts.get('pending', 0), counts.get('processed', 0)
 
+def create_admin_dashboard():
+    # Counts and the first page of games are filled in by update_games_table
     return html.Div([
         dbc.Container([
             html.H1("SPAI Admin Dashboard", className="text-center my-4"),
@@ -25,7 +54,7 @@ def create_admin_dashboard():
                     dbc.Card([
                         dbc.CardBody([
                             html.H4("Total Games"),
-                            html.H2(total_games, className="text-primary"),
+                            html.H2("-", id="total-games-count", className="text-primary"),
                         ])
                     ], className="mb-4 shadow-sm")
                 ], md=4),
@@ -33,7 +62,7 @@ def create_admin_dashboard():
                     dbc.Card([
                         dbc.CardBody([
                             html.H4("Pending Games"),
-                            html.H2(pending_games, className="text-warning"),
+                            html.H2("-", id="pending-games-count", className="text-warning"),
                         ])
                     ], className="mb-4 shadow-sm")
                 ], md=4),
@@ -41,12 +70,37 @@ def create_admin_dashboard():
                     dbc.Card([
                         dbc.CardBody([
                             html.H4("Processed Games"),
-                            html.H2(processed_games, className="text-success"),
+                            html.H2("-", id="processed-games-count", className="text-success"),
                         ])
                     ], className="mb-4 shadow-sm")
                 ], md=4),
             ]),
             
+            # Live progress of the games being processed
+            html.Div(id="processing-jobs"),
+            dcc.Interval(id='progress-refresh', interval=PROGRESS_INTERVAL_MS, disabled=True),
+            dcc.Store(id='progress-poll'),
+
+            # Processing queue: metrics per priority class, and the jobs an admin can requeue
+            dbc.Row([
+                dbc.Col(html.H3("Processing Queue", className="mb-0"), md=8),
+                dbc.Col(dbc.Select(
+                    id="requeue-priority",
+                    options=[{"label": "Requeue with the same priority", "value": ""}] + [
+                        {"label": f"Requeue as {label}", "value": priority}
+                        for priority, label in JOB_PRIORITIES.items()
+                    ],
+                    value=""
+                ), md=4)
+            ], className="align-items-center mb-3"),
+            html.Div(id="queue-metrics"),
+            html.Div(id="queue-jobs", className="mb-4"),
+            dcc.Interval(id='queue-refresh', interval=QUEUE_INTERVAL_MS),
+            dcc.Store(id='queue-poll'),
+
+            # Games whose video is still being uploaded, or was abandoned
+            html.Div(id="video-uploads", className="mb-4"),
+
             # Games tables container
             dbc.Row([
                 dbc.Col([
@@ -55,30 +109,189 @@ def create_admin_dashboard():
                         "Refresh"
                     ], id="refresh-button", color="primary", className="mb-3"),
                     html.Div(id="games-table", className="mt-3"),
-                    dcc.Interval(id='auto-refresh', interval=30000)  # 30 seconds
+                    dbc.Pagination(
+                        id="games-pagination",
+                        active_page=1,
+                        max_value=1,
+                        fully_expanded=False,
+                        previous_next=True,
+                        className="justify-content-center"
+                    ),
+                    # Polls for changed games while the tab is visible
+                    dcc.Interval(id='auto-refresh', interval=POLL_INTERVAL_MS),
+                    dcc.Store(id='games-poll'),
+                    dcc.Store(id='games-cursor')
                 ])
             ])
         ])
     ])
 
+# Forward interval ticks only while the tab is visible (assets/polling.js)
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='visible_tick'),
+    Output("games-poll", "data"),
+    Input("auto-refresh", "n_intervals"),
+    prevent_initial_call=True
+)
+
 @callback(
-    Output("games-table", "children"),
+    [Output("games-table", "children"),
+     Output("games-pagination", "max_value"),
+     Output("total-games-count", "children"),
+     Output("pending-games-count", "children"),
+     Output("processed-games-count", "children"),
+     Output("games-cursor", "data"),
+     Output({"type": "game-row", "index": ALL}, "children")],
     [Input("refresh-button", "n_clicks"),
-     Input("auto-refresh", "n_intervals")]
+     Input("games-poll", "data"),
+     Input("games-pagination", "active_page")],
+    [State("games-cursor", "data")]
 )
-def update_games_table(n_clicks, n_intervals):
+def update_games_table(n_clicks, poll, active_page, cursor):
+    rows = ctx.outputs_list[-1]
+    unchanged_rows = [dash.no_update] * len(rows)
+
     try:
-        response = supabase.table('games').select("*").order('match_date', desc=True).execute()
-        games = response.data
+        if ctx.triggered_id == "games-poll" and cursor:
+            recent = GameRepository.changed_since(
+                GAME_TABLE_COLUMNS + ['updated_at'], window_start(cursor), limit=MAX_PATCHED_CHANGES
+            )
+            changes, cursor = advance_cursor(cursor, recent)
+            if not changes and len(recent) < MAX_PATCHED_CHANGES:
+                raise PreventUpdate
+
+            # Games shown on this page are patched in place; anything else
+            # (new games, other pages, more changes than one poll returns)
+            # reloads the page below
+            shown = [row['id']['index'] for row in rows]
+            changed = {game['id']: game for game in changes}
+            if len(recent) < MAX_PATCHED_CHANGES and set(changed) <= set(shown):
+                return (
+                    dash.no_update, dash.no_update, *fetch_status_counts(),
+                    cursor,
+                    [create_game_row_cells(changed[game_id]) if game_id in changed else dash.no_update
+                     for game_id in shown]
+                )
+
+        # The cursor is read first: a game changing while the page loads is
+        # then reported by the next poll instead of being missed
+        try:
+            cursor = new_cursor(GameRepository.latest_changes())
+        except Exception as e:
+            # No updated_at column yet: every poll reloads the page
+            logger.warning(f"Game change cursor unavailable: {str(e)}")
+            cursor = None
+
+        # Only the visible page of games is fetched, latest match first
+        games, total = GameRepository.list_page(
+            GAME_TABLE_COLUMNS, (active_page or 1) - 1, GAMES_PAGE_SIZE
+        )
+        total_games, pending_games, processed_games = fetch_status_counts()
+        page_count = max(1, math.ceil(total / GAMES_PAGE_SIZE))
 
         if not games:
-            return html.Div("No games found", className="text-center text-muted")
-        
-        return create_all_games_table(games)
+            table = html.Div("No games found", className="text-center text-muted")
+        else:
+            table = create_all_games_table(games)
+        return table, page_count, total_games, pending_games, processed_games, cursor, unchanged_rows
 
+    except PreventUpdate:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch games: {str(e)}")
-        return html.Div(f"Error loading games: {str(e)}", className="text-danger text-center")
+        error = html.Div(f"Error loading games: {str(e)}", className="text-danger text-center")
+        return (error, dash.no_update, dash.no_update, dash.no_update, dash.no_update,
+                dash.no_update, unchanged_rows)
+
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='visible_tick'),
+    Output("progress-poll", "data"),
+    Input("progress-refresh", "n_intervals"),
+    prevent_initial_call=True
+)
+
+@callback(
+    [Output("processing-jobs", "children"),
+     Output("progress-refresh", "disabled")],
+    [Input("games-cursor", "data"),
+     Input("progress-poll", "data")]
+)
+def update_processing_jobs(games_cursor, progress_poll):
+    """Show recent processing jobs; poll faster while one of them is running.
+
+    Idle games polls leave the games cursor untouched, so progress is only
+    queried when games changed (a job was claimed or finished) or while a
+    job is known to be running.
+    """
+    since = datetime.now(timezone.utc) - RECENT_JOBS_WINDOW
+    try:
+        jobs = ProgressRepository.recent(since.isoformat())
+    except Exception as e:
+        logger.warning(f"Processing progress unavailable: {str(e)}")
+        return None, True
+
+    if not jobs:
+        return None, True
+
+    running = any(job['stage'] not in FINAL_STAGES for job in jobs)
+    return [
+        html.H3("Processing", className="mb-3"),
+        *[create_job_status(job) for job in jobs]
+    ], not running
+
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='visible_tick'),
+    Output("queue-poll", "data"),
+    Input("queue-refresh", "n_intervals"),
+    prevent_initial_call=True
+)
+
+@callback(
+    [Output("queue-metrics", "children"),
+     Output("queue-jobs", "children")],
+    [Input("refresh-button", "n_clicks"),
+     Input("games-cursor", "data"),
+     Input("queue-poll", "data"),
+     Input({"type": "requeue-job", "index": ALL}, "n_clicks")],
+    [State("requeue-priority", "value")]
+)
+def update_processing_queue(n_clicks, games_cursor, poll, requeue_clicks, priority):
+    """Show the queue when games changed (jobs are claimed, retried or finish
+    along with their game) and on the slower queue interval"""
+    if isinstance(ctx.triggered_id, dict):
+        # Re-rendered buttons trigger the callback without a click
+        if not ctx.triggered[0]['value']:
+            raise PreventUpdate
+        try:
+            JobRepository.requeue(ctx.triggered_id['index'], int(priority) if priority else None)
+        except Exception as e:
+            logger.error(f"Failed to requeue job {ctx.triggered_id['index']}: {str(e)}")
+            return dash.no_update, dbc.Alert(f"Error requeuing job: {str(e)}", color="danger")
+
+    try:
+        metrics = JobRepository.metrics()
+        jobs = JobRepository.list_jobs(QUEUE_STATES)
+    except Exception as e:
+        logger.warning(f"Processing queue unavailable: {str(e)}")
+        return None, html.Div("Processing queue unavailable", className="text-center text-muted mb-3")
+    return create_queue_metrics_table(metrics) if metrics else None, create_queue_table(jobs)
+
+@callback(
+    Output("video-uploads", "children"),
+    [Input("refresh-button", "n_clicks"),
+     Input("games-cursor", "data"),
+     Input("queue-poll", "data")]
+)
+def update_video_uploads(n_clicks, games_cursor, poll):
+    """List the games still `uploading`; the queue interval refreshes their progress"""
+    try:
+        entries = uploading_games()
+    except Exception as e:
+        logger.warning(f"Video uploads unavailable: {str(e)}")
+        return None
+    if not entries:
+        return None
+    return [html.H3("Video Uploads", className="mb-3"), create_uploads_table(entries)]
 
 def create_all_games_table(games):
     """Create a standard table with all games"""
@@ -92,28 +305,37 @@ def create_all_games_table(games):
             ], style={"backgroundColor": "#f8f9fa"})
         ]),
         html.Tbody([
-            html.Tr([
-                html.Td(
-                    game['competition'] or "-",
-                    className="text-center align-middle"
-                ),
-                html.Td(
-                    f"{game['home_team']} vs {game['away_team']}", 
-                    className="text-center align-middle fw-bold"
-                ),
-                html.Td(
-                    game['match_date'].split('T')[0] if game['match_date'] else "-", 
-                    className="text-center align-middle"
-                ),
-                html.Td([
-                    dbc.Badge(
-                        game['status'],
-                        color="success" if game['status'] == "processed"
-                        else "warning" if game['status'] == "processing" 
-                        else "primary",
-                        className="px-3 py-2"
-                    )
-                ], className="text-center align-middle")
-            ], className="align-middle") for game in games
+            html.Tr(
+                create_game_row_cells(game),
+                id={"type": "game-row", "index": game['id']},
+                className="align-middle"
+            ) for game in games
         ])
-    ], bordered=True, hover=True, responsive=True, className="shadow-sm")
\ No newline at end of file
+    ], bordered=True, hover=True, responsive=True, className="shadow-sm")
+
+def create_game_row_cells(game):
+    """Cells of one games table row; also used to patch a changed game in place"""
+    return [
+        html.Td(
+            game['competition'] or "-",
+            className="text-center align-middle"
+        ),
+        html.Td(
+            f"{game['home_team']} vs {game['away_team']}", 
+            className="text-center align-middle fw-bold"
+        ),
+        html.Td(
+            game['match_date'].split('T')[0] if game['match_date'] else "-", 
+            className="text-center align-middle"
+        ),
+        html.Td([
+            dbc.Badge(
+                game['status'],
+                color="success" if game['status'] == "processed"
+                else "warning" if game['status'] == "processing" 
+                else "danger" if game['status'] == "error"
+                else "primary",
+                className="px-3 py-2"
+            )
+        ], className="text-center align-middle")
+    ]
@@ -1,6 +1,10 @@
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, ctx, Input, Output, State
+from dash.exceptions import PreventUpdate
+import dash
 import dash_bootstrap_components as dbc
-from config.supabase_client import supabase
+from spai_data import ContactRepository
+from config.polling import POLL_INTERVAL_MS
+from services.change_cursors import new_cursor, advance_cursor, window_start
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,71 +19,112 @@ def create_contact_messages_page():
                         html.I(className="fas fa-sync-alt me-2"),
                         "Refresh"
                     ], id="refresh-messages", color="primary", className="mb-3"),
-                    html.Div(id="messages-table", className="mt-3"),
-                    dcc.Interval(id='message-refresh', interval=30000)  # 30 seconds refresh
+                    html.Div(id="messages-error"),
+                    dbc.Table([
+                        html.Thead([
+                            html.Tr([
+                                html.Th("Date", className="text-center"),
+                                html.Th("Name", className="text-center"),
+                                html.Th("Subject", className="text-center"),
+                                html.Th("Email", className="text-center"),
+                                html.Th("Message", className="text-center"),
+                                html.Th("Status", className="text-center")
+                            ], style={"backgroundColor": "#f8f9fa"})
+                        ]),
+                        # Messages received since the page was loaded, newest first
+                        html.Tbody(id="messages-new-rows"),
+                        html.Tbody(id="messages-rows")
+                    ], bordered=True, hover=True, responsive=True, className="shadow-sm mt-3"),
+                    # Polls for new messages while the tab is visible
+                    dcc.Interval(id='message-refresh', interval=POLL_INTERVAL_MS),
+                    dcc.Store(id='messages-poll'),
+                    dcc.Store(id='messages-cursor')
                 ])
             ])
         ])
     ])
 
+def create_message_row(message):
+    return html.Tr([
+        html.Td(
+            message['created_at'].split('T')[0], 
+            className="text-center align-middle"
+        ),
+        html.Td(
+            message['name'],
+            className="text-center align-middle"
+        ),
+        html.Td(
+            message['subject'],
+            className="text-center align-middle"
+        ),
+        html.Td(
+            message['email'],
+            className="text-center align-middle"
+        ),
+        html.Td(
+            message['message'],
+            className="text-center align-middle"
+        ),
+        html.Td([
+            dbc.Badge(
+                message['status'],
+                color="primary" if message['status'] == "new" else "success",
+                className="px-3 py-2"
+            )
+        ], className="text-center align-middle")
+    ])
+
+# Forward interval ticks only while the tab is visible (assets/polling.js)
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='visible_tick'),
+    Output("messages-poll", "data"),
+    Input("message-refresh", "n_intervals"),
+    prevent_initial_call=True
+)
+
 @callback(
-    Output("messages-table", "children"),
+    [Output("messages-rows", "children"),
+     Output("messages-new-rows", "children"),
+     Output("messages-cursor", "data"),
+     Output("messages-error", "children")],
     [Input("refresh-messages", "n_clicks"),
-     Input("message-refresh", "n_intervals")]
+     Input("messages-poll", "data")],
+    [State("messages-cursor", "data"),
+     State("messages-new-rows", "children")]
 )
-def update_messages_table(n_clicks, n_intervals):
+def update_messages_table(n_clicks, poll, cursor, new_rows):
     try:
+        if ctx.triggered_id == "messages-poll" and cursor:
+            # Only messages received around or after the newest one seen are
+            # fetched, and those already shown are dropped
+            messages, cursor = advance_cursor(
+                cursor, ContactRepository.list_messages(since=window_start(cursor)), 'created_at'
+            )
+            if not messages:
+                raise PreventUpdate
+            return (
+                dash.no_update,
+                [create_message_row(message) for message in messages] + (new_rows or []),
+                cursor,
+                None
+            )
+
         # Fetch messages from Supabase
-        response = supabase.table('contact_submissions').select("*").order('created_at', desc=True).execute()
-        messages = response.data
+        messages = ContactRepository.list_messages()
+        # Without messages the cursor starts at the current time, so polls
+        # still only ask for new ones
+        cursor = new_cursor(messages, 'created_at')
 
         if not messages:
-            return html.Div("No messages found", className="text-center text-muted")
+            empty = html.Tr(html.Td("No messages found", colSpan=6, className="text-center text-muted"))
+            return [empty], [], cursor, None
 
-        return dbc.Table([
-            html.Thead([
-                html.Tr([
-                    html.Th("Date", className="text-center"),
-                    html.Th("Name", className="text-center"),
-                    html.Th("Subject", className="text-center"),
-                    html.Th("Email", className="text-center"),
-                    html.Th("Message", className="text-center"),
-                    html.Th("Status", className="text-center")
-                ], style={"backgroundColor": "#f8f9fa"})
-            ]),
-            html.Tbody([
-                html.Tr([
-                    html.Td(
-                        message['created_at'].split('T')[0], 
-                        className="text-center align-middle"
-                    ),
-                    html.Td(
-                        message['name'],
-                        className="text-center align-middle"
-                    ),
-                    html.Td(
-                        message['subject'],
-                        className="text-center align-middle"
-                    ),
-                    html.Td(
-                        message['email'],
-                        className="text-center align-middle"
-                    ),
-                    html.Td(
-                        message['message'],
-                        className="text-center align-middle"
-                    ),
-                    html.Td([
-                        dbc.Badge(
-                            message['status'],
-                            color="primary" if message['status'] == "new" else "success",
-                            className="px-3 py-2"
-                        )
-                    ], className="text-center align-middle")
-                ]) for message in messages
-            ])
-        ], bordered=True, hover=True, responsive=True, className="shadow-sm")
+        return [create_message_row(message) for message in messages], [], cursor, None
 
+    except PreventUpdate:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch messages: {str(e)}")
-        return html.Div(f"Error loading messages: {str(e)}", className="text-danger")
\ No newline at end of file
+        error = html.Div(f"Error loading messages: {str(e)}", className="text-danger")
+        return dash.no_update, dash.no_update, dash.no_update, error
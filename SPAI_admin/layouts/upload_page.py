@@ -1,13 +1,15 @@
-from dash import html, dcc, Input, Output, State, callback
+import dash
+from dash import html, dcc, Input, Output, State, callback, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
 from datetime import datetime
-from config.supabase_client import supabase
+from spai_data import GameRepository, JobRepository, is_missing_schema_error
+from services.thumbnails import check_image, submit_thumbnail
+from services.video_thumbnails import submit_video_thumbnail
+from services.video_uploads import find_upload, create_upload, upload_status
 from config.teams import LALIGA_TEAMS, UCL_TEAMS
+from config.queue import JOB_PRIORITIES, DEFAULT_PRIORITY
 import logging
 import base64
-import io
-from PIL import Image
-from supabase.lib.client_options import ClientOptions
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -62,10 +64,22 @@ def create_upload_page():
                                 )
                             ], width=6),
                         ]),
-                        # Video Path
+                        # Video: uploaded in resumable chunks, or a path the worker can read
                         dbc.Row([
                             dbc.Col([
-                                dbc.Label("Video Path"),
+                                dbc.Label("Video File"),
+                                # The file input is added by assets/video_upload.js
+                                html.Div(id="video-file-picker", className="mb-2"),
+                                dbc.Progress(id="video-upload-progress", value=0, className="mb-1"),
+                                html.Small(id="video-upload-status", className="text-muted d-block mb-3"),
+                                dcc.Interval(id="video-upload-tick", interval=1000, disabled=True),
+                                dcc.Store(id="video-file-info"),
+                                dcc.Store(id="video-upload-start")
+                            ], width=12),
+                        ]),
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Label("Or Video Path (already on the processing machine)"),
                                 dbc.Input(
                                     id="video-path",
                                     type="text",
@@ -85,10 +99,23 @@ def create_upload_page():
                                     className="mb-3 shadow-sm"
                                 ),
                             ], width=6),
+                            # Processing priority, e.g. today's big match ahead of the backlog
+                            dbc.Col([
+                                dbc.Label("Processing Priority"),
+                                dbc.Select(
+                                    id="priority-select",
+                                    options=[
+                                        {"label": label, "value": priority}
+                                        for priority, label in JOB_PRIORITIES.items()
+                                    ],
+                                    value=DEFAULT_PRIORITY,
+                                    className="mb-3 shadow-sm"
+                                )
+                            ], width=6),
                         ]),
                         dbc.Row([
                             dbc.Col([
-                                dbc.Label("Thumbnail Image (Optional)"),
+                                dbc.Label("Thumbnail Image (Optional, taken from the video otherwise)"),
                                 dcc.Upload(
                                     id="thumbnail-upload",
                                     children=html.Div([
@@ -146,118 +173,149 @@ def update_team_options(competition):
     team_options = [{"label": team, "value": team} for team in sorted(teams)]
     return team_options, team_options
 
+# Collect the selected video file on submit (assets/video_upload.js)
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='video_file_info'),
+    Output("video-file-info", "data"),
+    Input("submit-button", "n_clicks"),
+    prevent_initial_call=True
+)
+
+def upload_alert(message, color):
+    return dbc.Alert(message, color=color, dismissable=True, is_open=True)
+
 @callback(
-    Output("submit-result", "children"),
-    [Input("submit-button", "n_clicks")],
+    [Output("submit-result", "children"),
+     Output("video-upload-start", "data")],
+    [Input("video-file-info", "data")],
     [
         State("competition-select", "value"),
         State("home-team-input", "value"),
         State("away-team-input", "value"),
         State("game-date", "date"),
         State("video-path", "value"),  # Added video path input
+        State("priority-select", "value"),
         State("thumbnail-upload", "contents"),
         State("thumbnail-upload", "filename")
     ]
 )
-def handle_upload(n_clicks, competition, home_team, away_team, match_date, 
-                 video_path, thumbnail_contents, thumbnail_filename):
-    if n_clicks is None or n_clicks == 0:
-        return ""
+def handle_upload(submitted, competition, home_team, away_team, match_date,
+                 video_path, priority, thumbnail_contents, thumbnail_filename):
+    if not submitted:
+        return "", dash.no_update
+    video_file = submitted.get('file')
+    priority = int(priority or DEFAULT_PRIORITY)
 
     # Validate required fields
-    if not all([competition, home_team, away_team, match_date, video_path]):
-        return dbc.Alert(
-            "Please fill all required fields.",
-            color="danger",
-            dismissable=True,
-            is_open=True
-        )
+    if not all([competition, home_team, away_team, match_date]) or not (video_file or video_path):
+        return upload_alert("Please fill all required fields.", "danger"), dash.no_update
 
-    # Process thumbnail if provided
-    thumbnail_url = None
+    # The same file selected again for the same game resumes its interrupted
+    # upload, or starts a failed one over, in the game created the first time
+    game_fields = {
+        "competition": competition,
+        "home_team": home_team,
+        "away_team": away_team,
+        "match_date": match_date
+    }
+    manifest = None
+    if video_file:
+        try:
+            manifest = find_upload(video_file, game_fields)
+        except Exception as e:
+            logger.error(f"Upload lookup error: {str(e)}")
+        if manifest and manifest['state'] != 'failed':
+            logger.info(f"Resuming upload {manifest['upload_id']} for game {manifest['game_id']}")
+            return upload_alert(
+                "Resuming the interrupted upload of this video.", "info"
+            ), upload_status(manifest)
+
+    # Check the thumbnail if provided; its variants are made after the insert
+    thumbnail_data = None
     if thumbnail_contents:
         try:
-            bucket_name = 'game-thumbnails'
-            
             # Decode base64 image
             content_type, content_string = thumbnail_contents.split(',')
-            decoded = base64.b64decode(content_string)
-            
-            # Generate simple file path
-            file_path = f"{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
-            
-            try:
-                logger.info(f"Attempting to upload file to bucket: {bucket_name}")
-                # Direct upload without bucket check
-                response = supabase.storage.from_(bucket_name).upload(
-                    path=file_path,
-                    file=decoded,
-                    file_options={"content-type": "image/jpeg"}
-                )
-                
-                if response:
-                    thumbnail_url = supabase.storage.from_(bucket_name).get_public_url(file_path)
-                    logger.info(f"Upload successful. URL: {thumbnail_url}")
-                else:
-                    logger.error("Upload response was empty")
-                    raise Exception("Upload failed - no response from server")
-                
-            except Exception as upload_error:
-                logger.error(f"Storage upload error: {str(upload_error)}")
-                return dbc.Alert(
-                    f"Upload failed: {str(upload_error)}",
-                    color="danger",
-                    dismissable=True,
-                    is_open=True
-                )
-                
+            thumbnail_data = base64.b64decode(content_string)
+            check_image(thumbnail_data)
         except Exception as e:
             logger.error(f"Thumbnail processing error: {str(e)}")
-            return dbc.Alert(
-                f"Error processing thumbnail: {str(e)}",
-                color="danger",
-                dismissable=True,
-                is_open=True
-            )
+            return upload_alert(f"Error processing thumbnail: {str(e)}", "danger"), dash.no_update
 
-    # Prepare data with video_path
+    # An uploaded video is only queued once it is assembled and verified
     data = {
         "competition": competition,
         "home_team": home_team,
         "away_team": away_team,
         "match_date": match_date,
-        "thumbnail": thumbnail_url,
-        "video_path": video_path,  # Added video_path
-        "status": "pending"
+        "thumbnail": None,
+        "video_path": None if video_file else video_path,
+        "status": "uploading" if video_file else "pending"
     }
 
     try:
-        logger.info("Attempting to insert game data into database")
-        response = supabase.table("games").insert(data).execute()
-        if response and response.data:
-            logger.info("Game data inserted successfully")
-            return dbc.Alert(
-                "Game uploaded successfully!",
-                color="success",
-                dismissable=True,
-                is_open=True
-            )
+        if manifest:
+            logger.info(f"Restarting failed upload {manifest['upload_id']} for game {manifest['game_id']}")
+            game = {"id": manifest['game_id']}
         else:
-            logger.error("Database insert response was empty")
-            return dbc.Alert(
-                "Upload failed. No response from server.",
-                color="danger",
-                dismissable=True,
-                is_open=True
-            )
+            logger.info("Attempting to insert game data into database")
+            game = GameRepository.insert(data)
+            if not game:
+                logger.error("Database insert response was empty")
+                return upload_alert("Upload failed. No response from server.", "danger"), dash.no_update
+            logger.info("Game data inserted successfully")
+
+        if video_file:
+            try:
+                upload = create_upload(game['id'], video_file, priority, game_fields)
+            except Exception:
+                # Without an upload the new game would only wait to expire
+                if not manifest:
+                    GameRepository.delete(game['id'])
+                raise
+
+        # Resized variants are stored and attached in the background; without
+        # an uploaded image, a frame of the video is used
+        thumbnail_job = submit_thumbnail(game['id'], thumbnail_data) if thumbnail_data else None
+
+        if video_file:
+            return upload_alert(
+                ("Uploading the video again" if manifest else "Game created! Uploading the video")
+                + "; keep this page open until it is stored.", "success"
+            ), upload_status(upload)
+
+        if not thumbnail_data:
+            thumbnail_job = submit_video_thumbnail(game['id'], video_path)
+        try:
+            JobRepository.enqueue(game['id'], priority)
+        except Exception as e:
+            if not is_missing_schema_error(e):
+                # Workers only claim queued jobs: without one the game would wait forever
+                logger.error(f"Could not queue game {game['id']} for processing: {str(e)}")
+                return upload_alert(
+                    f"The game was saved but could not be queued for processing: {str(e)}", "danger"
+                ), dash.no_update
+            # Queue not migrated yet: the game stays pending
+            logger.warning(f"Processing queue not migrated, game {game['id']} stays pending: {str(e)}")
+        return upload_alert(
+            "Game uploaded successfully!" + (" The thumbnail is being processed." if thumbnail_job else ""),
+            "success"
+        ), dash.no_update
     except Exception as e:
         logger.error(f"Database insert error: {str(e)}")
-        return dbc.Alert(
-            f"Error: {str(e)}",
-            color="danger",
-            dismissable=True,
-            is_open=True
-        )
+        return upload_alert(f"Error: {str(e)}", "danger"), dash.no_update
+
+# Send the chunks of a started upload, and show its progress until it is stored
+clientside_callback(
+    ClientsideFunction(namespace='admin', function_name='video_upload_progress'),
+    [Output("video-upload-progress", "value"),
+     Output("video-upload-progress", "label"),
+     Output("video-upload-status", "children"),
+     Output("video-upload-tick", "disabled")],
+    [Input("video-upload-start", "data"),
+     Input("video-upload-tick", "n_intervals")],
+    prevent_initial_call=True
+)
 
 @callback(
     Output("thumbnail-preview", "children"),
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+from config.polling import CHANGE_OVERLAP_SECONDS
+
+# Cursors of the admin change polls, kept in a dcc.Store as JSON:
+#   {'at': newest timestamp seen, 'seen': {row id: its timestamp}}
+# A poll asks for rows changed since `at` minus the overlap window, and drops
+# the rows it has already seen at the same timestamp, so rows committed late
+# are picked up once and rows seen before are not reported again.
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def new_cursor(rows=(), column='updated_at'):
+    """Cursor after a full load of rows (any order); the current time when there are none"""
+    if not rows:
+        return {'at': datetime.now(timezone.utc).isoformat(), 'seen': {}}
+    return advance_cursor({'at': rows[0][column], 'seen': {}}, rows, column)[1]
+
+def window_start(cursor):
+    """Lower bound of the next poll: the newest change seen minus the overlap"""
+    return (parse_timestamp(cursor['at']) - timedelta(seconds=CHANGE_OVERLAP_SECONDS)).isoformat()
+
+def advance_cursor(cursor, rows, column='updated_at'):
+    """Return (rows not seen before, cursor moved past rows)"""
+    seen = dict(cursor['seen'])
+    fresh = [row for row in rows if seen.get(str(row['id'])) != row[column]]
+    for row in fresh:
+        seen[str(row['id'])] = row[column]
+
+    at = max([parse_timestamp(cursor['at'])] + [parse_timestamp(row[column]) for row in fresh])
+    oldest = at - timedelta(seconds=CHANGE_OVERLAP_SECONDS)
+    return fresh, {
+        'at': at.isoformat(),
+        'seen': {row_id: value for row_id, value in seen.items() if parse_timestamp(value) >= oldest}
+    }
@@ -1,9 +1,9 @@
-from config.supabase_client import supabase
+from spai_data import GameRepository, JobRepository
 from datetime import datetime
 
 class GameOperations:
     @staticmethod
-    def add_game(competition, home_team, away_team, game_date, video_path, thumbnail_path=None):
+    def add_game(competition, home_team, away_team, game_date, video_path, thumbnail_path=None, priority=1):
         try:
             data = {
                 "competition": competition,
@@ -15,8 +15,10 @@ class GameOperations:
                 "status": "pending"
             }
             
-            response = supabase.table('games').insert(data).execute()
-            return response.data[0] if response.data else None
+            game = GameRepository.insert(data)
+            if game:
+                JobRepository.enqueue(game['id'], priority)
+            return game
             
         except Exception as e:
             print(f"Error adding game: {str(e)}")
@@ -25,8 +27,7 @@ class GameOperations:
     @staticmethod
     def get_all_games():
         try:
-            response = supabase.table('games').select("*").order('created_at', desc=True).execute()
-            return response.data
+            return GameRepository.list_games()
         except Exception as e:
             print(f"Error fetching games: {str(e)}")
             return []
@@ -34,8 +35,7 @@ class GameOperations:
     @staticmethod
     def update_game_status(game_id, status):
         try:
-            response = supabase.table('games').update({"status": status}).eq("id", game_id).execute()
-            return response.data[0] if response.data else None
+            return GameRepository.update(game_id, {"status": status})
         except Exception as e:
             print(f"Error updating game status: {str(e)}")
             return None
@@ -43,8 +43,8 @@ class GameOperations:
     @staticmethod
     def delete_game(game_id):
         try:
-            response = supabase.table('games').delete().eq("id", game_id).execute()
+            GameRepository.delete(game_id)
             return True
         except Exception as e:
             print(f"Error deleting game: {str(e)}")
-            return False
\ No newline at end of file
+            return False
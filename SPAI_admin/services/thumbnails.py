@@ -0,0 +1,141 @@
+import os
+import io
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from spai_data import GameRepository, ThumbnailStorage
+
+logger = logging.getLogger(__name__)
+
+# Widths of the WebP variants; the client picks one from a srcset
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+
+# Width of the single JPEG variant, for browsers that cannot use the srcset
+JPEG_WIDTH = 640
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Variants are stored under the hash of the original image, so their content
+# never changes and browsers may cache them for a year
+VARIANT_CACHE_SECONDS = 31536000
+
+# Thumbnails processed at the same time, off the request threads
+thumbnail_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPAI_THUMBNAIL_WORKERS", "2")),
+    thread_name_prefix="thumbnails"
+)
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def check_image(data):
+    """Return the format of an uploaded image, raising ValueError if it is not one.
+
+    Only reads the header; the pixels are decoded later, in the background.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return image.format
+    except UnidentifiedImageError:
+        raise ValueError("The thumbnail is not a supported image file")
+
+def build_variants(data):
+    """Decode an image once and encode its resized variants.
+
+    Returns a list of (width, format, content type, encoded bytes). The image
+    is rotated upright from its EXIF orientation, then re-encoded without any
+    of its metadata (EXIF, ICC profile, comments). Images are never upscaled:
+    a small original yields fewer, smaller variants.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        # Let JPEG decoding skip detail the largest variant does not need
+        image.draft('RGB', (max(THUMBNAIL_WIDTHS), max(THUMBNAIL_WIDTHS)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Flatten transparency onto white rather than black
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+    widths = sorted({min(width, image.width) for width in THUMBNAIL_WIDTHS + (JPEG_WIDTH,)}, reverse=True)
+    variants = []
+    source = image
+    for width in widths:
+        # Resize from the previous, larger variant: cheaper than from the original
+        if width < source.width:
+            height = max(1, round(source.height * width / source.width))
+            source = source.resize((width, height), Image.LANCZOS)
+
+        if width in THUMBNAIL_WIDTHS or width == image.width:
+            buffer = io.BytesIO()
+            source.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+            variants.append((width, 'webp', 'image/webp', buffer.getvalue()))
+        if width == min(JPEG_WIDTH, image.width):
+            buffer = io.BytesIO()
+            source.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            variants.append((width, 'jpeg', 'image/jpeg', buffer.getvalue()))
+
+    return variants
+
+def variant_name(width, image_format):
+    return f"{width}.{'jpg' if image_format == 'jpeg' else image_format}"
+
+def store_variants(data):
+    """Store the variants of an image under its content hash.
+
+    An image uploaded before (for another game, say) already has its variants
+    stored: they are reused without decoding the image again. A set left
+    incomplete by a failed attempt is stored again, overwriting the variants
+    that did get stored. Returns the thumbnail_variants entries.
+    """
+    folder = content_hash(data)
+    existing = ThumbnailStorage.list_names(folder)
+    # The JPEG is uploaded last, so a stored set with it is complete
+    if any(name.endswith('.jpg') for name in existing):
+        entries = []
+        for name in existing:
+            width, extension = name.split('.')
+            entries.append({
+                'width': int(width),
+                'format': 'jpeg' if extension == 'jpg' else extension,
+                'url': ThumbnailStorage.public_url(f"{folder}/{name}")
+            })
+        return sorted(entries, key=lambda entry: (entry['format'], entry['width']))
+
+    entries = []
+    variants = sorted(build_variants(data), key=lambda variant: variant[1] == 'jpeg')
+    for width, image_format, content_type, encoded in variants:
+        path = f"{folder}/{variant_name(width, image_format)}"
+        url = ThumbnailStorage.upload(
+            path, encoded, content_type, cache_control=VARIANT_CACHE_SECONDS, upsert=True
+        )
+        entries.append({'width': width, 'format': image_format, 'url': url})
+    return entries
+
+def process_thumbnail(game_id, data):
+    """Create, store and attach the thumbnail variants of a game"""
+    try:
+        variants = store_variants(data)
+        jpeg = next(variant for variant in variants if variant['format'] == 'jpeg')
+        GameRepository.update(game_id, {
+            # Readers unaware of variants get the card-sized JPEG
+            "thumbnail": jpeg['url'],
+            "thumbnail_variants": variants
+        })
+        logger.info(f"Stored {len(variants)} thumbnail variants for game {game_id}")
+        return variants
+    except Exception as e:
+        logger.error(f"Thumbnail processing error for game {game_id}: {str(e)}")
+        return None
+
+def submit_thumbnail(game_id, data):
+    """Process a game's thumbnail in the background"""
+    return thumbnail_executor.submit(process_thumbnail, game_id, data)
@@ -0,0 +1,105 @@
+import os
+import logging
+from services.thumbnails import process_thumbnail, thumbnail_executor
+
+logger = logging.getLogger(__name__)
+
+# Frames considered for the thumbnail, spread over the match
+THUMBNAIL_CANDIDATES = int(os.getenv("SPAI_THUMBNAIL_CANDIDATES", "8"))
+
+# Part of the video skipped at each end (intros, studio shots, credits)
+EDGE_MARGIN = 0.1
+
+# Width frames are scored at; enough to compare sharpness, cheap to filter
+SCORE_WIDTH = 480
+
+# Frames darker, brighter or flatter than this are fades or title cards
+MIN_BRIGHTNESS, MAX_BRIGHTNESS = 25, 230
+MIN_CONTRAST = 20
+
+def video_readable(video_path):
+    """Whether this server can open the video: a local file or a URL"""
+    return bool(video_path) and ('://' in video_path or os.path.exists(video_path))
+
+def score_frame(frame):
+    """Return (usable, sharpness) of a BGR frame.
+
+    Sharpness is the variance of the Laplacian, which drops on motion blur and
+    out-of-focus shots. Nearly black, washed-out or flat frames are not usable.
+    """
+    import cv2
+
+    height, width = frame.shape[:2]
+    if width > SCORE_WIDTH:
+        frame = cv2.resize(frame, (SCORE_WIDTH, max(1, round(height * SCORE_WIDTH / width))),
+                           interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    mean, stddev = cv2.meanStdDev(gray)
+    usable = MIN_BRIGHTNESS <= mean[0][0] <= MAX_BRIGHTNESS and stddev[0][0] >= MIN_CONTRAST
+    return usable, cv2.Laplacian(gray, cv2.CV_64F).var()
+
+def extract_thumbnail(video_path, candidates=THUMBNAIL_CANDIDATES):
+    """Pick the sharpest of a few frames spread over a video; JPEG bytes or None.
+
+    The video is never decoded as a whole: each candidate is reached by
+    seeking, which jumps to the nearest keyframe and only decodes up to the
+    requested position.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.error(f"Error opening video: {video_path}")
+        return None
+
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            logger.error(f"Unknown frame count for video: {video_path}")
+            return None
+
+        first, last = frame_count * EDGE_MARGIN, frame_count * (1 - EDGE_MARGIN)
+        step = (last - first) / max(candidates - 1, 1)
+        best = best_key = None
+        for index in range(candidates):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(first + index * step))
+            ok, frame = cap.read()
+            if not ok:
+                continue
+            usable, sharpness = score_frame(frame)
+            # Usable frames always win over fades and title cards
+            key = (usable, sharpness)
+            if best_key is None or key > best_key:
+                best, best_key = frame, key
+    finally:
+        cap.release()
+
+    if best is None:
+        logger.error(f"No frame could be read from video: {video_path}")
+        return None
+
+    ok, encoded = cv2.imencode('.jpg', best, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return encoded.tobytes() if ok else None
+
+def process_video_thumbnail(game_id, video_path):
+    """Extract a thumbnail from a game's video and store its variants"""
+    try:
+        data = extract_thumbnail(video_path)
+    except Exception as e:
+        logger.error(f"Thumbnail extraction error for game {game_id}: {str(e)}")
+        return None
+    if data is None:
+        return None
+    logger.info(f"Extracted a thumbnail for game {game_id} from {video_path}")
+    return process_thumbnail(game_id, data)
+
+def submit_video_thumbnail(game_id, video_path):
+    """Extract and process a game's thumbnail from its video in the background.
+
+    Returns None without queueing anything when the video is not reachable
+    from this server (e.g. a path on the processing worker's drive).
+    """
+    if not video_readable(video_path):
+        logger.info(f"Video not reachable for thumbnail extraction: {video_path}")
+        return None
+    return thumbnail_executor.submit(process_video_thumbnail, game_id, video_path)
@@ -0,0 +1,410 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify, request
+from werkzeug.utils import secure_filename
+from spai_data import GameRepository, JobRepository
+from config.uploads import (
+    UPLOAD_DIR, VIDEO_DIR, WORKER_VIDEO_DIR, CHUNK_SIZE, UPLOAD_PARALLELISM, UPLOAD_EXPIRY,
+    UPLOAD_SWEEP_INTERVAL
+)
+from services.video_thumbnails import submit_video_thumbnail
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: serialize within the process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Read and write block size when streaming chunks
+BLOCK_SIZE = 1024 * 1024
+
+UPLOAD_ID = re.compile(r'^[0-9a-f]{24}$')
+CHUNK_NAME = re.compile(r'^(\d+)\.([0-9a-f]{64})\.part$')
+
+# Assembled files are copied and verified one at a time: the copy is disk bound
+assembly_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video-assembly")
+
+_state_lock = threading.Lock()
+
+def upload_id_for(file_info, game_fields):
+    """Upload id of a file for a game, stable across page reloads so an upload can resume.
+
+    The game's form fields are part of it: the same file submitted for another
+    game starts a new upload instead of resuming the first game's.
+    """
+    fingerprint = json.dumps([
+        file_info['name'], file_info['size'], file_info.get('last_modified'), game_fields
+    ], sort_keys=True)
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:24]
+
+def upload_path(upload_id, name=''):
+    if not UPLOAD_ID.match(upload_id):
+        raise KeyError(upload_id)
+    return os.path.join(UPLOAD_DIR, upload_id, name)
+
+def read_manifest(upload_id):
+    try:
+        with open(upload_path(upload_id, 'manifest.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_manifest(manifest):
+    path = upload_path(manifest['upload_id'], 'manifest.json')
+    fd, tmp_path = tempfile.mkstemp(dir=upload_path(manifest['upload_id']), suffix='.json.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+@contextmanager
+def upload_state_lock(upload_id):
+    """Serialize state changes of an upload, across the server's workers too"""
+    with _state_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(upload_path(upload_id, 'state.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def find_upload(file_info, game_fields):
+    """Unfinished upload of the same file for the same game.
+
+    Its game is reused instead of creating another one: an upload still in
+    progress resumes, a failed one starts over. Uploads whose game was
+    deleted meanwhile are ignored.
+    """
+    manifest = read_manifest(upload_id_for(file_info, game_fields))
+    if not manifest or manifest['state'] == 'assembled' or manifest.get('game_fields') != game_fields:
+        return None
+    if not GameRepository.find(manifest['game_id'], 'id'):
+        return None
+    return manifest
+
+def list_uploads():
+    """Manifests of every upload kept in the upload directory"""
+    try:
+        names = os.listdir(UPLOAD_DIR)
+    except FileNotFoundError:
+        return []
+    manifests = (read_manifest(name) for name in names if UPLOAD_ID.match(name))
+    return [manifest for manifest in manifests if manifest]
+
+def last_activity(upload_id):
+    """When a chunk or the manifest of an upload was last written"""
+    latest = 0
+    for entry in os.scandir(upload_path(upload_id)):
+        if entry.name == 'state.lock':
+            continue
+        try:
+            latest = max(latest, entry.stat().st_mtime)
+        except FileNotFoundError:  # A chunk renamed or removed meanwhile
+            pass
+    return datetime.fromtimestamp(latest, timezone.utc)
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def create_upload(game_id, file_info, priority, game_fields):
+    """Start a chunked upload of a game's video and return its manifest.
+
+    `game_fields` are the form fields the game was created from; submitting
+    the same file with the same fields again resumes the upload.
+    """
+    size = int(file_info['size'])
+    if size <= 0:
+        raise ValueError("The video file is empty")
+
+    upload_id = upload_id_for(file_info, game_fields)
+    shutil.rmtree(upload_path(upload_id), ignore_errors=True)
+    os.makedirs(upload_path(upload_id))
+    manifest = {
+        'upload_id': upload_id,
+        'game_id': game_id,
+        'filename': secure_filename(file_info['name']) or 'video',
+        'size': size,
+        'chunk_size': CHUNK_SIZE,
+        'chunks': -(-size // CHUNK_SIZE),
+        'priority': priority,
+        'game_fields': game_fields,
+        'state': 'uploading',
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+    write_manifest(manifest)
+    logger.info(f"Started upload {upload_id} of {manifest['filename']} ({size} bytes) for game {game_id}")
+    return manifest
+
+def received_chunks(upload_id):
+    """Checksums of the chunks stored so far, by index"""
+    chunks = {}
+    for name in os.listdir(upload_path(upload_id)):
+        match = CHUNK_NAME.match(name)
+        if match:
+            chunks[int(match.group(1))] = match.group(2)
+    return chunks
+
+def upload_status(manifest):
+    """What a browser needs to (re)start sending an upload"""
+    return {
+        **manifest,
+        'received': sorted(received_chunks(manifest['upload_id'])),
+        'parallelism': UPLOAD_PARALLELISM
+    }
+
+def expected_chunk_size(manifest, index):
+    if index == manifest['chunks'] - 1:
+        return manifest['size'] - manifest['chunk_size'] * index
+    return manifest['chunk_size']
+
+def store_chunk(manifest, index, checksum, stream):
+    """Stream one chunk to disk, keeping it only if its size and SHA-256 match.
+
+    Chunks are written under a temporary name, unique per request, and renamed
+    once verified, so a dropped connection never leaves a partial chunk that
+    looks received and two requests sending the same chunk never mix.
+    """
+    if not 0 <= index < manifest['chunks']:
+        raise ValueError(f"Chunk {index} out of range")
+    checksum = (checksum or '').lower()
+    if not re.fullmatch(r'[0-9a-f]{64}', checksum):
+        raise ValueError("Missing or invalid chunk checksum")
+
+    path = upload_path(manifest['upload_id'], f"{index}.{checksum}.part")
+    digest, size = hashlib.sha256(), 0
+    fd, tmp_path = tempfile.mkstemp(dir=upload_path(manifest['upload_id']), prefix=f"{index}.", suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        while block := stream.read(BLOCK_SIZE):
+            digest.update(block)
+            size += len(block)
+            f.write(block)
+
+    if size != expected_chunk_size(manifest, index) or digest.hexdigest() != checksum:
+        os.remove(tmp_path)
+        raise ValueError(f"Chunk {index} failed verification")
+
+    # A chunk sent again replaces the previous copy
+    for name in os.listdir(upload_path(manifest['upload_id'])):
+        if name.startswith(f"{index}.") and name.endswith('.part'):
+            os.remove(upload_path(manifest['upload_id'], name))
+    os.replace(tmp_path, path)
+
+def complete_upload(manifest):
+    """Assemble an upload in the background once every chunk is stored.
+
+    The state is checked and moved to `assembling` under the upload's lock, so
+    concurrent requests start a single assembly.
+    """
+    with upload_state_lock(manifest['upload_id']):
+        manifest = read_manifest(manifest['upload_id'])
+        if manifest['state'] != 'uploading':
+            return manifest
+        missing = set(range(manifest['chunks'])) - set(received_chunks(manifest['upload_id']))
+        if missing:
+            raise ValueError(f"{len(missing)} chunks missing")
+
+        manifest = {**manifest, 'state': 'assembling', 'error': None}
+        write_manifest(manifest)
+    assembly_executor.submit(assemble_upload, manifest)
+    return manifest
+
+def assemble_upload(manifest):
+    """Concatenate the chunks into the video directory and hand the game to the queue.
+
+    Every chunk is checked against its checksum again while it is copied, so a
+    chunk damaged on disk is dropped for the browser to send again instead of
+    ending up in the video.
+    """
+    upload_id, game_id = manifest['upload_id'], manifest['game_id']
+    filename = f"{game_id}_{manifest['filename']}"
+    target = os.path.join(VIDEO_DIR, filename)
+    try:
+        os.makedirs(VIDEO_DIR, exist_ok=True)
+        chunks = received_chunks(upload_id)
+        digest = hashlib.sha256()
+        with open(target + '.partial', 'wb') as out:
+            for index in range(manifest['chunks']):
+                path = upload_path(upload_id, f"{index}.{chunks[index]}.part")
+                chunk_digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    while block := f.read(BLOCK_SIZE):
+                        chunk_digest.update(block)
+                        digest.update(block)
+                        out.write(block)
+                if chunk_digest.hexdigest() != chunks[index]:
+                    os.remove(path)
+                    raise ValueError(f"Chunk {index} is corrupted; it has to be sent again")
+            size = out.tell()
+        if size != manifest['size']:
+            raise ValueError(f"Assembled {size} bytes instead of {manifest['size']}")
+        os.replace(target + '.partial', target)
+    except Exception as e:
+        logger.error(f"Assembly of upload {upload_id} failed: {str(e)}")
+        if os.path.exists(target + '.partial'):
+            os.remove(target + '.partial')
+        write_manifest({**manifest, 'state': 'uploading', 'error': str(e)})
+        return None
+
+    video_path = os.path.join(WORKER_VIDEO_DIR, filename)
+    try:
+        game = GameRepository.update(game_id, {"video_path": video_path, "status": "pending"})
+        JobRepository.enqueue(game_id, manifest['priority'])
+        if game and not game.get('thumbnail'):
+            submit_video_thumbnail(game_id, target)
+    except Exception as e:
+        logger.error(f"Could not hand game {game_id} over for processing: {str(e)}")
+        write_manifest({**manifest, 'state': 'failed', 'error': str(e)})
+        return None
+
+    for name in os.listdir(upload_path(upload_id)):
+        if name.endswith('.part'):
+            os.remove(upload_path(upload_id, name))
+    write_manifest({**manifest, 'state': 'assembled', 'sha256': digest.hexdigest(), 'video_path': video_path})
+    logger.info(f"Assembled upload {upload_id} into {target} (sha256 {digest.hexdigest()})")
+    return video_path
+
+def uploading_games():
+    """Games still `uploading`, oldest first, with the progress of their upload.
+
+    `upload` is None for a game whose upload is gone (e.g. the upload
+    directory was cleared); such a game expires counting from its creation.
+    """
+    uploads = {manifest['game_id']: manifest for manifest in list_uploads()}
+    games = GameRepository.list_games(
+        ['id', 'competition', 'home_team', 'away_team', 'match_date', 'created_at'],
+        status='uploading', order='created_at', desc=False
+    )
+    entries = []
+    for game in games:
+        manifest = uploads.get(game['id'])
+        if manifest:
+            received = len(received_chunks(manifest['upload_id']))
+            activity = last_activity(manifest['upload_id'])
+        else:
+            received, activity = None, parse_timestamp(game['created_at'])
+        entries.append({
+            'game': game,
+            'upload': manifest,
+            'received': received,
+            'last_activity': activity,
+            'expires_at': activity + UPLOAD_EXPIRY
+        })
+    return entries
+
+def discard_unfinished_game(game_id, manifest=None):
+    """Delete a game whose video never arrived, with a video assembled for it if any"""
+    game = GameRepository.find(game_id, 'status')
+    if not game or game['status'] != 'uploading':
+        return
+    GameRepository.delete(game_id)
+    if manifest:
+        target = os.path.join(VIDEO_DIR, f"{game_id}_{manifest['filename']}")
+        for path in (target, target + '.partial'):
+            if os.path.exists(path):
+                os.remove(path)
+    logger.info(f"Removed game {game_id}: its video upload was abandoned")
+
+def expire_uploads():
+    """Remove uploads idle for longer than UPLOAD_EXPIRY, and the games they never finished.
+
+    Assembled uploads only keep their manifest, which is dropped as well.
+    Games still `uploading` without any upload left are removed once they
+    are as old. Returns the ids of the expired uploads.
+    """
+    now = datetime.now(timezone.utc)
+    expired = []
+    for manifest in list_uploads():
+        upload_id = manifest['upload_id']
+        try:
+            with upload_state_lock(upload_id):
+                manifest = read_manifest(upload_id)
+                if not manifest or last_activity(upload_id) + UPLOAD_EXPIRY > now:
+                    continue
+                shutil.rmtree(upload_path(upload_id), ignore_errors=True)
+            if manifest['state'] != 'assembled':
+                discard_unfinished_game(manifest['game_id'], manifest)
+            expired.append(upload_id)
+        except Exception as e:
+            logger.error(f"Could not expire upload {upload_id}: {str(e)}")
+
+    for entry in uploading_games():
+        if entry['upload'] is None and entry['expires_at'] <= now:
+            discard_unfinished_game(entry['game']['id'])
+    return expired
+
+def start_upload_sweeper():
+    """Expire abandoned uploads in the background, every UPLOAD_SWEEP_INTERVAL seconds"""
+
+    def sweep():
+        while True:
+            try:
+                expired = expire_uploads()
+                if expired:
+                    logger.info(f"Expired {len(expired)} abandoned uploads")
+            except Exception as e:
+                logger.error(f"Error expiring abandoned uploads: {str(e)}")
+            time.sleep(UPLOAD_SWEEP_INTERVAL)
+
+    thread = threading.Thread(target=sweep, name='upload-sweeper', daemon=True)
+    thread.start()
+    return thread
+
+def register_upload_routes(server):
+    """Mount the chunk endpoints of resumable video uploads.
+
+    Uploads are started by the upload page (see create_upload). The browser
+    then PUTs the missing chunks, several at a time, each with its SHA-256 in
+    an X-Chunk-Sha256 header, and POSTs /complete once all are stored.
+    GET reports the chunks received, which is how an interrupted upload resumes.
+    """
+
+    def load(upload_id):
+        try:
+            manifest = read_manifest(upload_id)
+        except KeyError:
+            manifest = None
+        if manifest is None:
+            return None, (jsonify({'error': 'Unknown upload'}), 404)
+        return manifest, None
+
+    @server.route("/uploads/<upload_id>", methods=["GET"])
+    def get_upload(upload_id):
+        manifest, error = load(upload_id)
+        return error or jsonify(upload_status(manifest))
+
+    @server.route("/uploads/<upload_id>/chunks/<int:index>", methods=["PUT"])
+    def put_chunk(upload_id, index):
+        manifest, error = load(upload_id)
+        if error:
+            return error
+        if manifest['state'] != 'uploading':
+            return jsonify({'error': f"Upload is {manifest['state']}"}), 409
+        try:
+            store_chunk(manifest, index, request.headers.get('X-Chunk-Sha256'), request.stream)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 422
+        return jsonify({'index': index})
+
+    @server.route("/uploads/<upload_id>/complete", methods=["POST"])
+    def post_complete(upload_id):
+        manifest, error = load(upload_id)
+        if error:
+            return error
+        try:
+            manifest = complete_upload(manifest)
+        except ValueError as e:
+            return jsonify({'error': str(e), **upload_status(manifest)}), 409
+        return jsonify(upload_status(manifest)), 202
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The admin's modules import each other from the app directory (services,
+# config), and the shared data-access package (spai_data) from the repository root
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [APP_DIR, os.path.dirname(APP_DIR)]
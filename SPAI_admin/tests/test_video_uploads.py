@@ -0,0 +1,209 @@
+import io
+import os
+import time
+import hashlib
+import pytest
+from services import video_uploads
+from services.video_uploads import (
+    upload_id_for, upload_path, create_upload, find_upload, store_chunk, received_chunks,
+    complete_upload, assemble_upload, read_manifest, expire_uploads, UPLOAD_ID
+)
+
+CHUNK_SIZE = 4
+VIDEO = b'0123456789'  # Three chunks: 4 + 4 + 2 bytes
+FILE_INFO = {'name': 'match.mp4', 'size': len(VIDEO), 'last_modified': 1760000000000}
+GAME_FIELDS = {'competition': 'LaLiga', 'home_team': 'A', 'away_team': 'B', 'match_date': '2026-10-19'}
+
+
+class FakeGames:
+    def __init__(self):
+        self.rows = {}
+        self.updates = []
+
+    def find(self, game_id, columns='*'):
+        return self.rows.get(game_id)
+
+    def update(self, game_id, values):
+        self.updates.append((game_id, values))
+        self.rows[game_id].update(values)
+        return self.rows[game_id]
+
+    def delete(self, game_id):
+        self.rows.pop(game_id, None)
+
+    def list_games(self, columns='*', status=None, order=None, desc=True, limit=None):
+        return [row for row in self.rows.values() if row['status'] == status]
+
+
+class FakeJobs:
+    def __init__(self):
+        self.enqueued = []
+
+    def enqueue(self, game_id, priority=1):
+        self.enqueued.append((game_id, priority))
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+
+@pytest.fixture
+def games(tmp_path, monkeypatch):
+    games = FakeGames()
+    games.rows[7] = {
+        'id': 7, 'status': 'uploading', 'thumbnail': None, 'home_team': 'A', 'away_team': 'B',
+        'competition': 'LaLiga', 'match_date': '2026-10-19', 'created_at': '2026-10-19T10:00:00+00:00'
+    }
+    monkeypatch.setattr(video_uploads, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(video_uploads, 'VIDEO_DIR', str(tmp_path / 'videos'))
+    monkeypatch.setattr(video_uploads, 'WORKER_VIDEO_DIR', '/worker/videos')
+    monkeypatch.setattr(video_uploads, 'CHUNK_SIZE', CHUNK_SIZE)
+    monkeypatch.setattr(video_uploads, 'GameRepository', games)
+    monkeypatch.setattr(video_uploads, 'JobRepository', FakeJobs())
+    monkeypatch.setattr(video_uploads, 'assembly_executor', RecordingExecutor())
+    monkeypatch.setattr(video_uploads, 'submit_video_thumbnail', lambda game_id, path: None)
+    return games
+
+
+def chunk(index):
+    data = VIDEO[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def store_all(manifest):
+    for index in range(manifest['chunks']):
+        data, checksum = chunk(index)
+        store_chunk(manifest, index, checksum, io.BytesIO(data))
+
+
+def test_upload_id_is_stable_per_file_and_game():
+    upload_id = upload_id_for(FILE_INFO, GAME_FIELDS)
+    assert UPLOAD_ID.match(upload_id)
+    assert upload_id_for(dict(FILE_INFO), dict(GAME_FIELDS)) == upload_id
+    assert upload_id_for(dict(FILE_INFO, size=11), GAME_FIELDS) != upload_id
+    assert upload_id_for(FILE_INFO, dict(GAME_FIELDS, home_team='C')) != upload_id
+
+
+def test_upload_path_rejects_other_ids():
+    with pytest.raises(KeyError):
+        upload_path('../../etc')
+
+
+def test_create_upload_splits_into_chunks(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    assert (manifest['chunks'], manifest['chunk_size'], manifest['state']) == (3, CHUNK_SIZE, 'uploading')
+    assert read_manifest(manifest['upload_id']) == manifest
+
+    with pytest.raises(ValueError):
+        create_upload(7, dict(FILE_INFO, size=0), 2, GAME_FIELDS)
+
+
+def test_find_upload_resumes_only_unassembled_uploads_of_existing_games(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    assert find_upload(FILE_INFO, GAME_FIELDS) == manifest
+    assert find_upload(FILE_INFO, dict(GAME_FIELDS, home_team='C')) is None
+
+    games.delete(7)
+    assert find_upload(FILE_INFO, GAME_FIELDS) is None
+
+
+def test_store_chunk_keeps_verified_chunks(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    data, checksum = chunk(2)
+    store_chunk(manifest, 2, checksum.upper(), io.BytesIO(data))
+    assert received_chunks(manifest['upload_id']) == {2: checksum}
+
+    # Sent again, the chunk replaces its previous copy
+    store_chunk(manifest, 2, checksum, io.BytesIO(data))
+    assert sorted(os.listdir(upload_path(manifest['upload_id']))) == [f'2.{checksum}.part', 'manifest.json']
+
+
+@pytest.mark.parametrize('index, data, checksum', [
+    (0, b'0123', hashlib.sha256(b'0124').hexdigest()),  # Checksum mismatch
+    (0, b'012', hashlib.sha256(b'012').hexdigest()),    # Truncated chunk
+    (2, b'8', hashlib.sha256(b'8').hexdigest()),        # Short last chunk
+    (3, b'', hashlib.sha256(b'').hexdigest()),          # Out of range
+    (0, b'0123', 'not-a-checksum'),
+    (0, b'0123', None),
+])
+def test_store_chunk_rejects_unverified_chunks(games, index, data, checksum):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    with pytest.raises(ValueError):
+        store_chunk(manifest, index, checksum, io.BytesIO(data))
+    # Neither the chunk nor its temporary file is left behind
+    assert os.listdir(upload_path(manifest['upload_id'])) == ['manifest.json']
+
+
+def test_complete_upload_requires_every_chunk(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    data, checksum = chunk(0)
+    store_chunk(manifest, 0, checksum, io.BytesIO(data))
+
+    with pytest.raises(ValueError, match='2 chunks missing'):
+        complete_upload(manifest)
+    assert read_manifest(manifest['upload_id'])['state'] == 'uploading'
+
+
+def test_complete_upload_starts_a_single_assembly(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    store_all(manifest)
+
+    assert complete_upload(manifest)['state'] == 'assembling'
+    assert complete_upload(manifest)['state'] == 'assembling'
+    assert len(video_uploads.assembly_executor.submitted) == 1
+
+
+def test_assemble_upload_hands_the_game_over(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    store_all(manifest)
+    manifest = complete_upload(manifest)
+
+    video_path = assemble_upload(manifest)
+
+    assert video_path == '/worker/videos/7_match.mp4'
+    with open(os.path.join(video_uploads.VIDEO_DIR, '7_match.mp4'), 'rb') as f:
+        assert f.read() == VIDEO
+    assert games.rows[7]['status'] == 'pending'
+    assert games.rows[7]['video_path'] == video_path
+    assert video_uploads.JobRepository.enqueued == [(7, 2)]
+
+    stored = read_manifest(manifest['upload_id'])
+    assert stored['state'] == 'assembled'
+    assert stored['sha256'] == hashlib.sha256(VIDEO).hexdigest()
+    assert received_chunks(manifest['upload_id']) == {}
+
+
+def test_assemble_upload_drops_a_chunk_damaged_on_disk(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    store_all(manifest)
+    manifest = complete_upload(manifest)
+    _, checksum = chunk(1)
+    with open(upload_path(manifest['upload_id'], f'1.{checksum}.part'), 'wb') as f:
+        f.write(b'XXXX')
+
+    assert assemble_upload(manifest) is None
+
+    stored = read_manifest(manifest['upload_id'])
+    assert stored['state'] == 'uploading' and 'Chunk 1' in stored['error']
+    assert sorted(received_chunks(manifest['upload_id'])) == [0, 2]
+    assert os.listdir(video_uploads.VIDEO_DIR) == []
+    assert games.updates == []
+
+
+def test_expire_uploads_removes_idle_uploads_and_their_game(games):
+    manifest = create_upload(7, FILE_INFO, 2, GAME_FIELDS)
+    assert expire_uploads() == []
+    assert 7 in games.rows
+
+    idle = time.time() - video_uploads.UPLOAD_EXPIRY.total_seconds() - 60
+    directory = upload_path(manifest['upload_id'])
+    for name in os.listdir(directory):
+        os.utime(os.path.join(directory, name), (idle, idle))
+
+    assert expire_uploads() == [manifest['upload_id']]
+    assert not os.path.exists(directory)
+    assert 7 not in games.rows
@@ -2,20 +2,57 @@
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+import os
+import sys
+# The shared data-access package (spai_data) lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import dash
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, ctx, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
-import pandas as pd
-import json
-import io
+import hmac
+import importlib
+from flask import jsonify, request
 from components.sidebar import create_sidebar
-from layouts.home import create_home_layout  # This will be your new home page
-from layouts.game_dashboard import create_game_dashboard, load_game_data
-from layouts.season_overview import create_season_overview
-from layouts.game_cards_page import create_game_cards_layout
-from layouts.tables import create_tables_layout  # Import the new layout
-from layouts.contact import create_contact_layout  # Add this import at the top
-from layouts.notifications import create_notifications_layout
+from utils.cache import cache_stats
+from utils.single_flight import single_flight_stats
+from utils.warmup import warm_game, start_warm_poller, submit_precompute
+from utils.exports import register_export_routes
+from spai_data import register_health_routes
+
+# Pages, as "module:function", imported on their first visit so a worker only
+# loads the code (and libraries) of the pages it actually serves
+PAGES = {
+    '/': 'layouts.home:create_home_layout',  # Home page without sidebar
+    '/cards': 'layouts.game_cards_page:create_game_cards_layout',
+    '/season-overview': 'layouts.season_overview:create_season_overview',
+    '/tables': 'layouts.tables:create_tables_layout',
+    '/contact': 'layouts.contact:create_contact_layout',
+    '/notifications': 'layouts.notifications:create_notifications_layout'
+}
+GAME_PAGE = 'layouts.game_dashboard:create_game_dashboard'
+
+# Pages the browser keeps in its session cache, with the "module:function"
+# returning their current data version. A revisited page is rendered from the
+# browser cache when its version is unchanged.
+PAGE_VERSIONS = {
+    '/cards': 'components.game_card:game_cards_version'
+}
+GAME_PAGE_VERSION = 'layouts.game_dashboard:game_page_version'
+
+# Page modules defining callbacks are imported at startup, as Dash only
+# registers callbacks declared before the first request. They import their
+# heavy libraries inside functions instead.
+from layouts.game_dashboard import invalidate_game_data
+import layouts.season_overview  # noqa: F401
+import layouts.tables  # noqa: F401
+import layouts.game_cards_page  # noqa: F401
+import layouts.contact  # noqa: F401
+
+def load_page(target):
+    """Resolve a "module:function" page target, importing the module if needed"""
+    module_name, function_name = target.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
 
 # Initialize the app
 app = dash.Dash(
@@ -27,11 +64,67 @@ app = dash.Dash(
     suppress_callback_exceptions=True  # This is important for multi-page apps
 )
 
+server = app.server
+
+# Token required by the cache management endpoints; they refuse every request
+# while it is unset
+CACHE_ADMIN_TOKEN = os.getenv("SPAI_CACHE_TOKEN")
+
+def cache_request_allowed():
+    token = request.headers.get("X-Cache-Token") or ""
+    return bool(CACHE_ADMIN_TOKEN) and hmac.compare_digest(token.encode(), CACHE_ADMIN_TOKEN.encode())
+
+@server.route("/cache/stats")
+def cache_stats_endpoint():
+    """Expose hit/miss metrics of the server-side caches and request coalescing"""
+    if not cache_request_allowed():
+        return jsonify({"error": "forbidden"}), 403
+    return jsonify(dict(cache_stats(), single_flight=single_flight_stats()))
+
+@server.route("/cache/invalidate/<game_id>", methods=["POST"])
+def invalidate_game_endpoint(game_id):
+    """Called when a game is (re)processed so stale bundles are never served.
+
+    The bundle and figures are rebuilt right away on a small background pool,
+    so the first viewer of a freshly processed game gets a warm cache. Repeated
+    calls for a game that is still waiting to be rebuilt are merged.
+    """
+    if not cache_request_allowed():
+        return jsonify({"error": "forbidden"}), 403
+    invalidate_game_data(game_id)
+    return jsonify({"invalidated": game_id, "precompute_queued": submit_precompute(game_id)})
+
+@server.route("/cache/warm/<game_id>", methods=["POST"])
+def warm_game_endpoint(game_id):
+    """Called once a game is processed, before it is published.
+
+    Answers when the game's bundle and figures and the season pages are all
+    cached, so the processing run can publish the game right after. Answers
+    409 when the game could not be loaded as processed, so it is not published.
+    """
+    if not cache_request_allowed():
+        return jsonify({"error": "forbidden"}), 403
+    result = warm_game(game_id)
+    return jsonify(result), 200 if result['status'] == 'processed' else 409
+
+# Fallback warm-up of processed games that were not warmed by their run
+start_warm_poller()
+
+# Streaming CSV / NDJSON / Parquet downloads
+register_export_routes(server)
+
+# Liveness and cached database readiness checks
+register_health_routes(server, "client")
+
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
+    # Browser-side page cache (see assets/page_cache.js): rendered pages and
+    # their versions, kept for the browser tab's session
+    dcc.Store(id='page-render'),
+    dcc.Store(id='page-cache', storage_type='session'),
+    dcc.Store(id='page-cache-versions', storage_type='session'),
+    dcc.Store(id='page-cache-miss'),
     html.Div(id='page-content'),  # This will contain either the home page or the sidebar+content layout
-    dcc.Download(id="download-dataframe-csv"),
-    dcc.Download(id="download-json"),
 ])
 
 # Add a new callback to handle the page content structure
@@ -50,94 +143,54 @@ def render_page_structure(pathname):
             ], className="content")
         ], className="app-container")
 
-# Update the callback to handle page content
-@app.callback(
-    Output('page-layout', 'children'),
-    [Input('url', 'pathname')]
-)
-def display_page(pathname):
-    if pathname == '/':
-        return create_home_layout()  # Home page without sidebar
-    elif pathname == '/cards':
-        return create_game_cards_layout()
-    elif pathname == '/season-overview':
-        return create_season_overview()
-    elif pathname == '/tables':
-        return create_tables_layout()
-    elif pathname == '/contact':
-        return create_contact_layout()
-    elif pathname == '/notifications':
-        return create_notifications_layout()
+def render_page(pathname, version=None):
+    if pathname in PAGES:
+        return load_page(PAGES[pathname])()
     elif pathname and pathname.startswith('/game/'):
+        # The version checked for the page cache spares the dashboard a lookup
         game_id = pathname.split('/')[-1]
-        return create_game_dashboard(game_id)
+        return load_page(GAME_PAGE)(game_id, version)
+    elif pathname and pathname.startswith('/tables/'):
+        # Season tables plus the metrics and detections of one game
+        return load_page(PAGES['/tables'])(pathname.split('/')[-1])
     return "404 Page Not Found"
 
-@app.callback(
-    Output("download-dataframe-csv", "data"),
-    Input("export-csv-btn", "n_clicks"),
-    State('url', 'pathname'),
-    prevent_initial_call=True
-)
-def export_csv(n_clicks, pathname):
-    if n_clicks is None or n_clicks == 0:
-        return None
-    
-    if pathname and pathname.startswith('/game/'):
-        try:
-            game_id = pathname.split('/')[-1]
-            data = load_game_data(game_id)
-            
-            # Create DataFrame for each data type
-            sponsor_df = pd.DataFrame(data['value_data'])
-            visibility_df = pd.DataFrame(data['visibility_data'])
-            
-            # Combine into a single buffer
-            buffer = io.StringIO()
-            buffer.write("Sponsor Data:\n")
-            sponsor_df.to_csv(buffer, index=False)
-            buffer.write("\n\nVisibility Data:\n")
-            visibility_df.to_csv(buffer, index=False)
-            
-            return dict(
-                content=buffer.getvalue(),
-                filename=f"game_{game_id}_analysis.csv"
-            )
-        except Exception as e:
-            print(f"CSV Export Error: {str(e)}")
-            return None
+def get_page_version(pathname):
+    """Current data version of a cacheable page, None for pages never cached"""
+    try:
+        if pathname in PAGE_VERSIONS:
+            return load_page(PAGE_VERSIONS[pathname])()
+        elif pathname and pathname.startswith('/game/'):
+            return load_page(GAME_PAGE_VERSION)(pathname.split('/')[-1])
+    except Exception as e:
+        print(f"Error checking page version: {str(e)}")
     return None
 
+# Render the page, or only confirm that the browser's cached copy is current
 @app.callback(
-    Output("download-json", "data"),
-    Input("export-json-btn", "n_clicks"),
-    State('url', 'pathname'),
-    prevent_initial_call=True
+    Output('page-render', 'data'),
+    [Input('url', 'pathname'),
+     Input('page-cache-miss', 'data')],
+    [State('page-cache-versions', 'data')]
+)
+def display_page(pathname, cache_miss, cached_versions):
+    version = get_page_version(pathname)
+    if version and ctx.triggered_id != 'page-cache-miss' and (cached_versions or {}).get(pathname) == version:
+        return {'pathname': pathname, 'version': version, 'cached': True}
+    return {'pathname': pathname, 'version': version, 'layout': render_page(pathname, version)}
+
+# Show the rendered or cached page and keep the session cache up to date
+clientside_callback(
+    ClientsideFunction(namespace='pages', function_name='show_page'),
+    [Output('page-layout', 'children'),
+     Output('page-cache', 'data'),
+     Output('page-cache-versions', 'data'),
+     Output('page-cache-miss', 'data')],
+    [Input('page-render', 'data')],
+    [State('url', 'pathname'),
+     State('page-cache', 'data'),
+     State('page-cache-versions', 'data')]
 )
-def export_json(n_clicks, pathname):
-    if n_clicks is None or n_clicks == 0:
-        return None
-    
-    if pathname and pathname.startswith('/game/'):
-        try:
-            game_id = pathname.split('/')[-1]
-            data = load_game_data(game_id)
-            
-            # Format the data for JSON export
-            export_data = {
-                'game_info': data['game_info'],
-                'sponsor_data': data['value_data'],
-                'visibility_data': data['visibility_data']
-            }
-            
-            return dict(
-                content=json.dumps(export_data, indent=2, default=str),
-                filename=f"game_{game_id}_analysis.json"
-            )
-        except Exception as e:
-            print(f"JSON Export Error: {str(e)}")
-            return None
-    return None
 
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
\ No newline at end of file
@@ -0,0 +1,52 @@
+// assets/lazy_images.js
+// Lazy loading of images rendered with `data-src` (and optionally `data-srcset`),
+// such as the game card thumbnails. Dash's html.Img has no `loading` attribute,
+// so each image only gets its real source once it comes close to the viewport.
+
+(function () {
+    // Start loading a little before the image scrolls into view
+    const ROOT_MARGIN = '300px';
+
+    const isPending = img => img.dataset.src && img.dataset.lazyLoaded !== img.dataset.src;
+
+    const load = img => {
+        img.dataset.lazyLoaded = img.dataset.src;
+        if (img.dataset.srcset) {
+            img.srcset = img.dataset.srcset;
+        } else {
+            img.removeAttribute('srcset');
+        }
+        img.src = img.dataset.src;
+    };
+
+    const observer = 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                if (isPending(entry.target)) {
+                    load(entry.target);
+                }
+            }
+        }), { rootMargin: ROOT_MARGIN })
+        : null;
+
+    // Pick up images added by page renders, and images whose source changed
+    // when React reused them for another card
+    const scan = () => document.querySelectorAll('img[data-src]').forEach(img => {
+        if (isPending(img)) {
+            if (observer) {
+                observer.observe(img);
+            } else {
+                load(img);
+            }
+        }
+    });
+
+    new MutationObserver(scan).observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['data-src', 'data-srcset']
+    });
+    document.addEventListener('DOMContentLoaded', scan);
+})();
@@ -0,0 +1,67 @@
+// assets/leaderboard.js
+// Client-side sorting of the season sponsor leaderboard.
+// The rows are sent once in the "sponsor-leaderboard-store"; a sort click only
+// re-renders the table body in the browser, without a request to the server.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    season: {
+        sort_leaderboard: function (valueClicks, screenTimeClicks, efficiencyClicks, rows) {
+            const sortKeys = {
+                'sort-by-value': 'Total Value',
+                'sort-by-screentime': 'Total Screen Time',
+                'sort-by-efficiency': 'Value Per Second'
+            };
+            const triggered = window.dash_clientside.callback_context.triggered;
+            const buttonId = triggered.length ? triggered[0].prop_id.split('.')[0] : 'sort-by-value';
+            const sortBy = sortKeys[buttonId] || 'Total Value';
+
+            if (!rows || !rows.length) {
+                return [[], buttonId === 'sort-by-value', buttonId === 'sort-by-screentime', buttonId === 'sort-by-efficiency'];
+            }
+
+            const sorted = rows.slice().sort((a, b) => (b[sortBy] || 0) - (a[sortBy] || 0));
+            const maxValuePerSecond = Math.max(...rows.map(row => row['Value Per Second'] || 0));
+
+            const money = value => '$' + Number(value || 0).toLocaleString('en-US', {
+                minimumFractionDigits: 2, maximumFractionDigits: 2
+            });
+            const html = (type, props) => ({ namespace: 'dash_html_components', type: type, props: props });
+            const td = (children, className) => html('Td', { children: children, className: className });
+
+            const body = sorted.map((row, i) => html('Tr', {
+                className: i === 0 ? 'table-primary' : '',
+                children: [
+                    td(html('Div', {
+                        className: 'd-flex align-items-center',
+                        children: [
+                            html('Span', { children: `${i + 1}. `, className: 'me-2 text-muted' }),
+                            html('Strong', { children: row['Logo'] })
+                        ]
+                    })),
+                    td(money(row['Total Value']), 'text-end'),
+                    td(money(row['Value Per Second']), 'text-end'),
+                    td(Number(row['Total Screen Time'] || 0).toLocaleString('en-US', {
+                        minimumFractionDigits: 1, maximumFractionDigits: 1
+                    }), 'text-end'),
+                    td(Number(row['Total Appearances'] || 0).toLocaleString('en-US'), 'text-end'),
+                    td(String(row['Games Sponsored']), 'text-end'),
+                    td(html('Div', {
+                        className: 'd-flex align-items-center',
+                        children: {
+                            namespace: 'dash_bootstrap_components',
+                            type: 'Progress',
+                            props: {
+                                value: maxValuePerSecond ? Math.min((row['Value Per Second'] || 0) / maxValuePerSecond * 100, 100) : 0,
+                                className: 'mb-0',
+                                style: { height: '8px' },
+                                color: 'success'
+                            }
+                        }
+                    }), 'text-center')
+                ]
+            }));
+
+            return [body, buttonId === 'sort-by-value', buttonId === 'sort-by-screentime', buttonId === 'sort-by-efficiency'];
+        }
+    }
+});
@@ -0,0 +1,49 @@
+// assets/page_cache.js
+// Browser-side cache of rendered pages, kept in session storage.
+// Revisited game dashboards and the cards grid are rendered from the cache;
+// the server only confirms that their data version is unchanged. Dashboard
+// charts are not part of the stored page: they load lazily per tab, so a
+// revisit fetches them again (from the server's figure cache).
+
+// Pages kept per browser tab; the least recently stored ones are dropped first
+const PAGE_CACHE_SIZE = 20;
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    pages: {
+        show_page: function (render, pathname, cache, versions) {
+            const noUpdate = window.dash_clientside.no_update;
+
+            // A render of a page the user already navigated away from
+            if (!render || render.pathname !== pathname) {
+                return [noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+
+            if (render.cached) {
+                const entry = (cache || {})[pathname];
+                if (entry && entry.version === render.version) {
+                    return [entry.layout, noUpdate, noUpdate, noUpdate];
+                }
+                // Versions and pages out of step: have the server render the page
+                const current = Object.assign({}, versions);
+                delete current[pathname];
+                return [noUpdate, noUpdate, current, Date.now()];
+            }
+
+            if (!render.version) {
+                return [render.layout, noUpdate, noUpdate, noUpdate];
+            }
+
+            const entries = Object.assign({}, cache);
+            entries[pathname] = { version: render.version, layout: render.layout, stored: Date.now() };
+            Object.keys(entries)
+                .sort((a, b) => entries[b].stored - entries[a].stored)
+                .slice(PAGE_CACHE_SIZE)
+                .forEach(key => delete entries[key]);
+
+            const entryVersions = {};
+            Object.keys(entries).forEach(key => { entryVersions[key] = entries[key].version; });
+
+            return [render.layout, entries, entryVersions, noUpdate];
+        }
+    }
+});
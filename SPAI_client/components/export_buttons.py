@@ -1,20 +1,28 @@
 import dash_bootstrap_components as dbc
 from dash import html
 
-def create_export_buttons():
+# (label, icon, format) of every export offered in the menu
+EXPORT_OPTIONS = [
+    ("CSV", "fas fa-file-csv", "csv"),
+    ("NDJSON", "fas fa-file-code", "ndjson"),
+    ("Parquet", "fas fa-database", "parquet"),
+]
+
+def create_export_buttons(export_url):
+    """Export menu linking to the streaming export endpoint at export_url"""
+    def export_item(label, icon, fmt, detections=False):
+        return dbc.DropdownMenuItem([
+            html.I(className=f"{icon} me-2"),
+            label
+        ], href=f"{export_url}.{fmt}" + ("?detections=1" if detections else ""),
+           external_link=True)
+
     return html.Div([
         dbc.DropdownMenu(
-            [
-                dbc.DropdownMenuItem([
-                    html.I(className="fas fa-file-csv me-2"),
-                    "CSV"
-                ], id="export-csv-btn", n_clicks=0),
-                
-                dbc.DropdownMenuItem([
-                    html.I(className="fas fa-file-code me-2"),
-                    "JSON"
-                ], id="export-json-btn", n_clicks=0),
-            ],
+            [export_item(label, icon, fmt) for label, icon, fmt in EXPORT_OPTIONS] + [
+                dbc.DropdownMenuItem(divider=True),
+                dbc.DropdownMenuItem("With raw detections", header=True),
+            ] + [export_item(label, icon, fmt, detections=True) for label, icon, fmt in EXPORT_OPTIONS],
             label=[
                 html.I(className="fas fa-download me-2"),
                 "Export Data As..."
@@ -22,4 +30,4 @@ def create_export_buttons():
             color="primary",
             className="export-dropdown"  
         )
-    ])
\ No newline at end of file
+    ])
@@ -1,19 +1,53 @@
 import dash_bootstrap_components as dbc
 from dash import html
 from datetime import datetime
-from utils.supabase_client import supabase
+import hashlib
+import json
+import os
+from spai_data import GameRepository, is_missing_schema_error
+from utils.cache import season_cache
+
+# Games per page of the cards grid
+CARDS_PAGE_SIZE = int(os.getenv("SPAI_CARDS_PAGE_SIZE", "24"))
+
+CARD_COLUMNS = ['id', 'home_team', 'away_team', 'match_date', 'competition', 'thumbnail']
+
+def fetch_game_cards_page(page=0):
+    """Return one page of processed games, latest match first, and the total count.
+
+    The first page, which every visit of the cards grid starts on, is cached
+    briefly; later pages are small queries of their own.
+    """
+    if page == 0:
+        cached = season_cache.get('game_cards')
+        if cached is not None:
+            return cached
 
-def fetch_processed_games():
-    """Fetch all processed games from Supabase"""
     try:
-        response = supabase.table('games')\
-            .select('id, home_team, away_team, match_date, competition, thumbnail')\
-            .eq('status', 'processed')\
-            .execute()
-        return response.data
+        try:
+            games, total = GameRepository.processed_page(
+                CARD_COLUMNS + ['thumbnail_variants'], page, CARDS_PAGE_SIZE
+            )
+        except Exception as e:
+            if not is_missing_schema_error(e):
+                raise
+            print(f"Thumbnail variants not migrated, using originals: {str(e)}")
+            games, total = GameRepository.processed_page(CARD_COLUMNS, page, CARDS_PAGE_SIZE)
     except Exception as e:
         print(f"Error fetching games: {str(e)}")
-        return []
+        return [], 0
+
+    if page == 0 and games:
+        season_cache.set('game_cards', (games, total))
+    return games, total
+
+def game_cards_version():
+    """Data version of the cards page: a digest of its first page of games"""
+    games, total = fetch_game_cards_page()
+    if not games:
+        return None
+    payload = json.dumps([games, total], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
 def format_date(date_str):
     """Format date string to a readable format"""
@@ -23,15 +57,45 @@ def format_date(date_str):
     except:
         return date_str
 
+# Rendered card image width at each grid breakpoint, for the browser to pick a variant
+CARD_IMAGE_SIZES = "(min-width: 992px) 25vw, (min-width: 768px) 33vw, (min-width: 576px) 50vw, 100vw"
+
+# Variant used where the browser cannot choose from a srcset
+CARD_IMAGE_FALLBACK_WIDTH = 640
+
+def thumbnail_sources(game):
+    """Return (src, srcset) of a game's card image.
+
+    Uses the resized WebP variants when the game has them, with the JPEG
+    variant closest to the card size as the plain source, and falls back to
+    the original thumbnail.
+    """
+    variants = game.get('thumbnail_variants') or []
+    webp = sorted((v for v in variants if v.get('format') == 'webp'), key=lambda v: v['width'])
+    jpeg = sorted((v for v in variants if v.get('format') == 'jpeg'), key=lambda v: v['width'])
+
+    src = game.get('thumbnail') or "https://via.placeholder.com/300x180?text=No+Image"
+    if jpeg:
+        src = min(jpeg, key=lambda v: abs(v['width'] - CARD_IMAGE_FALLBACK_WIDTH))['url']
+    srcset = ', '.join(f"{v['url']} {v['width']}w" for v in webp) or None
+    return src, srcset
+
 def create_game_card(game):
     """Create a card component for a game"""
-    # Default image in case thumbnail is not available
-    thumbnail_url = game.get('thumbnail') or "https://via.placeholder.com/300x180?text=No+Image"
-    
+    src, srcset = thumbnail_sources(game)
+    image_sources = {"data-src": src}
+    if srcset:
+        image_sources["data-srcset"] = srcset
+
     return dbc.Card([
-        # Add thumbnail image at the top of the card
-        dbc.CardImg(src=thumbnail_url, top=True, 
-                   style={"height": "180px", "objectFit": "cover"}),
+        # Thumbnail, loaded once the card comes into view (assets/lazy_images.js)
+        html.Img(
+            className="card-img-top",
+            sizes=CARD_IMAGE_SIZES,
+            alt=f"{game['home_team']} vs {game['away_team']}",
+            style={"height": "180px", "objectFit": "cover", "backgroundColor": "#f1f3f5"},
+            **image_sources
+        ),
         dbc.CardBody([
             # Competition badge
             html.Div(
@@ -1,6 +1,6 @@
 from dash import html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
-from utils.supabase_client import supabase
+from spai_data import ContactRepository
 import json
 
 def create_contact_layout():
@@ -97,12 +97,7 @@ def submit_contact_form(n_clicks, name, email, subject, message):
             return html.Div("Please fill in all fields", className="text-danger"), name, email, subject, message
         
         # Submit to Supabase
-        data = supabase.table('contact_submissions').insert({
-            "name": name,
-            "email": email,
-            "subject": subject,
-            "message": message
-        }).execute()
+        ContactRepository.submit(name, email, subject, message)
         
         # Return success message and reset all inputs
         return (
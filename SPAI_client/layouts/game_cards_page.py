@@ -1,30 +1,48 @@
-# layouts/home.py
-from dash import html
+# layouts/game_cards_page.py
+import math
+from dash import html, callback, Input, Output
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from components.game_card import create_game_card, fetch_processed_games
-from datetime import datetime
+from components.game_card import create_game_card, fetch_game_cards_page, CARDS_PAGE_SIZE
+
+def create_cards_grid(games):
+    return [
+        dbc.Col(
+            create_game_card(game),
+            xs=12, sm=6, md=4, lg=3,
+            className="mb-4"
+        ) for game in games
+    ]
 
 def create_game_cards_layout():
-    # Fetch processed games from Supabase
-    games = fetch_processed_games()
-    
-    # Sort games by date (newest first)
-    sorted_games = sorted(
-        games,
-        key=lambda game: datetime.fromisoformat(game.get('match_date', '1970-01-01').replace('Z', '+00:00')),
-        reverse=True  # Newest first
-    )
-    
+    # First page of processed games, latest match first (sorted by the database)
+    games, total = fetch_game_cards_page()
+
     return html.Div([
         # Header
         html.H2("Match Analysis", className="mb-4"),
-        
+
         # Cards grid
-        dbc.Row([
-            dbc.Col(
-                create_game_card(game),
-                xs=12, sm=6, md=4, lg=3,
-                className="mb-4"
-            ) for game in sorted_games
-        ])
-    ], className="p-4")
\ No newline at end of file
+        dbc.Row(create_cards_grid(games), id="cards-grid"),
+
+        # Further pages are fetched one at a time by the callback below
+        dbc.Pagination(
+            id="cards-pagination",
+            active_page=1,
+            max_value=max(1, math.ceil(total / CARDS_PAGE_SIZE)),
+            fully_expanded=False,
+            previous_next=True,
+            className="justify-content-center mt-2"
+        ) if total > CARDS_PAGE_SIZE else None
+    ], className="p-4")
+
+@callback(
+    Output("cards-grid", "children"),
+    Input("cards-pagination", "active_page"),
+    prevent_initial_call=True
+)
+def change_cards_page(active_page):
+    if not active_page:
+        raise PreventUpdate
+    games, _ = fetch_game_cards_page(active_page - 1)
+    return create_cards_grid(games)
@@ -1,24 +1,110 @@
 # layouts/game_dashboard.py
 import dash_bootstrap_components as dbc
-from dash import html, dcc
-import plotly.express as px
-import pandas as pd
-import numpy as np
+from dash import html, dcc, callback, Input, Output, State, ctx
+from dash.exceptions import PreventUpdate
 from components.export_buttons import create_export_buttons
-from utils.supabase_client import supabase
+from utils.cache import game_cache, game_flight, game_version, CACHE_DIR
+from spai_data import (
+    GameRepository, MetricsRepository, TimelineRepository, HeatmapRepository, is_missing_schema_error
+)
+from utils.game_figures import (
+    get_game_figure, get_game_figures, get_timeline_window, invalidate_game_figures, order_value_data
+)
 import json
 
-def load_game_data(game_id):
+# Dashboard tabs: (tab id, label, [(chart, column width on large screens)])
+GAME_CHART_TABS = [
+    ('timeline', 'Visibility Timeline', [('timeline', 12)]),
+    ('screen-time', 'Screen Time', [('pie', 6), ('bar', 6)]),
+    ('positions', 'Positions', [('position', 12)]),
+    ('heatmap', 'Position Heatmap', [('heatmap', 12)])
+]
+
+# Chart name -> id of the tab it is shown in
+CHART_TABS = {chart: tab_id for tab_id, _, tab_charts in GAME_CHART_TABS for chart, _ in tab_charts}
+
+def load_game_data(game_id, version=None):
+    """Return the data bundle of a game, served from cache when possible.
+
+    Only processed games are cached: their data never changes until the game
+    is reprocessed, at which point the entry is invalidated explicitly.
+    Without the shared disk tier an invalidation only reaches the worker that
+    received it, so the cached bundle must match the game's current version.
+    That version is resolved once per page render and passed in by the
+    dashboard's callbacks; it is only looked up here when not given.
+    Concurrent misses for the same game wait for a single fetch.
+    """
+    if version is None:
+        version = cached_version_check(game_id)
+    key = str(game_id)
+    data = game_cache.get(key, version=version)
+    if data is not None:
+        return data
+    return game_flight.do(key, fetch_and_cache_game_data, game_id, version)
+
+def fetch_and_cache_game_data(game_id, version=None):
+    # Another worker may have filled the cache while we waited for the lock
+    key = str(game_id)
+    data = game_cache.get(key, version=version)
+    if data is not None:
+        return data
+
+    data = fetch_game_bundle(game_id)
+    if data is not None and data['status'] == 'processed':
+        game_cache.set(key, data, version=data['version'])
+    return data
+
+def current_game_version(game_id):
+    """Data version of a game, read from its status and processed_at only"""
+    try:
+        game = GameRepository.get(game_id, 'status, processed_at')
+    except Exception as e:
+        if not is_missing_schema_error(e):
+            raise
+        game = GameRepository.get(game_id, 'status')
+    return game_version(game)
+
+def cached_version_check(game_id):
+    """Version a cached bundle must match, None when invalidations are shared"""
+    if CACHE_DIR:
+        return None
+    try:
+        return current_game_version(game_id)
+    except Exception as e:
+        print(f"Error checking game version: {str(e)}")
+        return None
+
+def invalidate_game_data(game_id):
+    """Drop the cached bundle and figures of a game, e.g. after it has been reprocessed."""
+    game_cache.invalidate(str(game_id))
+    invalidate_game_figures(game_id)
+
+def precompute_game_data(game_id):
+    """Fill the bundle and figure caches of a processed game ahead of the first viewer"""
+    data = load_game_data(game_id)
+    if data is not None and data['status'] == 'processed':
+        get_game_figures(game_id, data)
+    return data
+
+def game_page_version(game_id):
+    """Data version of a game dashboard, or None if the browser should not cache it.
+
+    Reads only the game's status and processed_at, so checking a revisit never
+    loads the bundle of a game that is not cached.
+    """
+    version = current_game_version(game_id)
+    return version if version.startswith('processed:') else None
+
+def fetch_game_bundle(game_id):
+    """Fetch game info, metrics, timeline and heatmap data from Supabase"""
+    import pandas as pd
+
     try:
         # Fetch game info
-        game = supabase.table('games')\
-            .select('*')\
-            .eq('id', game_id)\
-            .single()\
-            .execute()
+        game = GameRepository.get(game_id)
 
         # Format the date to remove time component
-        match_date = game.data['match_date']
+        match_date = game['match_date']
         if match_date and 'T' in match_date:
             formatted_date = match_date.split('T')[0]  # Extract just the date part
         else:
@@ -33,37 +119,27 @@ def load_game_data(game_id):
             pass
 
         # Fetch logo metrics - using the metrics calculated by the processing script
-        metrics = supabase.table('logo_metrics')\
-            .select('''
-                logo_name,
-                visibility_time,
-                appearances,
-                unique_appearances,
-                avg_sequence_duration,
-                avg_area_percentage,
-                avg_position_score,
-                dominant_position,
-                dominant_size,
-                center_percentage,
-                edge_percentage,
-                corner_percentage,
-                sponsorship_value
-            ''')\
-            .eq('game_id', game_id)\
-            .execute()
-
-        # Fetch timeline data for visibility chart
-        timeline = supabase.table('logo_timeline')\
-            .select('timestamp, logo_name, sponsor_score')\
-            .eq('game_id', game_id)\
-            .order('timestamp')\
-            .execute()
+        metrics = MetricsRepository.for_game(game_id, [
+            'logo_name',
+            'visibility_time',
+            'appearances',
+            'unique_appearances',
+            'avg_sequence_duration',
+            'avg_area_percentage',
+            'avg_position_score',
+            'dominant_position',
+            'dominant_size',
+            'center_percentage',
+            'edge_percentage',
+            'corner_percentage',
+            'sponsorship_value'
+        ])
+
+        # Fetch timeline data for visibility chart, page by page past the row cap
+        timeline = TimelineRepository.for_game(game_id)
 
         # Fetch heatmap data
-        heatmaps = supabase.table('logo_heatmaps')\
-            .select('logo_name, positions')\
-            .eq('game_id', game_id)\
-            .execute()
+        heatmaps = HeatmapRepository.for_game(game_id)
 
         # Process metrics for value cards
         value_data = [
@@ -77,23 +153,19 @@ def load_game_data(game_id):
                 'dominant_position': metric['dominant_position'],
                 'center_percentage': metric['center_percentage']
             }
-            for metric in metrics.data
+            for metric in metrics.to_dict('records')
         ]
 
         # Process timeline data for visibility chart
         # The data structure is already optimized in the timeline table
-        visibility_data = [
-            {
-                'timestamp': entry['timestamp'],
-                'logo': entry['logo_name'],
-                'visibility_score': entry['sponsor_score']
-            }
-            for entry in timeline.data
-        ]
+        visibility_data = timeline.rename(columns={
+            'logo_name': 'logo',
+            'sponsor_score': 'visibility_score'
+        })
 
         # Process heatmap data - properly handle positions JSON
         heatmap_data = []
-        for hm in heatmaps.data:
+        for hm in heatmaps:
             # Check if positions is already a list or needs parsing
             positions = hm['positions']
             if isinstance(positions, str):
@@ -109,14 +181,16 @@ def load_game_data(game_id):
 
         return {
             'game_info': {
-                'home_team': game.data['home_team'],
-                'away_team': game.data['away_team'],
+                'home_team': game['home_team'],
+                'away_team': game['away_team'],
                 'date': formatted_date,
-                'competition': game.data['competition']
+                'competition': game['competition']
             },
-            'visibility_data': pd.DataFrame(visibility_data),
+            'visibility_data': visibility_data,
             'heatmap_data': pd.DataFrame(heatmap_data),
-            'value_data': pd.DataFrame(value_data)
+            'value_data': pd.DataFrame(value_data),
+            'status': game.get('status'),
+            'version': game_version(game)
         }
         
     except Exception as e:
@@ -152,8 +226,8 @@ def get_logo_image_mapping():
         'UNHCR_logo': '/assets/images/UNHCR_logo.png'
     }
 
-def create_game_dashboard(game_id):
-    data = load_game_data(game_id)
+def create_game_dashboard(game_id, version=None):
+    data = load_game_data(game_id, version)
     
     # Return loading state if no data
     if data is None:
@@ -170,22 +244,20 @@ def create_game_dashboard(game_id):
                   className="text-muted")
         ], width=True),
         dbc.Col([
-            create_export_buttons()
+            dbc.Button([
+                html.I(className="fas fa-table me-2"),
+                "Detections Table"
+            ], href=f"/tables/{game_id}", color="primary", outline=True, className="me-2"),
+            create_export_buttons(f"/export/game/{game_id}")
         ], width="auto", className="d-flex align-items-center")
     ], className="mb-4 align-items-center")
 
     # Create value cards with enhanced metrics and specific order
     try:
-        value_df = pd.DataFrame(data['value_data'])
-        
-        # Define card order: Spotify first, AMBILIGHTtv third
-        card_order = ['spotify_logo', 'nike_logo', 'AMBILIGHTtv_logo', 'UNHCR_logo']
-        
-        # Map order position to each logo
-        value_df['sort_order'] = value_df['logo'].map({logo: idx for idx, logo in enumerate(card_order)})
+        value_df = data['value_data'].copy()
         
-        # Sort by defined order
-        value_df = value_df.sort_values('sort_order').reset_index(drop=True)
+        # Sort by defined card order: Spotify first, AMBILIGHTtv third
+        value_df = order_value_data(value_df)
         
         # Create sponsor value cards
         value_cards = dbc.Row([
@@ -221,210 +293,119 @@ def create_game_dashboard(game_id):
         print(f"Error creating value cards: {str(e)}")
         value_cards = html.Div("Error loading sponsor data", className="text-danger")
 
-    # Apply same ordering to the chart data
-    try:
-        # Also sort the value data for charts to maintain consistency
-        for chart_data in [data['value_data']]:
-            if not chart_data.empty:
-                chart_data['sort_order'] = chart_data['logo'].map({logo: idx for idx, logo in enumerate(card_order)})
-                chart_data.sort_values('sort_order', inplace=True)
-                chart_data.reset_index(drop=True, inplace=True)
-                if 'sort_order' in chart_data.columns:
-                    chart_data.drop('sort_order', axis=1, inplace=True)
-        
-        # Rest of the visualization code remains the same...
-    except Exception as e:
-        print(f"Error ordering chart data: {str(e)}")
-        
-    # Create visualization charts
-    try:
-        # Visibility timeline
-        timeline_fig = px.line(
-            data['visibility_data'], 
-            x='timestamp', 
-            y='visibility_score',
-            color='logo',
-            title='Sponsor Visibility Score Over Time',
-            labels={'timestamp': 'Match Time (seconds)', 
-                    'visibility_score': 'Visibility Score'}
-        )
-        timeline_fig.update_layout(
-            hovermode='x unified',
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            margin=dict(t=50, b=20, l=20, r=20)
-        )
-        # Add grid for better visibility
-        timeline_fig.update_xaxes(
-            showgrid=True,
-            gridwidth=0.5,
-            gridcolor='rgba(211, 211, 211, 0.5)'
-        )
-        timeline_fig.update_yaxes(
-            showgrid=True,
-            gridwidth=0.5,
-            gridcolor='rgba(211, 211, 211, 0.5)'
-        )
-
-        # Screen time distribution pie chart
-        pie_fig = px.pie(
-            data['value_data'],
-            values='screen_time',
-            names='logo',
-            title='Share of Screen Time'
-        )
-        pie_fig.update_layout(
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            margin=dict(t=50, b=20, l=20, r=20)
-        )
-
-        # Appearances bar chart
-        bar_fig = px.bar(
-            data['value_data'],
-            x='logo',
-            y='appearances',
-            color='logo',
-            title='Number of Logo Appearances'
-        )
-        bar_fig.update_layout(
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            showlegend=False,
-            margin=dict(t=50, b=20, l=20, r=20)
-        )
-        # Add grid for better visibility
-        bar_fig.update_yaxes(
-            showgrid=True,
-            gridwidth=0.5,
-            gridcolor='rgba(211, 211, 211, 0.5)'
-        )
-
-        # Position heatmap
-        heatmap_fig = px.density_heatmap(
-            data['heatmap_data'],
-            x='x', 
-            y='y',
-            facet_col='logo',
-            title='Logo Position Heatmap',
-            nbinsx=30,
-            nbinsy=17,
-            z='score' if 'score' in data['heatmap_data'].columns else None
-        )
-        
-        # Update heatmap layout with screen proportions and grid
-        heatmap_fig.update_layout(
-            height=500,
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            margin=dict(t=50, b=20, l=20, r=20)
-        )
-
-        # Update axes to match screen coordinates with enhanced grid
-        heatmap_fig.update_yaxes(
-            scaleanchor="x",
-            scaleratio=9/16,  # Screen aspect ratio
-            range=[1, 0],     # Flip Y axis to match screen coordinates
-            gridcolor='rgba(180, 180, 180, 0.7)',
-            gridwidth=0.7,
-            showgrid=True
-        )
-        
-        heatmap_fig.update_xaxes(
-            gridcolor='rgba(180, 180, 180, 0.7)',
-            gridwidth=0.7,
-            showgrid=True
-        )
-
-        # Add position distribution chart
-        position_data = data['value_data'][['logo', 'center_percentage']].copy()
-        position_data['edge_percentage'] = data['value_data']['center_percentage']
-        position_data['corner_percentage'] = 100 - position_data['center_percentage'] - position_data['edge_percentage']
-        
-        position_data = position_data.melt(
-            id_vars=['logo'],
-            value_vars=['center_percentage', 'edge_percentage', 'corner_percentage'],
-            var_name='position',
-            value_name='percentage'
-        )
-        
-        position_fig = px.bar(
-            position_data,
-            x='logo',
-            y='percentage',
-            color='position',
-            title='Logo Position Distribution',
-            labels={'percentage': 'Percentage (%)', 'position': 'Position'}
-        )
-        position_fig.update_layout(
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            margin=dict(t=50, b=20, l=20, r=20),
-            barmode='stack'
-        )
-        # Add grid for better visibility
-        position_fig.update_yaxes(
-            showgrid=True,
-            gridwidth=0.5,
-            gridcolor='rgba(211, 211, 211, 0.5)'
-        )
-
-        # Arrange charts in layout
-        graphs = [
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dcc.Graph(figure=timeline_fig)
-                        ])
-                    ], className="shadow-sm")
-                ], width=12)
-            ], className="mb-4"),
-            
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dcc.Graph(figure=pie_fig)
-                        ])
-                    ], className="shadow-sm")
-                ], width=12, lg=6),
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dcc.Graph(figure=bar_fig)
-                        ])
-                    ], className="shadow-sm")
-                ], width=12, lg=6)
-            ], className="mb-4"),
-            
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dcc.Graph(figure=position_fig)
-                        ])
-                    ], className="shadow-sm")
-                ], width=12)
-            ], className="mb-4"),
-            
-            dbc.Row([
-                dbc.Col([
-                    dbc.Card([
-                        dbc.CardBody([
-                            dcc.Graph(figure=heatmap_fig)
-                        ])
-                    ], className="shadow-sm")
-                ], width=12)
-            ], className="mb-4")
-        ]
-    except Exception as e:
-        print(f"Error creating graphs: {str(e)}")
-        graphs = [html.Div(f"Error loading visualizations: {str(e)}", className="text-danger p-3")]
+    # Charts are loaded lazily, tab by tab, by the callbacks below. The browser
+    # page cache stores the page before they load, so a revisit loads them
+    # again, from the server's figure cache.
+    charts = html.Div([
+        dcc.Store(id='game-id-store', data=str(game_id)),
+        # Version of the bundle shown, so chart loads need no version lookup
+        dcc.Store(id='game-version-store', data=data['version']),
+        *[dcc.Store(id=f'game-chart-{chart}-loaded', data=False) for chart in CHART_TABS],
+        dbc.Tabs([
+            dbc.Tab(
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardBody([
+                                dcc.Loading(
+                                    dcc.Graph(id=f'game-chart-{chart}'),
+                                    type="circle"
+                                )
+                            ])
+                        ], className="shadow-sm")
+                    ], width=12, lg=width, className="mb-4")
+                    for chart, width in tab_charts
+                ], className="mt-4"),
+                label=label,
+                tab_id=tab_id
+            )
+            for tab_id, label, tab_charts in GAME_CHART_TABS
+        ], id='game-chart-tabs', active_tab=GAME_CHART_TABS[0][0])
+    ])
 
-    # Return the complete dashboard layout
+    # Return the header and value cards right away; charts follow
     return html.Div([
         header,
         value_cards,
-        *graphs
-    ], className="dashboard-container p-4")
\ No newline at end of file
+        charts
+    ], className="dashboard-container p-4")
+
+def register_chart_callback(chart):
+    """Load one chart the first time its tab is shown"""
+    @callback(
+        [Output(f'game-chart-{chart}', 'figure'),
+         Output(f'game-chart-{chart}-loaded', 'data')],
+        [Input('game-chart-tabs', 'active_tab')],
+        [State('game-id-store', 'data'),
+         State('game-version-store', 'data'),
+         State(f'game-chart-{chart}-loaded', 'data')]
+    )
+    def load_chart(active_tab, game_id, version, loaded):
+        if loaded or active_tab != CHART_TABS[chart] or not game_id:
+            raise PreventUpdate
+
+        data = load_game_data(game_id, version)
+        if data is None:
+            raise PreventUpdate
+
+        try:
+            return get_game_figure(game_id, chart, data), True
+        except Exception as e:
+            print(f"Error creating {chart} chart: {str(e)}")
+            raise PreventUpdate
+
+    return load_chart
+
+def parse_x_range(relayout_data):
+    """Return (x_range, changed) from a graph's relayoutData"""
+    if not relayout_data:
+        return None, False
+    if relayout_data.get('xaxis.autorange'):
+        return None, True
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return (float(relayout_data['xaxis.range[0]']), float(relayout_data['xaxis.range[1]'])), True
+    if 'xaxis.range' in relayout_data:
+        x0, x1 = relayout_data['xaxis.range']
+        return (float(x0), float(x1)), True
+    return None, False
+
+@callback(
+    [Output('game-chart-timeline', 'figure'),
+     Output('game-chart-timeline-loaded', 'data')],
+    [Input('game-chart-tabs', 'active_tab'),
+     Input('game-chart-timeline', 'relayoutData')],
+    [State('game-id-store', 'data'),
+     State('game-version-store', 'data'),
+     State('game-chart-timeline-loaded', 'data')]
+)
+def load_timeline_chart(active_tab, relayout_data, game_id, version, loaded):
+    """Load the timeline with its tab, and refine it when the user zooms"""
+    if not game_id:
+        raise PreventUpdate
+
+    if ctx.triggered_id == 'game-chart-timeline':
+        x_range, changed = parse_x_range(relayout_data)
+        if not loaded or not changed:
+            raise PreventUpdate
+    elif loaded or active_tab != CHART_TABS['timeline']:
+        raise PreventUpdate
+    else:
+        x_range = None
+
+    data = load_game_data(game_id, version)
+    if data is None:
+        raise PreventUpdate
+
+    try:
+        if x_range is None:
+            # Full match view: the cached, downsampled figure
+            return get_game_figure(game_id, 'timeline', data), True
+        return get_timeline_window(data, x_range), True
+    except Exception as e:
+        print(f"Error creating timeline chart: {str(e)}")
+        raise PreventUpdate
+
+# The timeline has its own callback above, as it also reacts to zooming
+for chart_name in CHART_TABS:
+    if chart_name != 'timeline':
+        register_chart_callback(chart_name)
@@ -1,19 +1,21 @@
 from dash import html
 import dash_bootstrap_components as dbc
 from datetime import datetime
-from utils.supabase_client import supabase
+from spai_data import GameRepository, is_missing_schema_error
 
 def get_recent_games(limit=5):
-    """Fetch recently added games from Supabase"""
+    """Fetch recently published games from Supabase"""
+    columns = 'id, home_team, away_team, match_date, status'
     try:
-        response = supabase.table('games')\
-            .select('id, home_team, away_team, match_date, status')\
-            .eq('status', 'processed')\
-            .order('created_at', desc=True)\
-            .limit(limit)\
-            .execute()
-        
-        games = response.data
+        try:
+            # Games only appear once their caches have been warmed
+            games = GameRepository.recently_published(columns, limit)
+        except Exception as e:
+            if not is_missing_schema_error(e):
+                raise
+            print(f"Published games not migrated, listing processed games: {str(e)}")
+            games = GameRepository.list_games(columns, status='processed', limit=limit)
+
         notifications = []
         
         for game in games:
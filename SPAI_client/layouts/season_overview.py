@@ -1,169 +1,165 @@
 # layouts/season_overview.py
 import dash_bootstrap_components as dbc
-from dash import html, dcc, callback, Input, Output, ctx
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from utils.supabase_client import supabase
-import numpy as np
-from datetime import datetime
+from dash import html, dcc, Input, Output, State, clientside_callback, ClientsideFunction
+from components.export_buttons import create_export_buttons
+from spai_data import GameRepository, MetricsRepository, is_missing_schema_error
+from utils.cache import season_cache, season_flight
+
+# pandas, numpy and Plotly are imported inside the functions below: this module
+# is loaded at startup to register its callback, but only season page views
+# need them
 
 def load_season_data():
+    """Load season data, cached briefly; concurrent page views share one load"""
+    data = season_cache.get('season_overview')
+    if data is None:
+        data = season_flight.do('season_overview', load_and_cache_season_data)
+    return data
+
+def load_and_cache_season_data():
+    data = load_season_data_uncoalesced()
+    if data is not None:
+        season_cache.set('season_overview', data)
+    return data
+
+def load_season_data_uncoalesced():
+    """Load season data from the aggregate tables, falling back to a full scan"""
+    try:
+        return load_season_data_from_aggregates()
+    except Exception as e:
+        if not is_missing_schema_error(e):
+            print(f"Error loading season aggregates: {str(e)}")
+            return None
+        print(f"Season aggregates not migrated, scanning all games: {str(e)}")
+        return load_season_data_from_scan()
+
+def load_season_data_from_aggregates():
+    """Read the small, incrementally maintained season aggregate tables"""
+    from utils.season_aggregates import (
+        fetch_season_aggregates, sponsor_stats_from_aggregates,
+        count_processed_games, growth_from_aggregates, competitions_from_aggregates
+    )
+
+    aggregates = fetch_season_aggregates()
+    if aggregates['logos'].empty:
+        return None
+
+    return build_season_summary(
+        sponsor_stats=sponsor_stats_from_aggregates(aggregates['logos']),
+        total_games=count_processed_games(),
+        growth_data=growth_from_aggregates(aggregates['dates']),
+        competition_data=competitions_from_aggregates(aggregates['competitions'])
+    )
+
+def build_season_summary(sponsor_stats, total_games, growth_data, competition_data):
+    """Add season totals and comparison figures to the aggregated frames"""
+    total_value = sponsor_stats['Total Value'].sum()
+    total_appearances = sponsor_stats['Total Appearances'].sum()
+
+    # Calculate averages
+    avg_value_per_game = total_value / total_games if total_games > 0 else 0
+    avg_appearances_per_game = total_appearances / total_games if total_games > 0 else 0
+
+    # Set previous period metrics (for comparison)
+    # In a real app, these would come from historical data
+    prev_total_value = total_value * 0.9  # Just example values
+    prev_avg_value_per_game = avg_value_per_game * 0.9
+    prev_total_appearances = total_appearances * 0.9
+    prev_total_games = max(0, total_games - 2)
+
+    return {
+        'sponsor_stats': sponsor_stats,
+        'total_games': total_games,
+        'total_value': total_value,
+        'total_appearances': total_appearances,
+        'avg_value_per_game': avg_value_per_game,
+        'avg_appearances_per_game': avg_appearances_per_game,
+        'growth_data': growth_data,
+        'competition_data': competition_data,
+        'prev_total_value': prev_total_value,
+        'prev_avg_value_per_game': prev_avg_value_per_game,
+        'prev_total_appearances': prev_total_appearances,
+        'prev_total_games': prev_total_games
+    }
+
+def load_season_data_from_scan():
     """Load and aggregate data from all processed games"""
+    from utils.season_analytics import compute_season_analytics
+
     try:
         # Get all processed games from Supabase
-        games = supabase.table('games')\
-            .select('id, home_team, away_team, match_date, competition, thumbnail')\
-            .eq('status', 'processed')\
-            .execute()
+        df_games = GameRepository.processed_frame(['id', 'match_date', 'competition'])
+        if df_games.empty:
+            return None
 
-        # Get logo metrics for all games
-        metrics = supabase.table('logo_metrics')\
-            .select('''
-                game_id,
-                logo_name,
-                visibility_time,
-                appearances,
-                sponsorship_value,
-                avg_area_percentage,
-                avg_position_score
-            ''')\
-            .execute()
-        
-        # Convert to DataFrames
-        df_games = pd.DataFrame(games.data)
-        df_metrics = pd.DataFrame(metrics.data)
+        # Get logo metrics for all games, paged and fetched concurrently
+        df_metrics = MetricsRepository.for_games(df_games['id'], [
+            'game_id',
+            'logo_name',
+            'visibility_time',
+            'appearances',
+            'sponsorship_value',
+            'avg_area_percentage',
+            'avg_position_score'
+        ])
         
-        if df_games.empty or df_metrics.empty:
+        if df_metrics.empty:
             return None
             
-        # Format dates for better display
-        df_games['formatted_date'] = df_games['match_date'].apply(
-            lambda d: datetime.fromisoformat(d.replace('Z', '+00:00')).strftime('%b %d, %Y') 
-            if isinstance(d, str) else 'Unknown')
-            
-        # Calculate growth metrics - value per game over time
-        if 'match_date' in df_games.columns and not df_games.empty:
-            df_games['date_obj'] = pd.to_datetime(df_games['match_date'])
-            df_games = df_games.sort_values('date_obj')
-            
-            # Merge games with metrics
-            timeline_data = df_metrics.merge(df_games, left_on='game_id', right_on='id')
-            
-            # Calculate cumulative metrics for overall growth
-            growth_data = timeline_data.groupby(['date_obj', 'formatted_date']).agg({
-                'sponsorship_value': 'sum',
-                'visibility_time': 'sum',
-                'appearances': 'sum'
-            }).reset_index().sort_values('date_obj')
-            
-            growth_data['cumulative_value'] = growth_data['sponsorship_value'].cumsum()
-            growth_data['cumulative_time'] = growth_data['visibility_time'].cumsum()
-            growth_data['cumulative_appearances'] = growth_data['appearances'].cumsum()
-        else:
-            growth_data = pd.DataFrame()
-            
-        # Calculate sponsor leaderboard with more metrics
-        sponsor_stats = df_metrics.groupby('logo_name').agg({
-            'visibility_time': 'sum',
-            'appearances': 'sum',
-            'sponsorship_value': 'sum',
-            'avg_area_percentage': 'mean',
-            'avg_position_score': 'mean',
-            'game_id': 'nunique'
-        }).reset_index()
-        
-        # Calculate value per second and appearance metrics
-        sponsor_stats['Value Per Second'] = sponsor_stats['sponsorship_value'] / sponsor_stats['visibility_time']
-        sponsor_stats['Value Per Appearance'] = sponsor_stats['sponsorship_value'] / sponsor_stats['appearances']
-        
-        sponsor_stats.columns = [
-            'Logo',
-            'Total Screen Time',
-            'Total Appearances',
-            'Total Value',
-            'Avg Size',
-            'Avg Position',
-            'Games Sponsored',
-            'Value Per Second',
-            'Value Per Appearance'
-        ]
-        
-        # Calculate competition data
-        if 'competition' in df_games.columns:
-            competition_data = timeline_data.groupby('competition').agg({
-                'sponsorship_value': 'sum',
-                'visibility_time': 'sum',
-                'appearances': 'sum',
-                'id': 'nunique'  # Count games per competition
-            }).reset_index()
-            
-            competition_data.columns = [
-                'Competition', 'Total Value', 'Total Screen Time', 
-                'Total Appearances', 'Games'
-            ]
-            
-            competition_data['Average Value per Game'] = competition_data['Total Value'] / competition_data['Games']
-        else:
-            competition_data = pd.DataFrame()
-        
-        # Calculate best matches per sponsor
-        best_matches = []
-        for logo in df_metrics['logo_name'].unique():
-            logo_matches = df_metrics[df_metrics['logo_name'] == logo]\
-                .merge(df_games, left_on='game_id', right_on='id')
-            
-            top_3 = logo_matches.nlargest(3, 'sponsorship_value')
-            for _, match in top_3.iterrows():
-                best_matches.append({
-                    'logo': logo,
-                    'match': f"{match['home_team']} vs {match['away_team']}",
-                    'date': match['formatted_date'],
-                    'value': match['sponsorship_value'],
-                    'screen_time': match['visibility_time'],
-                    'game_id': match['game_id'],
-                    'thumbnail': match.get('thumbnail', '')
-                })
-        
-        best_matches_df = pd.DataFrame(best_matches)
-        
-        # Get total games and appearances
-        total_games = len(games.data)
-        total_value = sponsor_stats['Total Value'].sum()
-        total_appearances = sponsor_stats['Total Appearances'].sum()
-        
-        # Calculate averages
-        avg_value_per_game = total_value / total_games if total_games > 0 else 0
-        avg_appearances_per_game = total_appearances / total_games if total_games > 0 else 0
-        
-        # Set previous period metrics (for comparison)
-        # In a real app, these would come from historical data
-        prev_total_value = total_value * 0.9  # Just example values
-        prev_avg_value_per_game = avg_value_per_game * 0.9
-        prev_total_appearances = total_appearances * 0.9
-        prev_total_games = max(0, total_games - 2)
-        
-        return {
-            'sponsor_stats': sponsor_stats,
-            'best_matches': best_matches_df,
-            'total_games': total_games,
-            'total_value': total_value,
-            'total_appearances': total_appearances,
-            'avg_value_per_game': avg_value_per_game,
-            'avg_appearances_per_game': avg_appearances_per_game,
-            'growth_data': growth_data,
-            'competition_data': competition_data,
-            'prev_total_value': prev_total_value,
-            'prev_avg_value_per_game': prev_avg_value_per_game,
-            'prev_total_appearances': prev_total_appearances,
-            'prev_total_games': prev_total_games
-        }
+        return build_season_summary(**compute_season_analytics(df_games, df_metrics))
         
     except Exception as e:
         print(f"Error loading season data: {str(e)}")
         return None
 
+# Sponsor stats columns shipped to the browser for the leaderboard
+LEADERBOARD_COLUMNS = [
+    'Logo', 'Total Value', 'Value Per Second', 'Total Screen Time',
+    'Total Appearances', 'Games Sponsored'
+]
+
+def leaderboard_records(sponsor_stats):
+    """Leaderboard rows as plain records for the client-side sort"""
+    import numpy as np
+
+    records = sponsor_stats[LEADERBOARD_COLUMNS].replace([np.inf, -np.inf], np.nan)
+    return records.astype(object).where(records.notna(), None).to_dict('records')
+
+def create_leaderboard_rows(sponsor_stats):
+    """Leaderboard table rows sorted by total value, as initially rendered"""
+    max_value_per_second = max(sponsor_stats['Value Per Second'])
+    return [
+        html.Tr([
+            html.Td([
+                html.Div([
+                    html.Span(f"{i+1}. ", className="me-2 text-muted"),
+                    html.Strong(row['Logo'])
+                ], className="d-flex align-items-center")
+            ]),
+            html.Td(f"${row['Total Value']:,.2f}", className="text-end"),
+            html.Td(f"${row['Value Per Second']:,.2f}", className="text-end"),
+            html.Td(f"{row['Total Screen Time']:,.1f}", className="text-end"),
+            html.Td(f"{row['Total Appearances']:,}", className="text-end"),
+            html.Td(f"{row['Games Sponsored']}", className="text-end"),
+            html.Td([
+                html.Div([
+                    dbc.Progress(
+                        value=min(row['Value Per Second']/max_value_per_second*100, 100), 
+                        className="mb-0", 
+                        style={"height": "8px"}, 
+                        color="success"
+                    )
+                ], className="d-flex align-items-center")
+            ], className="text-center")
+        ], className=("table-primary" if i==0 else "")) 
+        for i, (_, row) in enumerate(sponsor_stats.sort_values('Total Value', ascending=False).iterrows())
+    ]
+
 def create_season_overview():
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     data = load_season_data()
     if not data:
         return html.Div([
@@ -179,7 +175,10 @@ def create_season_overview():
                 html.H1("Season Analytics Dashboard", className="mb-2"),
                 html.P("Comprehensive overview of sponsor performance across all games", 
                        className="text-muted")
-            ], width=True)
+            ], width=True),
+            dbc.Col([
+                create_export_buttons("/export/season")
+            ], width="auto", className="d-flex align-items-center")
         ], className="mb-4 align-items-center"),
         
         # Key Performance Metrics
@@ -310,34 +309,14 @@ def create_season_overview():
                                 html.Th("Trend", className="text-center")
                             ])
                         ]),
-                        html.Tbody([
-                            html.Tr([
-                                html.Td([
-                                    html.Div([
-                                        html.Span(f"{i+1}. ", className="me-2 text-muted"),
-                                        html.Strong(row['Logo'])
-                                    ], className="d-flex align-items-center")
-                                ]),
-                                html.Td(f"${row['Total Value']:,.2f}", className="text-end"),
-                                html.Td(f"${row['Value Per Second']:,.2f}", className="text-end"),
-                                html.Td(f"{row['Total Screen Time']:,.1f}", className="text-end"),
-                                html.Td(f"{row['Total Appearances']:,}", className="text-end"),
-                                html.Td(f"{row['Games Sponsored']}", className="text-end"),
-                                html.Td([
-                                    html.Div([
-                                        dbc.Progress(
-                                            value=min(row['Value Per Second']/max(data['sponsor_stats']['Value Per Second'])*100, 100), 
-                                            className="mb-0", 
-                                            style={"height": "8px"}, 
-                                            color="success"
-                                        )
-                                    ], className="d-flex align-items-center")
-                                ], className="text-center")
-                            ], className=("table-primary" if i==0 else "")) 
-                            for i, (_, row) in enumerate(data['sponsor_stats'].sort_values('Total Value', ascending=False).iterrows())
-                        ])
+                        html.Tbody(
+                            create_leaderboard_rows(data['sponsor_stats']),
+                            id="sponsor-table-body"
+                        )
                     ], bordered=True, hover=True, responsive=True, striped=True, className="mb-0")
-                ], style={"overflowX": "auto"})
+                ], style={"overflowX": "auto"}),
+                # Leaderboard rows, sorted in the browser by assets/leaderboard.js
+                dcc.Store(id="sponsor-leaderboard-store", data=leaderboard_records(data['sponsor_stats']))
             ])
         ], className="mb-4 shadow-sm"),
         
@@ -428,70 +407,20 @@ def create_season_overview():
     
     return layout
 
-# Add callbacks for interactive sorting
-@callback(
-    Output("sponsor-table", "children"),
+# Sort the leaderboard client-side; a sort click never reaches the server
+clientside_callback(
+    ClientsideFunction(namespace="season", function_name="sort_leaderboard"),
+    [
+        Output("sponsor-table-body", "children"),
+        Output("sort-by-value", "active"),
+        Output("sort-by-screentime", "active"),
+        Output("sort-by-efficiency", "active")
+    ],
     [
         Input("sort-by-value", "n_clicks"),
         Input("sort-by-screentime", "n_clicks"),
         Input("sort-by-efficiency", "n_clicks")
-    ]
+    ],
+    State("sponsor-leaderboard-store", "data"),
+    prevent_initial_call=True
 )
-def update_table_sorting(value_clicks, screentime_clicks, efficiency_clicks):
-    # Determine which button was clicked last
-    if not ctx.triggered:
-        sort_by = 'Total Value'
-    else:
-        button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        if button_id == "sort-by-value":
-            sort_by = 'Total Value'
-        elif button_id == "sort-by-screentime":
-            sort_by = 'Total Screen Time'
-        else:
-            sort_by = 'Value Per Second'
-    
-    data = load_season_data()
-    sorted_data = data['sponsor_stats'].sort_values(sort_by, ascending=False)
-    
-    # Return updated table
-    return dbc.Table(
-        [
-            html.Thead([
-                html.Tr([
-                    html.Th("Sponsor"),
-                    html.Th("Value ($)", className="text-end"),
-                    html.Th("Value/Sec ($)", className="text-end"),
-                    html.Th("Screen Time (s)", className="text-end"),
-                    html.Th("Appearances", className="text-end"),
-                    html.Th("Games", className="text-end"),
-                    html.Th("Trend", className="text-center")
-                ])
-            ]),
-            html.Tbody([
-                html.Tr([
-                    html.Td([
-                        html.Div([
-                            html.Span(f"{i+1}. ", className="me-2 text-muted"),
-                            html.Strong(row['Logo'])
-                        ], className="d-flex align-items-center")
-                    ]),
-                    html.Td(f"${row['Total Value']:,.2f}", className="text-end"),
-                    html.Td(f"${row['Value Per Second']:,.2f}", className="text-end"),
-                    html.Td(f"{row['Total Screen Time']:,.1f}", className="text-end"),
-                    html.Td(f"{row['Total Appearances']:,}", className="text-end"),
-                    html.Td(f"{row['Games Sponsored']}", className="text-end"),
-                    html.Td([
-                        html.Div([
-                            dbc.Progress(
-                                value=min(row['Value Per Second']/max(data['sponsor_stats']['Value Per Second'])*100, 100), 
-                                className="mb-0", 
-                                style={"height": "8px"}, 
-                                color="success"
-                            )
-                        ], className="d-flex align-items-center")
-                    ], className="text-center")
-                ], className=("table-primary" if i==0 else "")) 
-                for i, (_, row) in enumerate(sorted_data.iterrows())
-            ])
-        ], bordered=True, hover=True, responsive=True, striped=True, className="mb-0"
-    )
\ No newline at end of file
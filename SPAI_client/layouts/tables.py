@@ -1,30 +1,52 @@
-from dash import html, dash_table
-import pandas as pd
-from utils.supabase_client import supabase
+# layouts/tables.py
+import math
+import dash
+from dash import html, dcc, dash_table, callback, ctx, Input, Output, State
+from spai_data import (
+    GameRepository, MetricsRepository, DetectionRepository, SeasonRepository, is_missing_schema_error
+)
+from utils.cache import season_cache, season_flight
+
+# pandas is imported inside the functions below: this module is loaded at
+# startup to register the paging callbacks, which only fetch plain rows
+
+# Rows per page of the server-side paged tables
+TABLE_PAGE_SIZE = 25
+
+# Server-side paged tables: (database column, header, type, number format)
+GAME_METRICS_COLUMNS = [
+    ('game_id', 'Game', 'numeric', 'd'),
+    ('logo_name', 'Logo', 'text', None),
+    ('sponsorship_value', 'Value ($)', 'numeric', ',.2f'),
+    ('visibility_time', 'Screen Time (s)', 'numeric', ',.1f'),
+    ('appearances', 'Appearances', 'numeric', ',.0f')
+]
+DETECTION_COLUMNS = [
+    ('timestamp', 'Time (s)', 'numeric', ',.2f'),
+    ('logo_name', 'Logo', 'text', None),
+    ('confidence', 'Confidence', 'numeric', '.2f'),
+    ('sponsor_score', 'Sponsor Score', 'numeric', '.3f'),
+    ('area_percentage', 'Area (%)', 'numeric', '.2f'),
+    ('position_score', 'Position Score', 'numeric', '.2f'),
+    ('position_category', 'Position', 'text', None),
+    ('size_category', 'Size', 'text', None)
+]
 
 def fetch_game_data(game_id):
     """Fetch game-specific data from Supabase"""
+    import pandas as pd
+
     try:
         # Get game info first
-        game = supabase.table('games')\
-            .select('home_team, away_team, match_date, competition')\
-            .eq('id', game_id)\
-            .single()\
-            .execute()
+        game = GameRepository.get(game_id, 'home_team, away_team, match_date, competition')
         
         # Get logo metrics for the specific game
-        metrics = supabase.table('logo_metrics')\
-            .select('''
-                logo_name,
-                sponsorship_value,
-                visibility_time,
-                appearances
-            ''')\
-            .eq('game_id', game_id)\
-            .execute()
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(metrics.data)
+        df = MetricsRepository.for_game(game_id, [
+            'logo_name',
+            'sponsorship_value',
+            'visibility_time',
+            'appearances'
+        ])
         
         # Rename columns
         df.columns = [
@@ -49,34 +71,88 @@ def fetch_game_data(game_id):
         df['Screen Time (s)'] = df['Screen Time (s)'].round(1)
         df['Appearances'] = df['Appearances'].astype(int)
         
-        return df, game.data
+        return df, game
     except Exception as e:
         print(f"Error fetching game data: {str(e)}")
         return pd.DataFrame(), None
 
 def fetch_season_summary():
+    """Fetch season totals, cached briefly; concurrent page views share one fetch"""
+    cached = season_cache.get('season_summary')
+    if cached is None:
+        cached = season_flight.do('season_summary', fetch_and_cache_season_summary)
+    return cached
+
+def fetch_and_cache_season_summary():
+    summary, total_games = fetch_season_summary_uncoalesced()
+    if not summary.empty:
+        season_cache.set('season_summary', (summary, total_games))
+    return summary, total_games
+
+def fetch_season_summary_uncoalesced():
+    """Fetch season totals, preferring the incrementally maintained aggregates"""
+    import pandas as pd
+
+    try:
+        return fetch_season_summary_from_aggregates()
+    except Exception as e:
+        if not is_missing_schema_error(e):
+            print(f"Error fetching season aggregates: {str(e)}")
+            return pd.DataFrame(), 0
+        print(f"Season aggregates not migrated, scanning all games: {str(e)}")
+        return fetch_season_summary_from_scan()
+
+def fetch_season_summary_from_aggregates():
+    """Read the per-logo and per-competition season aggregate tables"""
+    import pandas as pd
+    from utils.season_aggregates import count_processed_games
+
+    logos = pd.DataFrame(SeasonRepository.logo_aggregates(
+        'logo_name, total_value, total_screen_time, total_appearances'
+    ))
+    if logos.empty:
+        return pd.DataFrame(), 0
+
+    summary = pd.DataFrame({
+        'Logo': logos['logo_name'],
+        'Total Value ($)': logos['total_value'],
+        'Total Screen Time (s)': logos['total_screen_time'],
+        'Total Appearances': logos['total_appearances']
+    })
+    return add_season_totals(summary), count_processed_games()
+
+def add_season_totals(summary):
+    """Append the totals row and sort the summary in sponsor display order"""
+    import pandas as pd
+
+    totals = summary.sum(numeric_only=True)
+    totals['Logo'] = 'Total'
+    summary = pd.concat([summary, pd.DataFrame([totals])], ignore_index=True)
+    
+    # Ensure specific logo order
+    logo_order = ['spotify_logo', 'nike_logo', 'AMBILIGHTtv_logo', 'UNHCR_logo', 'Total']
+    summary['order'] = summary['Logo'].map({name: i for i, name in enumerate(logo_order)})
+    return summary.sort_values('order').drop('order', axis=1)
+
+def fetch_season_summary_from_scan():
     """Fetch and aggregate season data from Supabase"""
+    import pandas as pd
+
     try:
         # Get all completed games
-        games = supabase.table('games')\
-            .select('id, home_team, away_team, competition')\
-            .eq('status', 'processed')\
-            .execute()
-        
-        # Get all logo metrics
-        metrics = supabase.table('logo_metrics')\
-            .select('game_id, logo_name, visibility_time, appearances, sponsorship_value')\
-            .execute()
+        game_ids = [game['id'] for game in GameRepository.processed(['id'])]
         
-        # Convert to DataFrame
-        df = pd.DataFrame(metrics.data)
-        
-        # Calculate season totals by logo
-        summary = df.groupby('logo_name').agg({
-            'sponsorship_value': 'sum',
-            'visibility_time': 'sum',
-            'appearances': 'sum'
-        }).reset_index()
+        # Calculate season totals by logo, one page of metrics at a time
+        partial_sums = [
+            chunk.groupby('logo_name')[['sponsorship_value', 'visibility_time', 'appearances']].sum()
+            for chunk in MetricsRepository.iter_for_games(
+                game_ids,
+                ['game_id', 'logo_name', 'visibility_time', 'appearances', 'sponsorship_value']
+            )
+        ]
+        if not partial_sums:
+            return pd.DataFrame(), len(game_ids)
+        summary = pd.concat(partial_sums).groupby(level=0).sum().reset_index()
         
         # Rename columns
         summary.columns = [
@@ -86,21 +162,85 @@ def fetch_season_summary():
             'Total Appearances'
         ]
         
-        # Add totals row
-        totals = summary.sum(numeric_only=True)
-        totals['Logo'] = 'Total'
-        summary = pd.concat([summary, pd.DataFrame([totals])], ignore_index=True)
-        
-        # Ensure specific logo order
-        logo_order = ['spotify_logo', 'nike_logo', 'AMBILIGHTtv_logo', 'UNHCR_logo', 'Total']
-        summary['order'] = summary['Logo'].map({name: i for i, name in enumerate(logo_order)})
-        summary = summary.sort_values('order').drop('order', axis=1)
-        
-        return summary, len(games.data)
+        return add_season_totals(summary), len(game_ids)
     except Exception as e:
         print(f"Error fetching season summary: {str(e)}")
         return pd.DataFrame(), 0
 
+def numeric_columns(columns):
+    return {column for column, _, column_type, _ in columns if column_type == 'numeric'}
+
+def create_paged_table(table_id, columns):
+    """A DataTable whose paging, sorting and filtering run in the database.
+
+    Only the visible page is sent to the browser; the callbacks below fetch it
+    whenever the page, sort order or filters change.
+    """
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[{
+            "name": name,
+            "id": column,
+            "type": column_type,
+            "format": {"specifier": specifier} if specifier else None
+        } for column, name, column_type, specifier in columns],
+        data=[],
+        page_current=0,
+        page_size=TABLE_PAGE_SIZE,
+        page_count=1,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        filter_options={"case": "insensitive"},
+        style_table={"overflowX": "auto"},
+        style_cell={"textAlign": "left", "padding": "12px", "minWidth": "100px"},
+        style_header={
+            "backgroundColor": "#f8f9fa",
+            "fontWeight": "bold",
+            "border": "1px solid #dee2e6"
+        },
+        style_data={
+            "backgroundColor": "white",
+            "border": "1px solid #dee2e6"
+        },
+        style_cell_conditional=[
+            {'if': {'column_id': column}, 'textAlign': 'right'}
+            for column, _, column_type, _ in columns
+            if column_type == 'numeric'
+        ]
+    )
+
+def load_table_page(fetch, page_current, page_size, sort_by, filter_query):
+    """Return (rows, page_count, page_current) of a paged table.
+
+    A new sort order or filter starts again from the first page, which also
+    keeps the requested page within the filtered rows. Rows are only counted
+    on the first load and when the filter or page size changes: paging and
+    sorting keep the page count.
+    """
+    triggered = ctx.triggered_prop_ids
+    if any(prop.endswith(('.sort_by', '.filter_query')) for prop in triggered):
+        page_current = 0
+    count = not triggered or any(prop.endswith(('.filter_query', '.page_size')) for prop in triggered)
+
+    try:
+        rows, total = fetch(
+            page_current=page_current,
+            page_size=page_size,
+            sort_by=sort_by,
+            filter_query=filter_query,
+            count=count
+        )
+    except Exception as e:
+        print(f"Error fetching table page: {str(e)}")
+        return [], 1, 0
+
+    page_count = max(1, math.ceil(total / page_size)) if count else dash.no_update
+    return rows, page_count, page_current
+
 def create_tables_layout(game_id=None):
     # Fetch season summary data first
     season_data, total_games = fetch_season_summary()
@@ -168,6 +308,13 @@ def create_tables_layout(game_id=None):
                         }]
                     )
                 ], className="mb-5"),
+
+                # Every detection of the game, paged in the database
+                html.Div([
+                    html.H3("Detections", className="mb-3"),
+                    dcc.Store(id='tables-game-id', data=game_id),
+                    create_paged_table('game-detections-table', DETECTION_COLUMNS)
+                ], className="mb-5"),
                 html.Hr(className="my-4"),
             ])
     
@@ -221,7 +368,50 @@ def create_tables_layout(game_id=None):
                     'fontWeight': 'bold'
                 }]
             )
+        ], className="mb-5"),
+
+        # Per-game sponsor metrics of the whole season, paged in the database
+        html.Div([
+            html.H2("Game Metrics", className="mb-3"),
+            create_paged_table('game-metrics-table', GAME_METRICS_COLUMNS)
         ])
     ])
     
-    return html.Div(content)
\ No newline at end of file
+    return html.Div(content)
+
+@callback(
+    [Output('game-metrics-table', 'data'),
+     Output('game-metrics-table', 'page_count'),
+     Output('game-metrics-table', 'page_current')],
+    [Input('game-metrics-table', 'page_current'),
+     Input('game-metrics-table', 'page_size'),
+     Input('game-metrics-table', 'sort_by'),
+     Input('game-metrics-table', 'filter_query')]
+)
+def update_game_metrics_table(page_current, page_size, sort_by, filter_query):
+    columns = [column for column, *_ in GAME_METRICS_COLUMNS]
+    return load_table_page(
+        lambda **table_state: MetricsRepository.page(
+            columns, numeric_columns=numeric_columns(GAME_METRICS_COLUMNS), **table_state
+        ),
+        page_current, page_size, sort_by, filter_query
+    )
+
+@callback(
+    [Output('game-detections-table', 'data'),
+     Output('game-detections-table', 'page_count'),
+     Output('game-detections-table', 'page_current')],
+    [Input('game-detections-table', 'page_current'),
+     Input('game-detections-table', 'page_size'),
+     Input('game-detections-table', 'sort_by'),
+     Input('game-detections-table', 'filter_query')],
+    [State('tables-game-id', 'data')]
+)
+def update_detections_table(page_current, page_size, sort_by, filter_query, game_id):
+    columns = [column for column, *_ in DETECTION_COLUMNS]
+    return load_table_page(
+        lambda **table_state: DetectionRepository.page_for_game(
+            game_id, columns, numeric_columns=numeric_columns(DETECTION_COLUMNS), **table_state
+        ),
+        page_current, page_size, sort_by, filter_query
+    )
\ No newline at end of file
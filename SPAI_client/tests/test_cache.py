@@ -0,0 +1,77 @@
+from utils.cache import TieredCache, game_version
+
+PROCESSED = {'id': 7, 'status': 'processed', 'processed_at': '2026-10-19T10:00:00+00:00'}
+
+
+def test_game_version_ignores_publishing():
+    published = dict(PROCESSED, published_at='2026-10-19T10:05:00+00:00')
+    published['updated_at'] = published['published_at']
+    assert game_version(published) == game_version(PROCESSED)
+
+
+def test_game_version_changes_when_reprocessed():
+    reprocessed = dict(PROCESSED, processed_at='2026-10-20T08:00:00+00:00')
+    assert game_version(reprocessed) != game_version(PROCESSED)
+    assert game_version(dict(PROCESSED, status='processing')) != game_version(PROCESSED)
+
+
+def test_game_version_without_processed_at():
+    assert game_version({'status': 'pending'}) == 'pending:'
+
+
+def test_entry_of_another_version_is_a_miss():
+    cache = TieredCache('test_versions')
+    cache.set('game:7', 'bundle', version='processed:1')
+
+    assert cache.get('game:7', 'processed:1') == 'bundle'
+    assert cache.get('game:7', 'processed:2') is None
+    # The stale entry is dropped rather than kept for its old version
+    assert cache.get('game:7', 'processed:1') is None
+
+
+def test_unversioned_read_accepts_any_version():
+    cache = TieredCache('test_unversioned')
+    cache.set('game:7', 'bundle', version='processed:1')
+    assert cache.get('game:7') == 'bundle'
+
+
+def test_expired_entry_is_a_miss():
+    cache = TieredCache('test_expiry')
+    cache.set('game:7', 'bundle', ttl=-1)
+    assert cache.get('game:7') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TieredCache('test_eviction', maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_disk_tier_is_shared_between_workers(tmp_path):
+    worker_a = TieredCache('test_shared', disk_dir=str(tmp_path))
+    worker_b = TieredCache('test_shared', disk_dir=str(tmp_path))
+    worker_a.set('game:7', 'bundle', version='processed:1')
+
+    assert worker_b.get('game:7', 'processed:1') == 'bundle'
+    assert worker_b.stats()['disk_hits'] == 1
+    assert worker_b.get('game:7', 'processed:2') is None
+
+
+def test_invalidation_reaches_other_workers_memory(tmp_path):
+    worker_a = TieredCache('test_tombstone', disk_dir=str(tmp_path))
+    worker_b = TieredCache('test_tombstone', disk_dir=str(tmp_path))
+    worker_a.set('game:7', 'bundle')
+    assert worker_b.get('game:7') == 'bundle'
+
+    worker_a.invalidate('game:7')
+    assert worker_b.get('game:7') is None
+
+    # An entry stored after the invalidation is valid again
+    worker_b.set('game:7', 'rebuilt')
+    assert worker_a.get('game:7') == 'rebuilt'
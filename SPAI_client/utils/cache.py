@@ -0,0 +1,224 @@
+# utils/cache.py
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from utils.single_flight import SingleFlight
+
+# Every cache created in this module, so metrics can be reported together
+_CACHES = {}
+
+
+class TieredCache:
+    """LRU in-memory cache with TTL, backed by an optional on-disk tier.
+
+    The disk tier lives in a directory shared by all gunicorn workers on the
+    host, so a bundle loaded by one worker is served by the others without
+    touching Supabase. Invalidation leaves a tombstone file next to the entry
+    so that copies held in other workers' memory are dropped on their next read.
+    """
+
+    def __init__(self, namespace, maxsize=128, ttl=3600, disk_dir=None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_dir = os.path.join(disk_dir, namespace) if disk_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        _CACHES[namespace] = self
+
+    def get(self, key, version=None):
+        """Return the cached value for key, or None on a miss.
+
+        If a version is given, an entry stored under a different version is
+        treated as stale and dropped.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_valid(key, entry, version, now):
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return entry['value']
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        if entry is not None and self._is_valid(key, entry, version, now):
+            with self._lock:
+                self._store(key, entry)
+                self._stats['disk_hits'] += 1
+            return entry['value']
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key, value, version=None, ttl=None):
+        """Store value under key in both tiers."""
+        now = time.time()
+        entry = {
+            'value': value,
+            'version': version,
+            'stored_at': now,
+            'expires_at': now + (ttl if ttl is not None else self.ttl)
+        }
+        with self._lock:
+            self._store(key, entry)
+            self._stats['sets'] += 1
+        self._write_disk(key, entry)
+
+    def invalidate(self, key):
+        """Drop key from every tier, including other workers' memory."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._stats['invalidations'] += 1
+
+        if self.disk_dir:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            # Touch the tombstone so other workers notice on their next read
+            with open(self._path(key, '.invalidated'), 'w') as f:
+                f.write(str(time.time()))
+
+    def clear(self):
+        """Empty the in-memory tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current memory tier size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats['maxsize'] = self.maxsize
+        stats['ttl'] = self.ttl
+        stats['disk'] = bool(self.disk_dir)
+        return stats
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _is_valid(self, key, entry, version, now):
+        if entry['expires_at'] <= now:
+            return False
+        if version is not None and entry['version'] != version:
+            return False
+        if self.disk_dir:
+            try:
+                if os.path.getmtime(self._path(key, '.invalidated')) >= entry['stored_at']:
+                    return False
+            except OSError:
+                pass
+        return True
+
+    def _path(self, key, suffix='.pkl'):
+        digest = hashlib.sha1(str(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, digest + suffix)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache file {path}: {str(e)}")
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        try:
+            # Write to a temp file and rename so readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {str(e)}")
+
+
+def cache_stats():
+    """Return the metrics of every registered cache, keyed by namespace."""
+    return {namespace: cache.stats() for namespace, cache in _CACHES.items()}
+
+
+def game_version(game):
+    """Derive the data version of a game row.
+
+    A game's data only changes when it is reprocessed, which moves its status
+    and processed_at. Other updates of the row, such as publishing the game
+    once its caches are warm, leave the version unchanged.
+    """
+    return f"{game.get('status')}:{game.get('processed_at') or ''}"
+
+
+CACHE_DIR = os.getenv("SPAI_CACHE_DIR")
+CACHE_TTL = int(os.getenv("SPAI_CACHE_TTL", "86400"))
+
+# Processed game bundles (game info, metrics, timeline and heatmap frames)
+game_cache = TieredCache(
+    'game_bundles',
+    maxsize=int(os.getenv("SPAI_GAME_CACHE_SIZE", "64")),
+    ttl=CACHE_TTL,
+    disk_dir=CACHE_DIR
+)
+
+# Serialized dashboard figures per (game, data version, theme)
+figure_cache = TieredCache(
+    'game_figures',
+    maxsize=int(os.getenv("SPAI_FIGURE_CACHE_SIZE", "320")),
+    ttl=CACHE_TTL,
+    disk_dir=CACHE_DIR
+)
+
+# Season overview, tables and game cards page data; short-lived, and refreshed
+# explicitly when a newly processed game is warmed up
+SEASON_VIEW_KEYS = ['season_overview', 'season_summary', 'game_cards']
+season_cache = TieredCache(
+    'season_views',
+    maxsize=len(SEASON_VIEW_KEYS),
+    ttl=int(os.getenv("SPAI_SEASON_CACHE_TTL", "300")),
+    disk_dir=CACHE_DIR
+)
+
+def invalidate_season_views():
+    """Drop the cached season pages, e.g. after a game was added to the season"""
+    for key in SEASON_VIEW_KEYS:
+        season_cache.invalidate(key)
+
+# Concurrent misses of the same game or figure share one computation, across
+# workers too when they share the disk tier
+game_flight = SingleFlight('game_bundles', lock_dir=CACHE_DIR)
+figure_flight = SingleFlight('game_figures', lock_dir=CACHE_DIR)
+
+# Season views are cached for a few minutes only, so coalescing them across
+# workers would mostly serialize the loads
+season_flight = SingleFlight('season')
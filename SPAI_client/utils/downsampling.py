@@ -0,0 +1,66 @@
+# utils/downsampling.py
+import math
+import numpy as np
+import pandas as pd
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most `threshold` points of the (x, y) series,
+    chosen so that the visual shape of the line, including its peaks, is kept.
+    The first and last points are always included.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        # Current bucket
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+def downsample_series(df, x, y, group, budget):
+    """Downsample each group of a long-format frame with LTTB.
+
+    The point budget is shared evenly between the groups. Groups that already
+    fit within their share are returned at full resolution.
+    """
+    if df.empty:
+        return df
+
+    groups = df.groupby(group, sort=False)
+    per_group = max(3, budget // max(1, groups.ngroups))
+    parts = []
+    for _, part in groups:
+        part = part.sort_values(x)
+        if len(part) > per_group:
+            part = part.iloc[lttb(part[x].to_numpy(), part[y].to_numpy(), per_group)]
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
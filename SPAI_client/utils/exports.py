@@ -0,0 +1,214 @@
+# utils/exports.py
+import json
+import zlib
+from flask import Response, request, stream_with_context
+from spai_data import GameRepository, iter_table_chunks
+
+# Exported datasets: name -> (table, CSV section title, columns)
+EXPORT_DATASETS = {
+    'games': ('games', 'Game Data', [
+        'id', 'home_team', 'away_team', 'match_date', 'competition'
+    ]),
+    'metrics': ('logo_metrics', 'Sponsor Data', [
+        'game_id', 'logo_name', 'visibility_time', 'appearances', 'unique_appearances',
+        'avg_sequence_duration', 'avg_area_percentage', 'avg_position_score',
+        'dominant_position', 'dominant_size', 'center_percentage', 'edge_percentage',
+        'corner_percentage', 'sponsorship_value'
+    ]),
+    'timeline': ('logo_timeline', 'Visibility Data', [
+        'game_id', 'timestamp', 'logo_name', 'sponsor_score'
+    ]),
+    'detections': ('logo_detections', 'Detection Data', [
+        'game_id', 'timestamp', 'logo_name', 'bbox', 'confidence', 'position_score',
+        'area_percentage', 'sponsor_score', 'position_category', 'size_category'
+    ])
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+def fetch_processed_game_ids():
+    """IDs of every processed game, oldest match first"""
+    games = GameRepository.processed_frame(['id', 'match_date'])
+    return games.sort_values('match_date', kind='stable')['id'].tolist()
+
+def iter_dataset_chunks(dataset, game_ids):
+    """Yield DataFrame chunks of a dataset for the given games, one page at a time"""
+    table, _, columns = EXPORT_DATASETS[dataset]
+    key = 'id' if dataset == 'games' else 'game_id'
+
+    for game_id in game_ids:
+        for chunk in iter_table_chunks(table, columns, {key: game_id}):
+            if dataset == 'games':
+                chunk = chunk.rename(columns={'id': 'game_id'})
+            yield chunk
+
+def stream_csv(game_ids, datasets):
+    """CSV export with one titled section per dataset"""
+    for index, dataset in enumerate(datasets):
+        yield ("\n\n" if index else "") + f"{EXPORT_DATASETS[dataset][1]}:\n"
+        header = True
+        for chunk in iter_dataset_chunks(dataset, game_ids):
+            yield chunk.to_csv(index=False, header=header)
+            header = False
+
+def stream_ndjson(game_ids, datasets):
+    """Newline-delimited JSON export, one record per line tagged with its dataset"""
+    for dataset in datasets:
+        for chunk in iter_dataset_chunks(dataset, game_ids):
+            chunk.insert(0, 'table', dataset)
+            yield chunk.to_json(orient='records', lines=True, date_format='iso')
+            yield "\n"
+
+def load_pyarrow():
+    """Import pyarrow on the first Parquet export; (None, None) when not installed"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # Parquet exports are optional
+        return None, None
+    return pa, pq
+
+def parquet_schema():
+    """One flat schema covering every dataset, tagged by a 'table' column"""
+    pa, _ = load_pyarrow()
+    float_type, string_type = pa.float64(), pa.string()
+    types = {
+        'table': string_type,
+        'game_id': string_type,
+        'bbox': pa.list_(float_type),
+        'appearances': pa.int64(),
+        'unique_appearances': pa.int64()
+    }
+    string_columns = {
+        'home_team', 'away_team', 'match_date', 'competition', 'logo_name',
+        'dominant_position', 'dominant_size', 'position_category', 'size_category'
+    }
+    names = ['table']
+    for dataset, (_, _, columns) in EXPORT_DATASETS.items():
+        for column in columns:
+            column = 'game_id' if (dataset, column) == ('games', 'id') else column
+            if column not in names:
+                names.append(column)
+    return pa.schema([
+        (name, types.get(name, string_type if name in string_columns else float_type))
+        for name in names
+    ])
+
+class ParquetChunkSink:
+    """Write-only file object collecting the bytes produced by a ParquetWriter"""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def to_arrow_table(chunk, schema):
+    """Conform a dataset chunk to the shared Parquet schema"""
+    import pandas as pd
+    pa, _ = load_pyarrow()
+    chunk = chunk.reindex(columns=schema.names)
+    arrays = []
+    for field in schema:
+        values = [None if pd.isna(value) is True else value for value in chunk[field.name].tolist()]
+        if field.type == pa.string():
+            values = [None if value is None else str(value) for value in values]
+        elif field.type == pa.int64():
+            values = [None if value is None else int(value) for value in values]
+        elif pa.types.is_list(field.type):
+            # List columns such as bbox may arrive as JSON text
+            values = [json.loads(value) if isinstance(value, str) else value for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def stream_parquet(game_ids, datasets):
+    """Parquet export written one row group per fetched page"""
+    _, pq = load_pyarrow()
+    schema = parquet_schema()
+    sink = ParquetChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    for dataset in datasets:
+        for chunk in iter_dataset_chunks(dataset, game_ids):
+            chunk.insert(0, 'table', dataset)
+            writer.write_table(to_arrow_table(chunk, schema))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def gzip_stream(chunks):
+    """Compress a stream of str/bytes chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+STREAM_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet
+}
+
+def export_response(game_ids, fmt, filename):
+    """Build a streamed download response for the requested games"""
+    if fmt not in EXPORT_FORMATS:
+        return Response(f"Unsupported export format: {fmt}", status=400)
+    if fmt == 'parquet' and load_pyarrow()[1] is None:
+        return Response("Parquet export requires pyarrow", status=501)
+
+    datasets = ['games', 'metrics', 'timeline']
+    if request.args.get('detections') in ('1', 'true', 'yes'):
+        datasets.append('detections')
+
+    chunks = STREAM_WRITERS[fmt](game_ids, datasets)
+    headers = {'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'}
+
+    # Compress text formats on the wire; Parquet is already compressed
+    if fmt != 'parquet' and request.args.get('compress') != '0' \
+            and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
+def register_export_routes(server):
+    """Mount the streaming export endpoints on the Flask server"""
+
+    @server.route("/export/game/<game_id>.<fmt>")
+    def export_game(game_id, fmt):
+        return export_response([game_id], fmt, f"game_{game_id}_analysis")
+
+    @server.route("/export/season.<fmt>")
+    def export_season(fmt):
+        try:
+            game_ids = fetch_processed_game_ids()
+        except Exception as e:
+            print(f"Season Export Error: {str(e)}")
+            return Response("Could not load season games", status=502)
+        return export_response(game_ids, fmt, "season_analysis")
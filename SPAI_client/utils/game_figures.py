@@ -0,0 +1,246 @@
+# utils/game_figures.py
+import os
+import json
+from utils.cache import figure_cache, figure_flight
+
+# Display order of the sponsors in cards and charts
+LOGO_ORDER = ['spotify_logo', 'nike_logo', 'AMBILIGHTtv_logo', 'UNHCR_logo']
+
+# Plotly is imported inside the figure builders, so pages and workers that
+# never draw a chart do not pay for loading it
+
+# Colours applied on top of the Plotly Express defaults
+THEMES = {
+    'light': {
+        'paper_bgcolor': 'white',
+        'plot_bgcolor': 'white',
+        'gridcolor': 'rgba(211, 211, 211, 0.5)',
+        'heatmap_gridcolor': 'rgba(180, 180, 180, 0.7)'
+    }
+}
+DEFAULT_THEME = 'light'
+
+# Maximum number of points drawn on the visibility timeline, across all logos
+TIMELINE_POINT_BUDGET = int(os.getenv("SPAI_TIMELINE_POINTS", "4000"))
+
+def order_logos(logos):
+    """Sort logo names in sponsor display order, unknown logos last"""
+    return sorted(logos, key=lambda logo: LOGO_ORDER.index(logo) if logo in LOGO_ORDER else len(LOGO_ORDER))
+
+def order_value_data(value_data):
+    """Return a copy of the value data sorted in sponsor display order"""
+    if value_data.empty:
+        return value_data
+    return value_data.assign(
+        sort_order=value_data['logo'].map({logo: idx for idx, logo in enumerate(LOGO_ORDER)})
+    ).sort_values('sort_order').drop('sort_order', axis=1).reset_index(drop=True)
+
+def build_timeline_figure(data, theme, x_range=None):
+    """Sponsor visibility score over the course of the match.
+
+    Drawn with WebGL traces from an LTTB-downsampled copy of the timeline so
+    long or densely sampled games stay smooth in the browser. With an x_range
+    only that window is downsampled, which reveals full detail when zooming in.
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from utils.downsampling import downsample_series
+
+    visibility = data['visibility_data']
+    logos = order_logos(visibility['logo'].unique()) if not visibility.empty else []
+    if x_range is not None and not visibility.empty:
+        visibility = visibility[visibility['timestamp'].between(*x_range)]
+    visibility = downsample_series(
+        visibility, 'timestamp', 'visibility_score', 'logo', TIMELINE_POINT_BUDGET
+    )
+
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for idx, logo in enumerate(logos):
+        logo_data = visibility[visibility['logo'] == logo]
+        fig.add_trace(go.Scattergl(
+            x=logo_data['timestamp'],
+            y=logo_data['visibility_score'],
+            mode='lines',
+            name=logo,
+            line=dict(color=colors[idx % len(colors)])
+        ))
+
+    fig.update_layout(
+        title='Sponsor Visibility Score Over Time',
+        xaxis_title='Match Time (seconds)',
+        yaxis_title='Visibility Score',
+        legend_title_text='logo',
+        hovermode='x unified',
+        # Keep the user's zoom when the figure is swapped for a finer window
+        uirevision='timeline',
+        paper_bgcolor=theme['paper_bgcolor'],
+        plot_bgcolor=theme['plot_bgcolor'],
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
+    # Add grid for better visibility
+    fig.update_xaxes(showgrid=True, gridwidth=0.5, gridcolor=theme['gridcolor'])
+    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor=theme['gridcolor'])
+    return fig
+
+def build_pie_figure(data, theme):
+    """Screen time distribution pie chart"""
+    import plotly.express as px
+
+    fig = px.pie(
+        order_value_data(data['value_data']),
+        values='screen_time',
+        names='logo',
+        title='Share of Screen Time'
+    )
+    fig.update_layout(
+        paper_bgcolor=theme['paper_bgcolor'],
+        plot_bgcolor=theme['plot_bgcolor'],
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    return fig
+
+def build_bar_figure(data, theme):
+    """Appearances bar chart"""
+    import plotly.express as px
+
+    fig = px.bar(
+        order_value_data(data['value_data']),
+        x='logo',
+        y='appearances',
+        color='logo',
+        title='Number of Logo Appearances'
+    )
+    fig.update_layout(
+        paper_bgcolor=theme['paper_bgcolor'],
+        plot_bgcolor=theme['plot_bgcolor'],
+        showlegend=False,
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+    # Add grid for better visibility
+    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor=theme['gridcolor'])
+    return fig
+
+def build_position_figure(data, theme):
+    """Share of center, edge and corner appearances per sponsor"""
+    import plotly.express as px
+
+    value_data = order_value_data(data['value_data'])
+    position_data = value_data[['logo', 'center_percentage']].copy()
+    position_data['edge_percentage'] = value_data['center_percentage']
+    position_data['corner_percentage'] = 100 - position_data['center_percentage'] - position_data['edge_percentage']
+
+    position_data = position_data.melt(
+        id_vars=['logo'],
+        value_vars=['center_percentage', 'edge_percentage', 'corner_percentage'],
+        var_name='position',
+        value_name='percentage'
+    )
+
+    fig = px.bar(
+        position_data,
+        x='logo',
+        y='percentage',
+        color='position',
+        title='Logo Position Distribution',
+        labels={'percentage': 'Percentage (%)', 'position': 'Position'}
+    )
+    fig.update_layout(
+        paper_bgcolor=theme['paper_bgcolor'],
+        plot_bgcolor=theme['plot_bgcolor'],
+        margin=dict(t=50, b=20, l=20, r=20),
+        barmode='stack'
+    )
+    # Add grid for better visibility
+    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor=theme['gridcolor'])
+    return fig
+
+def build_heatmap_figure(data, theme):
+    """Faceted density heatmap of logo positions on screen"""
+    import plotly.express as px
+
+    fig = px.density_heatmap(
+        data['heatmap_data'],
+        x='x',
+        y='y',
+        facet_col='logo',
+        title='Logo Position Heatmap',
+        nbinsx=30,
+        nbinsy=17,
+        z='score' if 'score' in data['heatmap_data'].columns else None
+    )
+
+    # Update heatmap layout with screen proportions and grid
+    fig.update_layout(
+        height=500,
+        paper_bgcolor=theme['paper_bgcolor'],
+        plot_bgcolor=theme['plot_bgcolor'],
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
+
+    # Update axes to match screen coordinates with enhanced grid
+    fig.update_yaxes(
+        scaleanchor="x",
+        scaleratio=9/16,  # Screen aspect ratio
+        range=[1, 0],     # Flip Y axis to match screen coordinates
+        gridcolor=theme['heatmap_gridcolor'],
+        gridwidth=0.7,
+        showgrid=True
+    )
+    fig.update_xaxes(
+        gridcolor=theme['heatmap_gridcolor'],
+        gridwidth=0.7,
+        showgrid=True
+    )
+    return fig
+
+# Chart name -> figure builder, in dashboard order
+FIGURE_BUILDERS = {
+    'timeline': build_timeline_figure,
+    'pie': build_pie_figure,
+    'bar': build_bar_figure,
+    'position': build_position_figure,
+    'heatmap': build_heatmap_figure
+}
+
+def figure_key(game_id, chart, theme=DEFAULT_THEME):
+    return f"{game_id}:{theme}:{chart}"
+
+def get_game_figure(game_id, chart, data, theme=DEFAULT_THEME):
+    """Return the figure of one chart as a plain dict, built at most once per data version.
+
+    The serialized figure JSON is cached per (game, data version, theme), so
+    every later page render only pays for decoding it.
+    """
+    key = figure_key(game_id, chart, theme)
+    payload = figure_cache.get(key, version=data['version'])
+    if payload is None:
+        payload = figure_flight.do(f"{key}:{data['version']}", build_figure_payload, key, chart, data, theme)
+    return json.loads(payload)
+
+def build_figure_payload(key, chart, data, theme):
+    """Build and cache the JSON of one figure; run once per key at a time"""
+    payload = figure_cache.get(key, version=data['version'])
+    if payload is None:
+        fig = FIGURE_BUILDERS[chart](data, THEMES[theme])
+        payload = fig.to_json()
+        # Only processed games have stable data worth keeping
+        if data['status'] == 'processed':
+            figure_cache.set(key, payload, version=data['version'])
+    return payload
+
+def get_game_figures(game_id, data, theme=DEFAULT_THEME):
+    """Return every dashboard figure of a game, keyed by chart name"""
+    return {chart: get_game_figure(game_id, chart, data, theme) for chart in FIGURE_BUILDERS}
+
+def get_timeline_window(data, x_range, theme=DEFAULT_THEME):
+    """Return the timeline downsampled to a zoomed window of the match"""
+    return build_timeline_figure(data, THEMES[theme], x_range=x_range)
+
+def invalidate_game_figures(game_id):
+    """Drop the cached figures of a game in every theme"""
+    for theme in THEMES:
+        for chart in FIGURE_BUILDERS:
+            figure_cache.invalidate(figure_key(game_id, chart, theme))
@@ -0,0 +1,84 @@
+# utils/season_aggregates.py
+import pandas as pd
+from datetime import datetime
+from spai_data import GameRepository, SeasonRepository, is_missing_schema_error
+
+def format_match_date(date_str):
+    """Format an ISO date as e.g. 'Mar 31, 2025'"""
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00')).strftime('%b %d, %Y')
+    except (AttributeError, ValueError):
+        return 'Unknown'
+
+def fetch_season_aggregates():
+    """Fetch the incrementally maintained season tables.
+
+    These hold one row per logo, competition and match date, so their size
+    does not grow with the number of games in the season.
+    """
+    return {
+        'logos': pd.DataFrame(SeasonRepository.logo_aggregates()),
+        'competitions': pd.DataFrame(SeasonRepository.competition_aggregates()),
+        'dates': pd.DataFrame(SeasonRepository.date_aggregates())
+    }
+
+def sponsor_stats_from_aggregates(logos):
+    """Sponsor leaderboard in the column layout used by the season pages"""
+    sponsor_stats = pd.DataFrame({
+        'Logo': logos['logo_name'],
+        'Total Screen Time': logos['total_screen_time'],
+        'Total Appearances': logos['total_appearances'],
+        'Total Value': logos['total_value'],
+        'Avg Size': logos['sum_area_percentage'] / logos['metric_rows'],
+        'Avg Position': logos['sum_position_score'] / logos['metric_rows'],
+        'Games Sponsored': logos['games']
+    })
+    sponsor_stats['Value Per Second'] = sponsor_stats['Total Value'] / sponsor_stats['Total Screen Time']
+    sponsor_stats['Value Per Appearance'] = sponsor_stats['Total Value'] / sponsor_stats['Total Appearances']
+    return sponsor_stats
+
+def growth_from_aggregates(dates):
+    """Cumulative value, screen time and appearances per match date"""
+    if dates.empty:
+        return pd.DataFrame()
+
+    growth_data = pd.DataFrame({
+        'date_obj': pd.to_datetime(dates['match_date']),
+        'formatted_date': dates['match_date'].apply(format_match_date),
+        'sponsorship_value': dates['total_value'],
+        'visibility_time': dates['total_screen_time'],
+        'appearances': dates['total_appearances']
+    }).sort_values('date_obj')
+
+    growth_data['cumulative_value'] = growth_data['sponsorship_value'].cumsum()
+    growth_data['cumulative_time'] = growth_data['visibility_time'].cumsum()
+    growth_data['cumulative_appearances'] = growth_data['appearances'].cumsum()
+    return growth_data
+
+def competitions_from_aggregates(competitions):
+    """Totals and average value per game for each competition"""
+    if competitions.empty:
+        return pd.DataFrame()
+
+    competition_data = pd.DataFrame({
+        'Competition': competitions['competition'],
+        'Total Value': competitions['total_value'],
+        'Total Screen Time': competitions['total_screen_time'],
+        'Total Appearances': competitions['total_appearances'],
+        'Games': competitions['games']
+    })
+    competition_data['Average Value per Game'] = competition_data['Total Value'] / competition_data['Games']
+    return competition_data
+
+def count_processed_games():
+    """Number of processed games, including those without any detection.
+
+    The competition aggregates only count games with logo metrics, while the
+    full scan counts every processed game; the status counters match the scan.
+    """
+    try:
+        return int(GameRepository.status_counts().get('processed', 0))
+    except Exception as e:
+        if not is_missing_schema_error(e):
+            raise
+        return GameRepository.count('processed')
@@ -0,0 +1,71 @@
+# utils/season_analytics.py
+import pandas as pd
+
+def prepare_games(df_games):
+    """Games frame keyed by game_id, with parsed and display-formatted match dates"""
+    games = df_games.rename(columns={'id': 'game_id'})
+    match_date = games['match_date'].map(lambda d: d if isinstance(d, str) else None)
+    games['date_obj'] = pd.to_datetime(match_date, utc=True, errors='coerce')
+    # Format the calendar date as written, whatever its UTC offset
+    games['formatted_date'] = pd.to_datetime(match_date.map(lambda d: d and d[:10]), errors='coerce')\
+        .dt.strftime('%b %d, %Y').fillna('Unknown')
+    return games
+
+def compute_growth(joined):
+    """Value, screen time and appearances per match date, with running totals"""
+    growth_data = joined.groupby(['date_obj', 'formatted_date'], sort=True).agg(
+        sponsorship_value=('sponsorship_value', 'sum'),
+        visibility_time=('visibility_time', 'sum'),
+        appearances=('appearances', 'sum')
+    ).reset_index()
+    growth_data['cumulative_value'] = growth_data['sponsorship_value'].cumsum()
+    growth_data['cumulative_time'] = growth_data['visibility_time'].cumsum()
+    growth_data['cumulative_appearances'] = growth_data['appearances'].cumsum()
+    return growth_data
+
+def compute_sponsor_stats(joined):
+    """Sponsor leaderboard with totals, averages and efficiency metrics"""
+    sponsor_stats = joined.groupby('logo_name', sort=True).agg(**{
+        'Total Screen Time': ('visibility_time', 'sum'),
+        'Total Appearances': ('appearances', 'sum'),
+        'Total Value': ('sponsorship_value', 'sum'),
+        'Avg Size': ('avg_area_percentage', 'mean'),
+        'Avg Position': ('avg_position_score', 'mean'),
+        'Games Sponsored': ('game_id', 'nunique')
+    }).reset_index().rename(columns={'logo_name': 'Logo'})
+    sponsor_stats['Value Per Second'] = sponsor_stats['Total Value'] / sponsor_stats['Total Screen Time']
+    sponsor_stats['Value Per Appearance'] = sponsor_stats['Total Value'] / sponsor_stats['Total Appearances']
+    return sponsor_stats
+
+def compute_competitions(joined):
+    """Totals and average value per game for each competition"""
+    if 'competition' not in joined.columns:
+        return pd.DataFrame()
+
+    competition_data = joined.groupby('competition', sort=True).agg(**{
+        'Total Value': ('sponsorship_value', 'sum'),
+        'Total Screen Time': ('visibility_time', 'sum'),
+        'Total Appearances': ('appearances', 'sum'),
+        'Games': ('game_id', 'nunique')
+    }).reset_index().rename(columns={'competition': 'Competition'})
+    competition_data['Average Value per Game'] = competition_data['Total Value'] / competition_data['Games']
+    return competition_data
+
+def compute_season_analytics(df_games, df_metrics):
+    """Compute every season overview table from plain frames.
+
+    `df_games` holds one row per processed game (id, match_date, competition)
+    and `df_metrics` one row per game and logo from logo_metrics. The two are
+    joined once; each table is then a single vectorized groupby over the
+    joined frame. Metrics of games missing
+    from `df_games` are ignored.
+    """
+    games = prepare_games(df_games)
+    joined = df_metrics.merge(games, on='game_id', how='inner', validate='many_to_one')
+
+    return {
+        'sponsor_stats': compute_sponsor_stats(joined),
+        'total_games': len(games),
+        'growth_data': compute_growth(joined),
+        'competition_data': compute_competitions(joined)
+    }
@@ -0,0 +1,100 @@
+# utils/single_flight.py
+import os
+import hashlib
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: coalesce within the process only
+    fcntl = None
+
+# Every group created in this module, so metrics can be reported together
+_GROUPS = {}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same key.
+
+    The first caller for a key runs the computation; callers arriving while it
+    is in flight wait for it and share its result (or exception) instead of
+    repeating the work. With a lock directory, the leaders of different
+    processes on the host also take an exclusive file lock per key, so only one
+    worker computes at a time and the others can pick the result up from the
+    shared cache once they get the lock.
+    """
+
+    def __init__(self, namespace, lock_dir=None):
+        self.namespace = namespace
+        self.lock_dir = os.path.join(lock_dir, 'locks', namespace) if lock_dir and fcntl else None
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'coalesced': 0, 'errors': 0}
+
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+        _GROUPS[namespace] = self
+
+    def do(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), sharing one in-flight run per key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with self._process_lock(key):
+                call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        stats['process_lock'] = bool(self.lock_dir)
+        return stats
+
+    @contextmanager
+    def _process_lock(self, key):
+        if not self.lock_dir:
+            yield
+            return
+        digest = hashlib.sha1(str(key).encode('utf-8')).hexdigest()
+        with open(os.path.join(self.lock_dir, digest + '.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def single_flight_stats():
+    """Return the metrics of every coalescing group, keyed by namespace."""
+    return {namespace: group.stats() for namespace, group in _GROUPS.items()}
@@ -0,0 +1,119 @@
+# utils/warmup.py
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from spai_data import GameRepository
+from utils.cache import invalidate_season_views, CACHE_DIR
+from utils.single_flight import SingleFlight
+
+# Seconds between checks for processed games that are not published yet (0 = off)
+WARM_POLL_INTERVAL = float(os.getenv("SPAI_WARM_POLL_SECONDS", "0"))
+
+# Invalidated games rebuilt at the same time, off the request threads
+precompute_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPAI_PRECOMPUTE_WORKERS", "2")),
+    thread_name_prefix="cache-precompute"
+)
+_precompute_pending = set()
+_precompute_lock = threading.Lock()
+
+def submit_precompute(game_id):
+    """Rebuild a game's caches in the background.
+
+    Requests for a game that is already waiting are merged into that rebuild;
+    one arriving while the game is being rebuilt queues a fresh rebuild, since
+    the running one may have read the data before it changed. Returns False
+    when the request was merged.
+    """
+    from layouts.game_dashboard import precompute_game_data
+
+    key = str(game_id)
+    with _precompute_lock:
+        if key in _precompute_pending:
+            return False
+        _precompute_pending.add(key)
+
+    def run():
+        with _precompute_lock:
+            _precompute_pending.discard(key)
+        try:
+            precompute_game_data(game_id)
+        except Exception as e:
+            print(f"Error precomputing game {game_id}: {str(e)}")
+
+    precompute_executor.submit(run)
+    return True
+
+# Repeated warm requests for a game, e.g. a retried processing run racing the
+# poller, share one warm-up, across workers too when they share the disk tier
+warm_flight = SingleFlight('warm', lock_dir=CACHE_DIR)
+
+def warm_game(game_id):
+    """Warm a game's caches; concurrent calls for the same game share one run"""
+    return warm_flight.do(str(game_id), warm_game_uncoalesced, game_id)
+
+def warm_game_uncoalesced(game_id):
+    """Rebuild every cache a new game's first viewers would hit.
+
+    Loads the game bundle and all of its dashboard figures, then refreshes the
+    season overview, tables and game cards pages that now include the game.
+    Returns the time spent on each step.
+    """
+    # Imported here: these pages pull in pandas and Plotly
+    from layouts.game_dashboard import invalidate_game_data, precompute_game_data
+    from layouts.season_overview import load_season_data
+    from layouts.tables import fetch_season_summary
+    from components.game_card import fetch_game_cards_page
+
+    timings = {}
+
+    start = time.perf_counter()
+    invalidate_game_data(game_id)
+    data = precompute_game_data(game_id)
+    timings['game_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    invalidate_season_views()
+    load_season_data()
+    fetch_season_summary()
+    fetch_game_cards_page()
+    timings['season_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    return {
+        'game_id': game_id,
+        'status': data['status'] if data else None,
+        'timings': timings
+    }
+
+def warm_and_publish_pending_games():
+    """Warm every processed but unpublished game, then publish it"""
+    for game in GameRepository.unpublished(['id']):
+        try:
+            result = warm_game(game['id'])
+            if result['status'] == 'processed':
+                GameRepository.publish(game['id'])
+                print(f"Warmed and published game {game['id']}: {result['timings']}")
+        except Exception as e:
+            print(f"Error warming game {game['id']}: {str(e)}")
+
+def start_warm_poller():
+    """Poll for newly processed games in the background, if enabled.
+
+    A fallback for processing runs that do not call /cache/warm themselves.
+    Enable it on a single instance so games are not warmed several times.
+    """
+    if WARM_POLL_INTERVAL <= 0:
+        return None
+
+    def poll():
+        while True:
+            try:
+                warm_and_publish_pending_games()
+            except Exception as e:
+                print(f"Error polling for processed games: {str(e)}")
+            time.sleep(WARM_POLL_INTERVAL)
+
+    thread = threading.Thread(target=poll, name='cache-warmer', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,61 @@
+"""Profile what an app imports at startup with `python -X importtime`.
+
+Prints the total import time, the peak RSS of the booted interpreter and the
+modules with the largest cumulative import time. Heavy libraries (pandas,
+numpy, Plotly, pyarrow, the Supabase SDK) should not appear at startup: pages
+import them on first use.
+
+Usage:
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --app SPAI_admin --top 40
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly.express', 'pyarrow', 'supabase', 'PIL.Image']
+
+# Prints the heavy modules loaded by `import app` and the peak RSS in KiB
+PROBE = (
+    "import resource, sys, app; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules)); "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='SPAI_client')
+    parser.add_argument('--top', type=int, default=25)
+    args = parser.parse_args()
+
+    cwd = os.path.join(ROOT, args.app)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+    heavy, rss_kib = result.stdout.rstrip('\n').split('\n')[-2:]
+    rows = parse_importtime(result.stderr)
+    total_us = sum(self_us for _, self_us, _ in rows)
+
+    print(f"{args.app}: {total_us / 1e6:.2f} s importing {len(rows)} modules, "
+          f"peak RSS {int(rss_kib) / 1024:.0f} MiB")
+    print(f"Heavy modules loaded at startup: {heavy or 'none'}\n")
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>16.1f} {self_us / 1000:>10.1f}  {module}")
+
+if __name__ == '__main__':
+    main()
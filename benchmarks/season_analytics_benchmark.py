@@ -0,0 +1,73 @@
+"""Benchmark the season analytics on synthetic seasons.
+
+Usage:
+    python benchmarks/season_analytics_benchmark.py
+    python benchmarks/season_analytics_benchmark.py --games 1000 5000 --sponsors 10 50 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'SPAI_client'))
+
+from utils.season_analytics import compute_season_analytics  # noqa: E402
+
+COMPETITIONS = ['La Liga', 'Champions League', 'Copa del Rey', 'Supercopa', 'Friendly']
+
+def make_season(n_games, n_sponsors, seed=0):
+    """Synthetic games and logo_metrics frames; every sponsor appears in ~80% of games"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-08-01T19:00:00+00:00')
+    df_games = pd.DataFrame({
+        'id': np.arange(1, n_games + 1),
+        'home_team': 'Team ' + pd.Series(rng.integers(0, 40, n_games)).astype(str),
+        'away_team': 'Team ' + pd.Series(rng.integers(0, 40, n_games)).astype(str),
+        'match_date': (start + pd.to_timedelta(rng.integers(0, 365 * 24, n_games), unit='h'))
+            .strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        'competition': rng.choice(COMPETITIONS, n_games),
+        'thumbnail': ''
+    })
+
+    game_ids = np.repeat(df_games['id'].to_numpy(), n_sponsors)
+    logos = np.tile([f'sponsor_{i}_logo' for i in range(n_sponsors)], n_games)
+    keep = rng.random(len(game_ids)) < 0.8
+    n_rows = int(keep.sum())
+    df_metrics = pd.DataFrame({
+        'game_id': game_ids[keep],
+        'logo_name': logos[keep],
+        'visibility_time': rng.gamma(2.0, 30.0, n_rows),
+        'appearances': rng.integers(1, 200, n_rows),
+        'sponsorship_value': rng.gamma(2.0, 500.0, n_rows),
+        'avg_area_percentage': rng.uniform(0.1, 5.0, n_rows),
+        'avg_position_score': rng.uniform(0.0, 1.0, n_rows)
+    })
+    return df_games, df_metrics
+
+def time_call(func, repeat):
+    """Best wall-clock time of `repeat` calls, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, nargs='+', default=[100, 1000, 5000, 10000])
+    parser.add_argument('--sponsors', type=int, nargs='+', default=[4, 12, 48])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'games':>8} {'sponsors':>9} {'metric rows':>12} {'best (ms)':>10} {'rows/ms':>9}")
+    for n_games in args.games:
+        for n_sponsors in args.sponsors:
+            df_games, df_metrics = make_season(n_games, n_sponsors)
+            elapsed = time_call(lambda: compute_season_analytics(df_games, df_metrics), args.repeat)
+            print(f"{n_games:>8} {n_sponsors:>9} {len(df_metrics):>12} {elapsed:>10.1f} {len(df_metrics) / elapsed:>9.0f}")
+
+if __name__ == '__main__':
+    main()
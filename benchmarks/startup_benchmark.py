@@ -0,0 +1,52 @@
+"""Measure the cold-start time of the admin and client apps.
+
+Each run imports an app's app.py in a fresh interpreter, the way a gunicorn
+worker boots. Supabase is pointed at an unroutable address, so any network
+access during startup shows up as a multi-second stall.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --apps SPAI_client --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Blackhole address: connections hang until they time out
+UNREACHABLE_SUPABASE = {'SUPABASE_URL': 'http://10.255.255.1', 'SUPABASE_KEY': 'benchmark'}
+
+def time_startup(app_dir, env, timeout):
+    """Wall-clock seconds to import app.py in a new interpreter"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app'],
+        cwd=os.path.join(ROOT, app_dir), env=env, timeout=timeout,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{app_dir} failed to start:\n{result.stderr.decode()[-2000:]}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', nargs='+', default=['SPAI_admin', 'SPAI_client'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    env = dict(os.environ, **UNREACHABLE_SUPABASE)
+    print(f"{'app':<12} {'min (s)':>8} {'median (s)':>11} {'max (s)':>8}")
+    for app_dir in args.apps:
+        # The first run warms the bytecode and OS file caches
+        time_startup(app_dir, env, args.timeout)
+        timings = [time_startup(app_dir, env, args.timeout) for _ in range(args.runs)]
+        print(f"{app_dir:<12} {min(timings):>8.2f} {statistics.median(timings):>11.2f} {max(timings):>8.2f}")
+
+if __name__ == '__main__':
+    main()
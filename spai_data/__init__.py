@@ -0,0 +1,18 @@
+"""Shared Supabase data access for the admin and client dashboards.
+
+All database I/O goes through one pooled HTTP client (see client.py), so
+timeouts, retries and query timing are configured in one place.
+"""
+from spai_data.client import (
+    get_client, add_query_hook, query_timeout, query_stats, is_missing_schema_error
+)
+from spai_data.pagination import (
+    iter_table_pages, iter_table_chunks, iter_partitioned_chunks, game_partitions,
+    fetch_rows, fetch_table, fetch_game_rows
+)
+from spai_data.table_queries import parse_filter_query, fetch_table_page
+from spai_data.health import check_connection, register_health_routes
+from spai_data.repositories import (
+    GameRepository, MetricsRepository, DetectionRepository, ProgressRepository, JobRepository,
+    TimelineRepository, HeatmapRepository, SeasonRepository, ContactRepository, ThumbnailStorage
+)
@@ -0,0 +1,190 @@
+# spai_data/client.py
+import os
+import random
+import threading
+import time
+import logging
+from contextlib import contextmanager
+import httpx
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Connection pool and request policy shared by every query of the process
+DB_POOL_SIZE = int(os.getenv("SPAI_DB_POOL_SIZE", "10"))
+DB_KEEPALIVE = float(os.getenv("SPAI_DB_KEEPALIVE", "30"))
+DB_TIMEOUT = float(os.getenv("SPAI_DB_TIMEOUT", "10"))
+DB_RETRIES = int(os.getenv("SPAI_DB_RETRIES", "2"))
+DB_SLOW_MS = float(os.getenv("SPAI_DB_SLOW_MS", "1000"))
+
+# Only requests that are safe to repeat are retried
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+
+# Postgres and PostgREST codes of a table, view, column or function that does
+# not exist (yet), e.g. before a migration is applied
+MISSING_SCHEMA_CODES = {'42P01', '42703', '42883', 'PGRST200', 'PGRST202', 'PGRST204', 'PGRST205'}
+
+_local = threading.local()
+_hooks = []
+
+def add_query_hook(hook):
+    """Register `hook(event)`, called after every HTTP request to Supabase.
+
+    The event dict holds method, path, status (None on network errors),
+    elapsed_ms, attempt and error.
+    """
+    _hooks.append(hook)
+    return hook
+
+def _emit(request, status, elapsed, attempt, error=None):
+    event = {
+        'method': request.method,
+        'path': request.url.path,
+        'status': status,
+        'elapsed_ms': elapsed * 1000,
+        'attempt': attempt,
+        'error': error
+    }
+    for hook in _hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            logger.error(f"Query hook failed: {str(e)}")
+
+def is_missing_schema_error(error):
+    """Whether a query failed because the schema it needs is not migrated"""
+    return getattr(error, 'code', None) in MISSING_SCHEMA_CODES
+
+@contextmanager
+def query_timeout(seconds):
+    """Override the request timeout for the queries run inside the block"""
+    previous = getattr(_local, 'timeout', None)
+    _local.timeout = seconds
+    try:
+        yield
+    finally:
+        _local.timeout = previous
+
+def retry_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+class PooledHttpClient(httpx.Client):
+    """Keep-alive HTTP client adding per-call timeouts, retries and timing hooks"""
+
+    def send(self, request, **kwargs):
+        timeout = getattr(_local, 'timeout', None)
+        if timeout is not None:
+            request.extensions['timeout'] = httpx.Timeout(timeout).as_dict()
+        retries = DB_RETRIES if request.method in IDEMPOTENT_METHODS else 0
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = super().send(request, **kwargs)
+            except httpx.TransportError as e:
+                _emit(request, None, time.perf_counter() - start, attempt, str(e))
+                if attempt >= retries:
+                    raise
+            else:
+                _emit(request, response.status_code, time.perf_counter() - start, attempt)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                response.close()
+            time.sleep(retry_delay(attempt))
+            attempt += 1
+
+def create_http_client(base_url='', headers=None):
+    return PooledHttpClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=httpx.Timeout(DB_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=DB_POOL_SIZE,
+            max_keepalive_connections=DB_POOL_SIZE,
+            keepalive_expiry=DB_KEEPALIVE
+        ),
+        follow_redirects=True
+    )
+
+def initialize_supabase():
+    # Imported here: the Supabase SDK is slow to import and only needed once
+    from supabase import create_client
+
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    
+    if not url or not key:
+        raise ValueError("Missing Supabase configuration. Check .env file.")
+        
+    logger.info(f"Initializing Supabase client with URL: {url[:20]}...")
+    
+    try:
+        client = create_client(url, key)
+        # Route database queries through the shared connection pool
+        session = client.postgrest.session
+        client.postgrest.session = create_http_client(session.base_url, session.headers)
+        session.close()
+        # No query here: connectivity is reported by the /ready endpoint
+        return client
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Supabase client: {str(e)}")
+        raise
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The process-wide Supabase client, created on first use.
+
+    Creating it does not touch the network, so importing the apps, forking
+    workers and collecting tests never wait on the database.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = initialize_supabase()
+    return _client
+
+class QueryStats:
+    """Per-path request counts and timings, fed by a query hook"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {}
+
+    def __call__(self, event):
+        if event['elapsed_ms'] >= DB_SLOW_MS:
+            logger.warning(
+                f"Slow query: {event['method']} {event['path']} took {event['elapsed_ms']:.0f} ms"
+            )
+        with self._lock:
+            stats = self._paths.setdefault(event['path'], {
+                'requests': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            stats['requests'] += 1
+            stats['retries'] += 1 if event['attempt'] else 0
+            stats['errors'] += 1 if event['error'] or (event['status'] or 0) >= 400 else 0
+            stats['total_ms'] += event['elapsed_ms']
+            stats['max_ms'] = max(stats['max_ms'], event['elapsed_ms'])
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                path: dict(stats, avg_ms=stats['total_ms'] / stats['requests'])
+                for path, stats in self._paths.items()
+            }
+
+query_stats = add_query_hook(QueryStats())
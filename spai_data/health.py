@@ -0,0 +1,62 @@
+# spai_data/health.py
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from flask import jsonify
+from spai_data.client import get_client, query_timeout, logger
+
+# How long a readiness result is reused, and how long the check may take
+READY_CHECK_TTL = float(os.getenv("SPAI_READY_TTL", "15"))
+READY_CHECK_TIMEOUT = float(os.getenv("SPAI_READY_TIMEOUT", "3"))
+
+_last_check = None
+_check_lock = threading.Lock()
+
+def run_connection_check():
+    """Run one cheap query against Supabase and report how it went"""
+    start = time.perf_counter()
+    try:
+        with query_timeout(READY_CHECK_TIMEOUT):
+            get_client().table('games').select('id').limit(1).execute()
+        ok, error = True, None
+    except Exception as e:
+        logger.error(f"❌ Supabase connection check failed: {str(e)}")
+        ok, error = False, str(e)
+    return {
+        'ok': ok,
+        'error': error,
+        'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+        'checked_at': datetime.now(timezone.utc).isoformat(),
+        'expires': time.monotonic() + READY_CHECK_TTL
+    }
+
+def check_connection(force=False):
+    """Cached database connection check; at most one runs at a time"""
+    global _last_check
+    with _check_lock:
+        if force or _last_check is None or _last_check['expires'] < time.monotonic():
+            _last_check = run_connection_check()
+        return {key: value for key, value in _last_check.items() if key != 'expires'}
+
+def register_health_routes(server, app_name):
+    """Mount liveness (/health) and readiness (/ready) endpoints.
+
+    /health never touches the database, so a slow or unreachable Supabase
+    does not get workers restarted. /ready reports the cached connection
+    check and answers 503 while the database cannot be reached.
+    """
+
+    @server.route("/health")
+    def health():
+        return jsonify({'status': 'ok', 'app': app_name})
+
+    @server.route("/ready")
+    def ready():
+        database = check_connection()
+        status = 200 if database['ok'] else 503
+        return jsonify({
+            'status': 'ready' if database['ok'] else 'unavailable',
+            'app': app_name,
+            'database': database
+        }), status
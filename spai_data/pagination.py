@@ -0,0 +1,143 @@
+# spai_data/pagination.py
+import os
+import queue
+import threading
+from spai_data.client import get_client
+
+# Rows per request. Must not exceed the PostgREST max-rows setting (1000 on
+# Supabase by default), otherwise a capped page is mistaken for the last one.
+FETCH_PAGE_SIZE = int(os.getenv("SPAI_FETCH_PAGE_SIZE", "1000"))
+
+# Partitions fetched in parallel by iter_partitioned_chunks
+FETCH_WORKERS = int(os.getenv("SPAI_FETCH_WORKERS", "4"))
+
+# Game IDs per `in` filter when a query is partitioned by game
+GAME_BATCH_SIZE = 200
+
+def apply_filters(query, filters):
+    """Equality filters; list and tuple values become `in` filters"""
+    for column, value in (filters or {}).items():
+        if isinstance(value, (list, tuple)):
+            query = query.in_(column, list(value))
+        else:
+            query = query.eq(column, value)
+    return query
+
+def iter_table_pages(table, columns, filters=None, key='id', page_size=None):
+    """Yield the rows of a table page by page, using keyset pagination.
+
+    Every page is ordered by the unique `key` column and starts right after the
+    last key of the previous page, so deep pages cost the same as the first
+    one and concurrent inserts cannot shift rows between pages.
+    """
+    page_size = page_size or FETCH_PAGE_SIZE
+    select = columns if key in columns else columns + [key]
+    last_key = None
+    while True:
+        query = apply_filters(get_client().table(table).select(', '.join(select)), filters)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        rows = query.order(key).limit(page_size).execute().data
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][key]
+
+def iter_table_chunks(table, columns, filters=None, key='id', page_size=None):
+    """Yield DataFrame chunks holding the requested columns, one page at a time"""
+    import pandas as pd
+
+    for rows in iter_table_pages(table, columns, filters, key, page_size):
+        yield pd.DataFrame(rows, columns=columns)
+
+def iter_partitioned_chunks(table, columns, partitions, key='id', page_size=None, workers=None):
+    """Yield DataFrame chunks of several filtered slices of a table.
+
+    Each partition is a filters dict, paged with iter_table_chunks. With more
+    than one worker the partitions are fetched concurrently and chunks are
+    yielded as they arrive, in no particular order. At most a few chunks per
+    worker are held in memory at any time.
+    """
+    workers = min(workers or FETCH_WORKERS, len(partitions))
+    if workers <= 1:
+        for filters in partitions:
+            yield from iter_table_chunks(table, columns, filters, key, page_size)
+        return
+
+    chunks = queue.Queue(maxsize=workers * 2)
+    pending = queue.Queue()
+    for filters in partitions:
+        pending.put(filters)
+    stop = threading.Event()
+    done = object()
+
+    def worker():
+        try:
+            while not stop.is_set():
+                try:
+                    filters = pending.get_nowait()
+                except queue.Empty:
+                    return
+                for chunk in iter_table_chunks(table, columns, filters, key, page_size):
+                    if stop.is_set():
+                        return
+                    chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(done)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = workers
+        while running:
+            item = chunks.get()
+            if item is done:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        # Unblock workers still waiting to hand over a chunk
+        stop.set()
+        while any(thread.is_alive() for thread in threads):
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+def game_partitions(game_ids, batch_size=GAME_BATCH_SIZE):
+    """Split game IDs into `game_id in (...)` filters of bounded URL length"""
+    game_ids = list(game_ids)
+    return [
+        {'game_id': game_ids[start:start + batch_size]}
+        for start in range(0, len(game_ids), batch_size)
+    ]
+
+def fetch_table(table, columns, filters=None, key='id', page_size=None):
+    """Fetch every matching row into one DataFrame, past the PostgREST row cap"""
+    import pandas as pd
+
+    chunks = list(iter_table_chunks(table, columns, filters, key, page_size))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+def fetch_game_rows(table, columns, game_ids, key='id', page_size=None, workers=None):
+    """Fetch the rows of many games into one DataFrame, partitions fetched concurrently"""
+    import pandas as pd
+
+    chunks = list(iter_partitioned_chunks(
+        table, columns, game_partitions(game_ids), key, page_size, workers
+    ))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+def fetch_rows(table, columns, filters=None, key='id', page_size=None):
+    """Fetch every matching row as a list of dicts, past the PostgREST row cap"""
+    rows = []
+    for page in iter_table_pages(table, columns, filters, key, page_size):
+        rows.extend({column: row.get(column) for column in columns} for row in page)
+    return rows
@@ -0,0 +1,303 @@
+# spai_data/repositories.py
+from spai_data.client import get_client
+from spai_data.pagination import (
+    fetch_rows, fetch_table, fetch_game_rows, iter_partitioned_chunks, game_partitions
+)
+from spai_data.table_queries import fetch_table_page
+
+def select_list(columns):
+    return columns if isinstance(columns, str) else ', '.join(columns)
+
+class GameRepository:
+    """Rows of the `games` table"""
+
+    @staticmethod
+    def get(game_id, columns='*'):
+        response = get_client().table('games')\
+            .select(select_list(columns))\
+            .eq('id', game_id)\
+            .single()\
+            .execute()
+        return response.data
+
+    @staticmethod
+    def find(game_id, columns='*'):
+        """The game, or None if it does not exist"""
+        rows = get_client().table('games')\
+            .select(select_list(columns))\
+            .eq('id', game_id)\
+            .limit(1)\
+            .execute().data
+        return rows[0] if rows else None
+
+    @staticmethod
+    def list_games(columns='*', status=None, order='created_at', desc=True, limit=None):
+        query = get_client().table('games').select(select_list(columns))
+        if status:
+            query = query.eq('status', status)
+        if order:
+            query = query.order(order, desc=desc)
+        if limit:
+            query = query.limit(limit)
+        return query.execute().data
+
+    @staticmethod
+    def recently_published(columns, limit):
+        """Latest games announced on the client, newest first"""
+        return get_client().table('games')\
+            .select(select_list(columns))\
+            .eq('status', 'processed')\
+            .not_.is_('published_at', 'null')\
+            .order('published_at', desc=True)\
+            .limit(limit)\
+            .execute().data
+
+    @staticmethod
+    def unpublished(columns):
+        """Processed games whose caches have not been warmed and announced yet"""
+        return get_client().table('games')\
+            .select(select_list(columns))\
+            .eq('status', 'processed')\
+            .is_('published_at', 'null')\
+            .order('id')\
+            .execute().data
+
+    @staticmethod
+    def publish(game_id):
+        """Announce a processed game on the client notifications page"""
+        from datetime import datetime, timezone
+        return GameRepository.update(game_id, {'published_at': datetime.now(timezone.utc).isoformat()})
+
+    @staticmethod
+    def processed(columns):
+        """Every processed game, paged past the row cap"""
+        return fetch_rows('games', columns, {'status': 'processed'})
+
+    @staticmethod
+    def list_page(columns, page, page_size, status=None, order='match_date', desc=True):
+        """One page of games, and the number of games matching the status filter"""
+        offset = page * page_size
+        query = get_client().table('games').select(select_list(columns), count='exact')
+        if status:
+            query = query.eq('status', status)
+        response = query\
+            .order(order, desc=desc, nullsfirst=False)\
+            .order('id', desc=desc)\
+            .range(offset, offset + page_size - 1)\
+            .execute()
+        return response.data, response.count or 0
+
+    @staticmethod
+    def processed_page(columns, page, page_size):
+        """One page of processed games, latest match first, and the number of processed games"""
+        return GameRepository.list_page(columns, page, page_size, status='processed')
+
+    @staticmethod
+    def changed_since(columns, since, limit=100):
+        """Games updated at or after `since`, oldest change first"""
+        return get_client().table('games')\
+            .select(select_list(columns))\
+            .gte('updated_at', since)\
+            .order('updated_at')\
+            .order('id')\
+            .limit(limit)\
+            .execute().data
+
+    @staticmethod
+    def latest_changes(limit=100):
+        """id and updated_at of the most recently changed games, newest first"""
+        return get_client().table('games')\
+            .select('id, updated_at')\
+            .order('updated_at', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit)\
+            .execute().data
+
+    @staticmethod
+    def status_counts():
+        """Number of games per status, from the trigger-maintained counter table"""
+        rows = get_client().table('game_status_counts').select('status, games').execute().data
+        return {row['status']: row['games'] for row in rows}
+
+    @staticmethod
+    def count(status=None):
+        """Number of games, counted by the database without returning rows"""
+        query = get_client().table('games').select('id', count='exact', head=True)
+        if status:
+            query = query.eq('status', status)
+        return query.execute().count or 0
+
+    @staticmethod
+    def processed_frame(columns):
+        return fetch_table('games', columns, {'status': 'processed'})
+
+    @staticmethod
+    def insert(data):
+        response = get_client().table('games').insert(data).execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    def update(game_id, values):
+        response = get_client().table('games').update(values).eq('id', game_id).execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    def delete(game_id):
+        get_client().table('games').delete().eq('id', game_id).execute()
+
+class MetricsRepository:
+    """Per game and logo KPIs in `logo_metrics`"""
+
+    @staticmethod
+    def for_game(game_id, columns):
+        return fetch_table('logo_metrics', columns, {'game_id': game_id})
+
+    @staticmethod
+    def for_games(game_ids, columns, workers=None):
+        return fetch_game_rows('logo_metrics', columns, game_ids, workers=workers)
+
+    @staticmethod
+    def iter_for_games(game_ids, columns, workers=None):
+        return iter_partitioned_chunks('logo_metrics', columns, game_partitions(game_ids), workers=workers)
+
+    @staticmethod
+    def page(columns, game_id=None, **table_state):
+        """One page of a metrics table view, see fetch_table_page"""
+        return fetch_table_page('logo_metrics', columns, {'game_id': game_id} if game_id else None, **table_state)
+
+class DetectionRepository:
+    """Per-frame logo detections in `logo_detections`"""
+
+    @staticmethod
+    def page_for_game(game_id, columns, **table_state):
+        """One page of a game's detections table view, see fetch_table_page"""
+        return fetch_table_page('logo_detections', columns, {'game_id': game_id}, **table_state)
+
+class ProgressRepository:
+    """Live progress of the inference worker in `processing_progress`"""
+
+    @staticmethod
+    def recent(since):
+        """Progress rows updated after `since`, with the teams of their game"""
+        return get_client().table('processing_progress')\
+            .select('*, games(home_team, away_team)')\
+            .gt('updated_at', since)\
+            .order('started_at', desc=True)\
+            .execute().data
+
+class JobRepository:
+    """Durable processing queue in `processing_jobs`, see its migration"""
+
+    @staticmethod
+    def enqueue(game_id, priority=1):
+        """Queue a game, or raise the priority of its waiting job"""
+        return get_client().rpc('enqueue_processing_job', {
+            'p_game_id': game_id, 'p_priority': priority
+        }).execute().data
+
+    @staticmethod
+    def requeue(job_id, priority=None):
+        """Give a dead or waiting job a fresh set of attempts, due right away"""
+        return get_client().rpc('requeue_processing_job', {
+            'p_job_id': job_id, 'p_priority': priority
+        }).execute().data
+
+    @staticmethod
+    def list_jobs(statuses, limit=50):
+        """Jobs in the given states, with the teams of their game, by claim order"""
+        return get_client().table('processing_jobs')\
+            .select('*, games(home_team, away_team)')\
+            .in_('status', list(statuses))\
+            .order('priority')\
+            .order('run_after')\
+            .limit(limit)\
+            .execute().data
+
+    @staticmethod
+    def metrics():
+        """Queue depth, throughput and latency per priority class"""
+        return get_client().table('processing_job_metrics').select('*').order('priority').execute().data
+
+class TimelineRepository:
+    """Visibility scores over time in `logo_timeline`"""
+
+    @staticmethod
+    def for_game(game_id, columns=('timestamp', 'logo_name', 'sponsor_score')):
+        timeline = fetch_table('logo_timeline', list(columns), {'game_id': game_id})
+        return timeline.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+class HeatmapRepository:
+    """On-screen logo positions in `logo_heatmaps`"""
+
+    @staticmethod
+    def for_game(game_id):
+        return fetch_rows('logo_heatmaps', ['logo_name', 'positions'], {'game_id': game_id})
+
+class SeasonRepository:
+    """Incrementally maintained season aggregates"""
+
+    @staticmethod
+    def logo_aggregates(columns='*'):
+        return get_client().table('season_logo_aggregates').select(select_list(columns)).execute().data
+
+    @staticmethod
+    def competition_aggregates(columns='*'):
+        return get_client().table('season_competition_aggregates').select(select_list(columns)).execute().data
+
+    @staticmethod
+    def date_aggregates():
+        return get_client().table('season_date_aggregates').select('*').order('match_date').execute().data
+
+    @staticmethod
+    def apply_game(game_id):
+        get_client().rpc('apply_game_to_season_aggregates', {'p_game_id': game_id}).execute()
+
+class ContactRepository:
+    """Messages sent through the client contact form"""
+
+    @staticmethod
+    def submit(name, email, subject, message):
+        response = get_client().table('contact_submissions').insert({
+            "name": name,
+            "email": email,
+            "subject": subject,
+            "message": message
+        }).execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    def list_messages(since=None):
+        """Messages, newest first; only those received at or after `since` when given"""
+        query = get_client().table('contact_submissions').select("*")
+        if since:
+            query = query.gte('created_at', since)
+        return query.order('created_at', desc=True).order('id', desc=True).execute().data
+
+class ThumbnailStorage:
+    """Game thumbnails in Supabase Storage"""
+
+    BUCKET = 'game-thumbnails'
+
+    @staticmethod
+    def upload(path, data, content_type="image/jpeg", cache_control=None, upsert=False):
+        """Upload a file and return its public URL; with `upsert`, a file already at `path` is replaced"""
+        bucket = get_client().storage.from_(ThumbnailStorage.BUCKET)
+        file_options = {"content-type": content_type}
+        if cache_control:
+            file_options["cache-control"] = str(cache_control)
+        if upsert:
+            file_options["upsert"] = "true"
+        response = bucket.upload(path=path, file=data, file_options=file_options)
+        if not response:
+            raise Exception("Upload failed - no response from server")
+        return bucket.get_public_url(path)
+
+    @staticmethod
+    def public_url(path):
+        return get_client().storage.from_(ThumbnailStorage.BUCKET).get_public_url(path)
+
+    @staticmethod
+    def list_names(folder):
+        """Names of the files stored in a folder of the bucket"""
+        entries = get_client().storage.from_(ThumbnailStorage.BUCKET).list(folder)
+        return {entry['name'] for entry in entries or []}
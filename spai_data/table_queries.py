@@ -0,0 +1,133 @@
+# spai_data/table_queries.py
+import re
+from datetime import date, timedelta
+from spai_data.client import get_client
+from spai_data.pagination import FETCH_PAGE_SIZE, apply_filters
+
+# One clause of a dash_table filter query, e.g. `{logo_name} icontains nike`.
+# Operators may carry an `s` (case-sensitive) or `i` (insensitive) prefix.
+FILTER_CLAUSE = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s*'
+    r'(?P<case>[si]?)(?P<operator>>=|<=|!=|>|<|=|ge|le|gt|lt|ne|eq|contains|datestartswith)'
+    r'\s*(?P<value>.*)$'
+)
+
+OPERATOR_ALIASES = {'>=': 'ge', '<=': 'le', '>': 'gt', '<': 'lt', '!=': 'ne', '=': 'eq'}
+
+# Prefix of an ISO date as typed in a date filter: a year, a month or a day
+DATE_PREFIX = re.compile(r'^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?$')
+
+# Table filter operators with a same-named PostgREST filter method
+COMPARISONS = {'eq': 'eq', 'ne': 'neq', 'gt': 'gt', 'ge': 'gte', 'lt': 'lt', 'le': 'lte'}
+
+def parse_filter_value(value):
+    """Strip the quotes dash_table puts around strings; numbers become ints or floats.
+
+    Integral values stay ints, as PostgREST rejects `5.0` on integer columns.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        return value[1:-1]
+    for number in (int, float):
+        try:
+            return number(value)
+        except ValueError:
+            pass
+    return value
+
+def date_prefix_range(prefix):
+    """[start, end) dates of a date prefix such as 2025, 2025-03 or 2025-03-31, or None"""
+    match = DATE_PREFIX.match(str(prefix).strip())
+    if not match:
+        return None
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day:
+            start = date(year, month, day)
+            end = start + timedelta(days=1)
+        elif month:
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    except ValueError:
+        return None
+    return start.isoformat(), end.isoformat()
+
+def parse_filter_query(filter_query):
+    """Split a dash_table filter query into (column, operator, value, case) clauses.
+
+    Only the `&&`-joined clauses the table header produces are supported;
+    clauses that do not parse are ignored, as the table would ignore them.
+    """
+    clauses = []
+    for part in (filter_query or '').split(' && '):
+        match = FILTER_CLAUSE.match(part.strip())
+        if not match or not match.group('value').strip():
+            continue
+        operator = OPERATOR_ALIASES.get(match.group('operator'), match.group('operator'))
+        clauses.append((
+            match.group('column'),
+            operator,
+            parse_filter_value(match.group('value')),
+            match.group('case') or 's'
+        ))
+    return clauses
+
+def escape_like(value):
+    return str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def apply_filter_clause(query, column, operator, value, case, numeric=False):
+    """Translate one table filter clause into a PostgREST filter.
+
+    Pattern matches only work on text, so on a `numeric` column `contains`
+    compares for equality, and a value that is not a number is ignored.
+    """
+    if numeric and operator != 'datestartswith':
+        if not isinstance(value, (int, float)):
+            return query
+        if operator == 'contains':
+            operator = 'eq'
+    if operator == 'contains':
+        pattern = f'%{escape_like(value)}%'
+        return query.ilike(column, pattern) if case == 'i' else query.like(column, pattern)
+    if operator == 'datestartswith':
+        # A range rather than a text match, so it works on date and timestamp
+        # columns and can use their indexes; other prefixes are ignored
+        bounds = date_prefix_range(value)
+        if bounds is None:
+            return query
+        return query.gte(column, bounds[0]).lt(column, bounds[1])
+    if operator == 'eq' and case == 'i' and isinstance(value, str):
+        return query.ilike(column, escape_like(value))
+    return getattr(query, COMPARISONS[operator])(column, value)
+
+def fetch_table_page(table, columns, filters=None, page_current=0, page_size=25,
+                     sort_by=None, filter_query=None, key='id', numeric_columns=(), count=True):
+    """Fetch one page of a dash_table view of a table, filtered and sorted in the database.
+
+    `page_current`, `sort_by` and `filter_query` are the DataTable properties
+    of a table with custom page, sort and filter actions. Only `columns` can be
+    sorted and filtered on, those in `numeric_columns` as numbers; `filters`
+    are fixed equality filters applied on top. Rows are ordered by the unique
+    `key` after the requested sort so pages never overlap. Returns the rows of
+    the page and the total number of rows matching the filters, which is only
+    counted (an extra scan of every matching row) with `count`, else None.
+    """
+    page_size = max(1, min(page_size, FETCH_PAGE_SIZE))
+    offset = max(page_current or 0, 0) * page_size
+
+    query = apply_filters(
+        get_client().table(table).select(', '.join(columns), count='exact' if count else None), filters
+    )
+    for column, operator, value, case in parse_filter_query(filter_query):
+        if column in columns:
+            query = apply_filter_clause(query, column, operator, value, case, column in numeric_columns)
+
+    for sort in sort_by or []:
+        if sort['column_id'] in columns:
+            query = query.order(sort['column_id'], desc=sort['direction'] == 'desc')
+    query = query.order(key)
+
+    response = query.range(offset, offset + page_size - 1).execute()
+    return response.data, (response.count or 0) if count else None
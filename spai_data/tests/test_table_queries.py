@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+import pytest
+from spai_data import table_queries
+from spai_data.table_queries import (
+    parse_filter_value, parse_filter_query, date_prefix_range, apply_filter_clause, fetch_table_page
+)
+
+
+class RecordingQuery:
+    """Stands in for a PostgREST query builder, recording the filters applied"""
+
+    def __init__(self, data=(), count=None):
+        self.calls = []
+        self.response = SimpleNamespace(data=list(data), count=count)
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, *args, *kwargs.values()))
+            return self
+        return method
+
+    def execute(self):
+        return self.response
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('"nike"', 'nike'),
+    ("'5'", '5'),
+    ('5', 5),
+    (' 5.5 ', 5.5),
+    ('nike', 'nike'),
+])
+def test_parse_filter_value(raw, expected):
+    value = parse_filter_value(raw)
+    assert value == expected and type(value) is type(expected)
+
+
+def test_parse_filter_query():
+    clauses = parse_filter_query('{logo_name} icontains nike && {appearances} > 5 && {timestamp} s<= 1.5')
+    assert clauses == [
+        ('logo_name', 'contains', 'nike', 'i'),
+        ('appearances', 'gt', 5, 's'),
+        ('timestamp', 'le', 1.5, 's'),
+    ]
+
+
+@pytest.mark.parametrize('query', [None, '', '{logo_name} contains ', 'logo_name contains nike', '{x} like y'])
+def test_parse_filter_query_ignores_incomplete_clauses(query):
+    assert parse_filter_query(query) == []
+
+
+@pytest.mark.parametrize('prefix, expected', [
+    ('2025', ('2025-01-01', '2026-01-01')),
+    ('2025-12', ('2025-12-01', '2026-01-01')),
+    ('2025-3', ('2025-03-01', '2025-04-01')),
+    ('2025-03-31', ('2025-03-31', '2025-04-01')),
+    ('2025-02-30', None),
+    ('March', None),
+])
+def test_date_prefix_range(prefix, expected):
+    assert date_prefix_range(prefix) == expected
+
+
+@pytest.mark.parametrize('clause, expected', [
+    (('logo_name', 'contains', '50%_off', 'i'), [('ilike', 'logo_name', '%50\\%\\_off%')]),
+    (('logo_name', 'contains', 'Nike', 's'), [('like', 'logo_name', '%Nike%')]),
+    (('logo_name', 'eq', 'nike', 'i'), [('ilike', 'logo_name', 'nike')]),
+    (('logo_name', 'contains', 5, 'i'), [('ilike', 'logo_name', '%5%')]),
+    (('appearances', 'ne', 3, 's'), [('neq', 'appearances', 3)]),
+    (('match_date', 'datestartswith', '2025-03', 's'), [('gte', 'match_date', '2025-03-01'),
+                                                        ('lt', 'match_date', '2025-04-01')]),
+    (('match_date', 'datestartswith', 'March', 's'), []),
+])
+def test_apply_filter_clause(clause, expected):
+    query = RecordingQuery()
+    apply_filter_clause(query, *clause)
+    assert query.calls == expected
+
+
+@pytest.mark.parametrize('clause, expected', [
+    (('appearances', 'contains', 5, 'i'), [('eq', 'appearances', 5)]),
+    (('confidence', 'gt', 0.5, 's'), [('gt', 'confidence', 0.5)]),
+    (('appearances', 'contains', 'many', 'i'), []),
+    (('appearances', 'eq', 'many', 'i'), []),
+])
+def test_apply_filter_clause_on_numeric_columns(clause, expected):
+    query = RecordingQuery()
+    apply_filter_clause(query, *clause, numeric=True)
+    assert query.calls == expected
+
+
+def fetch_with(monkeypatch, query, **table_state):
+    client = SimpleNamespace(table=lambda name: query)
+    monkeypatch.setattr(table_queries, 'get_client', lambda: client)
+    return fetch_table_page('logo_metrics', ['logo_name', 'appearances'], **table_state)
+
+
+def test_fetch_table_page_filters_sorts_and_pages(monkeypatch):
+    query = RecordingQuery(data=[{'logo_name': 'Nike'}], count=26)
+    rows, total = fetch_with(
+        monkeypatch, query, filters={'game_id': 7}, page_current=1, page_size=25,
+        sort_by=[{'column_id': 'appearances', 'direction': 'desc'}, {'column_id': 'secret', 'direction': 'asc'}],
+        filter_query='{appearances} contains 3 && {secret} = 1', numeric_columns={'appearances'}
+    )
+
+    assert (rows, total) == ([{'logo_name': 'Nike'}], 26)
+    assert query.calls == [
+        ('select', 'logo_name, appearances', 'exact'),
+        ('eq', 'game_id', 7),
+        ('eq', 'appearances', 3),
+        ('order', 'appearances', True),
+        ('order', 'id'),
+        ('range', 25, 49),
+    ]
+
+
+def test_fetch_table_page_without_count(monkeypatch):
+    query = RecordingQuery(data=[], count=None)
+    rows, total = fetch_with(monkeypatch, query, count=False)
+
+    assert total is None
+    assert query.calls[0] == ('select', 'logo_name, appearances', None)
@@ -0,0 +1,200 @@
+-- Season-level aggregates, maintained incrementally per processed game.
+--
+-- The processing worker calls apply_game_to_season_aggregates(game_id) after a
+-- game is processed or reprocessed. The function takes back whatever the game
+-- contributed before and adds its current logo_metrics, so the season pages
+-- read a handful of small rows instead of scanning every game.
+
+create table if not exists season_game_contributions (
+    game_id bigint not null references games (id) on delete cascade,
+    logo_name text not null,
+    competition text not null,
+    match_date date,
+    sponsorship_value double precision not null default 0,
+    visibility_time double precision not null default 0,
+    appearances bigint not null default 0,
+    sum_area_percentage double precision not null default 0,
+    sum_position_score double precision not null default 0,
+    metric_rows bigint not null default 0,
+    primary key (game_id, logo_name)
+);
+
+create table if not exists season_logo_aggregates (
+    logo_name text primary key,
+    total_value double precision not null default 0,
+    total_screen_time double precision not null default 0,
+    total_appearances bigint not null default 0,
+    sum_area_percentage double precision not null default 0,
+    sum_position_score double precision not null default 0,
+    metric_rows bigint not null default 0,
+    games bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists season_competition_aggregates (
+    competition text primary key,
+    total_value double precision not null default 0,
+    total_screen_time double precision not null default 0,
+    total_appearances bigint not null default 0,
+    games bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists season_date_aggregates (
+    match_date date primary key,
+    total_value double precision not null default 0,
+    total_screen_time double precision not null default 0,
+    total_appearances bigint not null default 0,
+    games bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+-- Top three matches per sponsor, read by the season overview
+create or replace view season_best_matches as
+select *
+from (
+    select
+        c.logo_name,
+        c.game_id,
+        g.home_team,
+        g.away_team,
+        g.match_date,
+        g.thumbnail,
+        c.sponsorship_value,
+        c.visibility_time,
+        row_number() over (partition by c.logo_name order by c.sponsorship_value desc) as rank
+    from season_game_contributions c
+    join games g on g.id = c.game_id
+) ranked
+where rank <= 3;
+
+create or replace function apply_game_to_season_aggregates(p_game_id bigint)
+returns void
+language plpgsql
+as $$
+begin
+    -- Two runs for the same game must not interleave
+    perform pg_advisory_xact_lock(p_game_id);
+
+    -- 1. Take back the game's previous contribution, if any
+    update season_logo_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        sum_area_percentage = a.sum_area_percentage - c.sum_area_percentage,
+        sum_position_score = a.sum_position_score - c.sum_position_score,
+        metric_rows = a.metric_rows - c.metric_rows,
+        games = a.games - 1,
+        updated_at = now()
+    from season_game_contributions c
+    where c.game_id = p_game_id and a.logo_name = c.logo_name;
+
+    update season_competition_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        games = a.games - 1,
+        updated_at = now()
+    from (
+        select competition, sum(sponsorship_value) as sponsorship_value,
+               sum(visibility_time) as visibility_time, sum(appearances) as appearances
+        from season_game_contributions
+        where game_id = p_game_id
+        group by competition
+    ) c
+    where a.competition = c.competition;
+
+    update season_date_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        games = a.games - 1,
+        updated_at = now()
+    from (
+        select match_date, sum(sponsorship_value) as sponsorship_value,
+               sum(visibility_time) as visibility_time, sum(appearances) as appearances
+        from season_game_contributions
+        where game_id = p_game_id
+        group by match_date
+    ) c
+    where a.match_date = c.match_date;
+
+    delete from season_game_contributions where game_id = p_game_id;
+
+    -- 2. Record the current contribution of a processed game
+    insert into season_game_contributions (
+        game_id, logo_name, competition, match_date, sponsorship_value, visibility_time,
+        appearances, sum_area_percentage, sum_position_score, metric_rows
+    )
+    select
+        m.game_id,
+        m.logo_name,
+        coalesce(g.competition, 'Unknown'),
+        g.match_date::date,
+        coalesce(sum(m.sponsorship_value), 0),
+        coalesce(sum(m.visibility_time), 0),
+        coalesce(sum(m.appearances), 0),
+        coalesce(sum(m.avg_area_percentage), 0),
+        coalesce(sum(m.avg_position_score), 0),
+        count(*)
+    from logo_metrics m
+    join games g on g.id = m.game_id
+    where m.game_id = p_game_id and g.status = 'processed'
+    group by m.game_id, m.logo_name, g.competition, g.match_date;
+
+    -- 3. Add it to the season aggregates
+    insert into season_logo_aggregates as a (
+        logo_name, total_value, total_screen_time, total_appearances,
+        sum_area_percentage, sum_position_score, metric_rows, games
+    )
+    select logo_name, sponsorship_value, visibility_time, appearances,
+           sum_area_percentage, sum_position_score, metric_rows, 1
+    from season_game_contributions
+    where game_id = p_game_id
+    on conflict (logo_name) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        sum_area_percentage = a.sum_area_percentage + excluded.sum_area_percentage,
+        sum_position_score = a.sum_position_score + excluded.sum_position_score,
+        metric_rows = a.metric_rows + excluded.metric_rows,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    insert into season_competition_aggregates as a (
+        competition, total_value, total_screen_time, total_appearances, games
+    )
+    select competition, sum(sponsorship_value), sum(visibility_time), sum(appearances), 1
+    from season_game_contributions
+    where game_id = p_game_id
+    group by competition
+    on conflict (competition) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    insert into season_date_aggregates as a (
+        match_date, total_value, total_screen_time, total_appearances, games
+    )
+    select match_date, sum(sponsorship_value), sum(visibility_time), sum(appearances), 1
+    from season_game_contributions
+    where game_id = p_game_id and match_date is not null
+    group by match_date
+    on conflict (match_date) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    -- Drop keys nothing contributes to any more
+    delete from season_logo_aggregates where games <= 0;
+    delete from season_competition_aggregates where games <= 0;
+    delete from season_date_aggregates where games <= 0;
+end;
+$$;
+
+-- Backfill from the games processed before this migration
+select apply_game_to_season_aggregates(id) from games where status = 'processed';
@@ -0,0 +1,16 @@
+-- Games are announced on the client /notifications page once published.
+--
+-- The processing worker marks a game processed, asks the client dashboard to
+-- warm its caches (bundle, figures, season views) and only then sets
+-- published_at, so the first viewers never hit a cold cache.
+
+alter table games add column if not exists published_at timestamptz;
+
+-- Games processed before this migration are already visible
+update games
+set published_at = coalesce(published_at, created_at, now())
+where status = 'processed' and published_at is null;
+
+create index if not exists games_published_at_idx
+    on games (published_at desc)
+    where published_at is not null;
@@ -0,0 +1,11 @@
+-- Resized thumbnail variants, so game cards never download a full-size image.
+--
+-- thumbnail_variants is a list of {"width": 320, "format": "webp", "url": "..."}
+-- entries; games without variants keep using the original `thumbnail` URL.
+
+alter table games add column if not exists thumbnail_variants jsonb;
+
+-- The cards grid pages through processed games, latest match first
+create index if not exists games_processed_match_date_idx
+    on games (match_date desc nulls last, id desc)
+    where status = 'processed';
@@ -0,0 +1,26 @@
+-- Change cursors for the admin dashboard.
+--
+-- Open admin tabs poll for rows changed since the last change they have seen
+-- (games.updated_at, contact_submissions.created_at) instead of reloading
+-- whole tables, so an idle tab costs one indexed lookup per poll.
+
+alter table games add column if not exists updated_at timestamptz not null default now();
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists games_set_updated_at on games;
+create trigger games_set_updated_at
+    before update on games
+    for each row
+    execute function set_updated_at();
+
+create index if not exists games_updated_at_idx on games (updated_at);
+create index if not exists contact_submissions_created_at_idx on contact_submissions (created_at);
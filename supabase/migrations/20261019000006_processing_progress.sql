@@ -0,0 +1,21 @@
+-- Live progress of the inference worker, one row per game.
+--
+-- The worker upserts its row every few seconds while it processes a game
+-- (stage, frames, throughput, ETA and its latest log lines); the admin
+-- dashboard polls the rows updated recently to show running jobs and flag
+-- stalled ones.
+
+create table if not exists processing_progress (
+    game_id bigint primary key references games (id) on delete cascade,
+    stage text not null,
+    frames_processed integer not null default 0,
+    total_frames integer,
+    frames_per_second real,
+    eta_seconds real,
+    log_lines jsonb not null default '[]'::jsonb,
+    started_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists processing_progress_updated_at_idx
+    on processing_progress (updated_at);
@@ -0,0 +1,274 @@
+-- Durable queue of games to process.
+--
+-- Each job is claimed by one inference worker at a time, for a visibility
+-- timeout the worker keeps extending while it makes progress. A job whose
+-- worker dies becomes claimable again once its lease expires. Failed jobs are
+-- retried with exponential backoff until they run out of attempts, then stay
+-- in the `dead` state until an admin requeues them. Lower priorities are
+-- claimed first (0 = high, 1 = normal, 2 = backlog).
+--
+-- The games' status follows the queue: `processing` while claimed, back to
+-- `pending` while a retry waits, `error` once dead. The worker itself marks
+-- the game `processed` when its results are saved.
+
+create table if not exists processing_jobs (
+    id bigint generated always as identity primary key,
+    game_id bigint not null references games (id) on delete cascade,
+    priority smallint not null default 1,
+    status text not null default 'queued'
+        check (status in ('queued', 'running', 'succeeded', 'dead')),
+    attempts integer not null default 0,
+    max_attempts integer not null default 5,
+    run_after timestamptz not null default now(),
+    locked_until timestamptz,
+    worker text,
+    last_error text,
+    created_at timestamptz not null default now(),
+    first_started_at timestamptz,
+    started_at timestamptz,
+    finished_at timestamptz
+);
+
+-- At most one queued or running job per game
+create unique index if not exists processing_jobs_active_game_idx
+    on processing_jobs (game_id)
+    where status in ('queued', 'running');
+
+-- Claim order of queued jobs, and expired leases of running ones
+create index if not exists processing_jobs_claim_idx
+    on processing_jobs (priority, run_after, id)
+    where status = 'queued';
+
+create index if not exists processing_jobs_lease_idx
+    on processing_jobs (locked_until)
+    where status = 'running';
+
+create index if not exists processing_jobs_finished_at_idx
+    on processing_jobs (finished_at);
+
+-- Queue a game, or raise the priority of its waiting job
+create or replace function enqueue_processing_job(p_game_id bigint, p_priority smallint default 1)
+returns processing_jobs
+language plpgsql
+as $$
+declare
+    v_job processing_jobs;
+begin
+    insert into processing_jobs (game_id, priority)
+    values (p_game_id, p_priority)
+    on conflict (game_id) where status in ('queued', 'running')
+    do update set priority = least(processing_jobs.priority, excluded.priority)
+    returning * into v_job;
+
+    return v_job;
+end;
+$$;
+
+-- Lease the next job to a worker; returns no row when nothing is due
+create or replace function claim_processing_job(p_worker text, p_visibility_seconds integer default 900)
+returns setof processing_jobs
+language plpgsql
+as $$
+declare
+    v_job processing_jobs;
+begin
+    -- Jobs whose worker stopped extending its lease on the last attempt
+    with expired as (
+        update processing_jobs
+        set status = 'dead',
+            locked_until = null,
+            finished_at = now(),
+            last_error = coalesce(last_error || ' / ', '') || 'visibility timeout'
+        where status = 'running'
+          and locked_until < now()
+          and attempts >= max_attempts
+        returning game_id
+    )
+    update games
+    set status = 'error',
+        status_message = 'Processing timed out'
+    where id in (select game_id from expired);
+
+    select * into v_job
+    from processing_jobs
+    where (status = 'queued' and run_after <= now())
+       or (status = 'running' and locked_until < now())
+    order by priority, run_after, id
+    limit 1
+    for update skip locked;
+
+    if not found then
+        return;
+    end if;
+
+    update processing_jobs
+    set status = 'running',
+        attempts = attempts + 1,
+        worker = p_worker,
+        locked_until = now() + make_interval(secs => p_visibility_seconds),
+        first_started_at = coalesce(first_started_at, now()),
+        started_at = now()
+    where id = v_job.id
+    returning * into v_job;
+
+    update games
+    set status = 'processing',
+        status_message = format('Attempt %s of %s', v_job.attempts, v_job.max_attempts)
+    where id = v_job.game_id;
+
+    return next v_job;
+end;
+$$;
+
+-- Keep a lease alive; false when the attempt lost its lease to another worker
+create or replace function extend_processing_job(p_job_id bigint, p_attempt integer, p_visibility_seconds integer default 900)
+returns boolean
+language sql
+as $$
+    update processing_jobs
+    set locked_until = now() + make_interval(secs => p_visibility_seconds)
+    where id = p_job_id
+      and status = 'running'
+      and attempts = p_attempt
+    returning true;
+$$;
+
+create or replace function complete_processing_job(p_job_id bigint, p_attempt integer)
+returns boolean
+language sql
+as $$
+    update processing_jobs
+    set status = 'succeeded',
+        locked_until = null,
+        last_error = null,
+        finished_at = now()
+    where id = p_job_id
+      and status = 'running'
+      and attempts = p_attempt
+    returning true;
+$$;
+
+-- Schedule a retry after base * 2^(attempts - 1) seconds (capped, with jitter),
+-- or dead-letter the job once it has no attempts left. Returns the new status.
+create or replace function fail_processing_job(
+    p_job_id bigint,
+    p_attempt integer,
+    p_error text,
+    p_base_seconds integer default 60,
+    p_max_seconds integer default 3600
+)
+returns text
+language plpgsql
+as $$
+declare
+    v_job processing_jobs;
+    v_delay double precision;
+begin
+    select * into v_job
+    from processing_jobs
+    where id = p_job_id
+      and status = 'running'
+      and attempts = p_attempt
+    for update;
+
+    if not found then
+        return null;
+    end if;
+
+    if v_job.attempts >= v_job.max_attempts then
+        update processing_jobs
+        set status = 'dead',
+            locked_until = null,
+            last_error = p_error,
+            finished_at = now()
+        where id = p_job_id;
+
+        update games
+        set status = 'error',
+            status_message = left(format('Failed after %s attempts: %s', v_job.attempts, p_error), 250)
+        where id = v_job.game_id;
+
+        return 'dead';
+    end if;
+
+    v_delay := least(p_base_seconds * power(2, v_job.attempts - 1), p_max_seconds)
+               * (0.9 + random() * 0.2);
+
+    update processing_jobs
+    set status = 'queued',
+        locked_until = null,
+        last_error = p_error,
+        run_after = now() + make_interval(secs => v_delay)
+    where id = p_job_id;
+
+    update games
+    set status = 'pending',
+        status_message = left(format('Retry %s of %s in %s s: %s',
+                                     v_job.attempts + 1, v_job.max_attempts, round(v_delay), p_error), 250)
+    where id = v_job.game_id;
+
+    return 'queued';
+end;
+$$;
+
+-- Give a dead (or waiting) job a fresh set of attempts, due right away
+create or replace function requeue_processing_job(p_job_id bigint, p_priority smallint default null)
+returns processing_jobs
+language plpgsql
+as $$
+declare
+    v_job processing_jobs;
+begin
+    update processing_jobs
+    set status = 'queued',
+        priority = coalesce(p_priority, priority),
+        attempts = 0,
+        run_after = now(),
+        locked_until = null,
+        worker = null,
+        finished_at = null
+    where id = p_job_id
+      and status in ('dead', 'queued')
+    returning * into v_job;
+
+    if found then
+        update games
+        set status = 'pending',
+            status_message = 'Requeued'
+        where id = v_job.game_id;
+    end if;
+
+    return v_job;
+end;
+$$;
+
+-- Queue depth, throughput and latency per priority class. Wait is the time
+-- from queueing to the first claim, latency from queueing to success; both
+-- over the jobs finished in the last 24 hours.
+create or replace view processing_job_metrics as
+select
+    priority,
+    count(*) filter (where status = 'queued') as queued,
+    count(*) filter (where status = 'running') as running,
+    count(*) filter (where status = 'dead') as dead,
+    count(*) filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as succeeded_24h,
+    round((count(*) filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') / 24.0)::numeric, 2)
+        as jobs_per_hour,
+    avg(extract(epoch from first_started_at - created_at))
+        filter (where finished_at > now() - interval '24 hours') as avg_wait_seconds,
+    percentile_cont(0.95) within group (order by extract(epoch from first_started_at - created_at))
+        filter (where finished_at > now() - interval '24 hours') as p95_wait_seconds,
+    avg(extract(epoch from finished_at - created_at))
+        filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as avg_latency_seconds,
+    percentile_cont(0.95) within group (order by extract(epoch from finished_at - created_at))
+        filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as p95_latency_seconds
+from processing_jobs
+group by priority;
+
+-- Queue the games that are waiting today
+insert into processing_jobs (game_id)
+select id
+from games
+where status = 'pending'
+  and video_path is not null
+on conflict do nothing;
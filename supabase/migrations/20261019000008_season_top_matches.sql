@@ -0,0 +1,235 @@
+-- Precomputed best matches and deleted games for the season aggregates.
+--
+-- season_best_matches used to rank every contribution of the season on each
+-- read. The top three matches per sponsor are now kept in season_top_matches
+-- and refreshed only for the sponsors a game touches. Deleting a game takes
+-- its contribution back out of the season aggregates instead of leaving it
+-- counted there.
+
+create index if not exists season_game_contributions_logo_value_idx
+    on season_game_contributions (logo_name, sponsorship_value desc);
+
+create table if not exists season_top_matches (
+    logo_name text not null,
+    rank bigint not null,
+    game_id bigint not null references games (id) on delete cascade,
+    sponsorship_value double precision not null,
+    visibility_time double precision not null,
+    primary key (logo_name, rank)
+);
+
+create or replace function refresh_season_top_matches(p_logo_names text[])
+returns void
+language plpgsql
+as $$
+begin
+    -- Sponsors are shared between games, so refreshes must not interleave
+    perform pg_advisory_xact_lock(hashtext('season_top_matches'));
+
+    delete from season_top_matches where logo_name = any(p_logo_names);
+
+    insert into season_top_matches (logo_name, rank, game_id, sponsorship_value, visibility_time)
+    select
+        l.logo_name,
+        row_number() over (partition by l.logo_name order by t.sponsorship_value desc, t.game_id),
+        t.game_id,
+        t.sponsorship_value,
+        t.visibility_time
+    from unnest(p_logo_names) as l (logo_name)
+    cross join lateral (
+        select c.game_id, c.sponsorship_value, c.visibility_time
+        from season_game_contributions c
+        where c.logo_name = l.logo_name
+        order by c.sponsorship_value desc, c.game_id
+        limit 3
+    ) t;
+end;
+$$;
+
+-- Same columns as before, now reading at most three rows per sponsor
+create or replace view season_best_matches as
+select
+    t.logo_name,
+    t.game_id,
+    g.home_team,
+    g.away_team,
+    g.match_date,
+    g.thumbnail,
+    t.sponsorship_value,
+    t.visibility_time,
+    t.rank
+from season_top_matches t
+join games g on g.id = t.game_id;
+
+-- Take back whatever a game contributed to the season aggregates
+create or replace function remove_game_from_season_aggregates(p_game_id bigint)
+returns void
+language plpgsql
+as $$
+declare
+    v_logo_names text[];
+begin
+    perform pg_advisory_xact_lock(p_game_id);
+
+    select coalesce(array_agg(logo_name), '{}') into v_logo_names
+    from season_game_contributions
+    where game_id = p_game_id;
+
+    update season_logo_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        sum_area_percentage = a.sum_area_percentage - c.sum_area_percentage,
+        sum_position_score = a.sum_position_score - c.sum_position_score,
+        metric_rows = a.metric_rows - c.metric_rows,
+        games = a.games - 1,
+        updated_at = now()
+    from season_game_contributions c
+    where c.game_id = p_game_id and a.logo_name = c.logo_name;
+
+    update season_competition_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        games = a.games - 1,
+        updated_at = now()
+    from (
+        select competition, sum(sponsorship_value) as sponsorship_value,
+               sum(visibility_time) as visibility_time, sum(appearances) as appearances
+        from season_game_contributions
+        where game_id = p_game_id
+        group by competition
+    ) c
+    where a.competition = c.competition;
+
+    update season_date_aggregates a set
+        total_value = a.total_value - c.sponsorship_value,
+        total_screen_time = a.total_screen_time - c.visibility_time,
+        total_appearances = a.total_appearances - c.appearances,
+        games = a.games - 1,
+        updated_at = now()
+    from (
+        select match_date, sum(sponsorship_value) as sponsorship_value,
+               sum(visibility_time) as visibility_time, sum(appearances) as appearances
+        from season_game_contributions
+        where game_id = p_game_id
+        group by match_date
+    ) c
+    where a.match_date = c.match_date;
+
+    delete from season_game_contributions where game_id = p_game_id;
+
+    -- Drop keys nothing contributes to any more
+    delete from season_logo_aggregates where games <= 0;
+    delete from season_competition_aggregates where games <= 0;
+    delete from season_date_aggregates where games <= 0;
+
+    perform refresh_season_top_matches(v_logo_names);
+end;
+$$;
+
+create or replace function apply_game_to_season_aggregates(p_game_id bigint)
+returns void
+language plpgsql
+as $$
+begin
+    -- Two runs for the same game must not interleave
+    perform pg_advisory_xact_lock(p_game_id);
+
+    -- 1. Take back the game's previous contribution, if any
+    perform remove_game_from_season_aggregates(p_game_id);
+
+    -- 2. Record the current contribution of a processed game
+    insert into season_game_contributions (
+        game_id, logo_name, competition, match_date, sponsorship_value, visibility_time,
+        appearances, sum_area_percentage, sum_position_score, metric_rows
+    )
+    select
+        m.game_id,
+        m.logo_name,
+        coalesce(g.competition, 'Unknown'),
+        g.match_date::date,
+        coalesce(sum(m.sponsorship_value), 0),
+        coalesce(sum(m.visibility_time), 0),
+        coalesce(sum(m.appearances), 0),
+        coalesce(sum(m.avg_area_percentage), 0),
+        coalesce(sum(m.avg_position_score), 0),
+        count(*)
+    from logo_metrics m
+    join games g on g.id = m.game_id
+    where m.game_id = p_game_id and g.status = 'processed'
+    group by m.game_id, m.logo_name, g.competition, g.match_date;
+
+    -- 3. Add it to the season aggregates
+    insert into season_logo_aggregates as a (
+        logo_name, total_value, total_screen_time, total_appearances,
+        sum_area_percentage, sum_position_score, metric_rows, games
+    )
+    select logo_name, sponsorship_value, visibility_time, appearances,
+           sum_area_percentage, sum_position_score, metric_rows, 1
+    from season_game_contributions
+    where game_id = p_game_id
+    on conflict (logo_name) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        sum_area_percentage = a.sum_area_percentage + excluded.sum_area_percentage,
+        sum_position_score = a.sum_position_score + excluded.sum_position_score,
+        metric_rows = a.metric_rows + excluded.metric_rows,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    insert into season_competition_aggregates as a (
+        competition, total_value, total_screen_time, total_appearances, games
+    )
+    select competition, sum(sponsorship_value), sum(visibility_time), sum(appearances), 1
+    from season_game_contributions
+    where game_id = p_game_id
+    group by competition
+    on conflict (competition) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    insert into season_date_aggregates as a (
+        match_date, total_value, total_screen_time, total_appearances, games
+    )
+    select match_date, sum(sponsorship_value), sum(visibility_time), sum(appearances), 1
+    from season_game_contributions
+    where game_id = p_game_id and match_date is not null
+    group by match_date
+    on conflict (match_date) do update set
+        total_value = a.total_value + excluded.total_value,
+        total_screen_time = a.total_screen_time + excluded.total_screen_time,
+        total_appearances = a.total_appearances + excluded.total_appearances,
+        games = a.games + excluded.games,
+        updated_at = now();
+
+    -- 4. Rank the game among the best matches of its sponsors
+    perform refresh_season_top_matches(array(
+        select logo_name from season_game_contributions where game_id = p_game_id
+    ));
+end;
+$$;
+
+-- A deleted game no longer counts towards the season
+create or replace function remove_deleted_game_from_season_aggregates()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform remove_game_from_season_aggregates(old.id);
+    return old;
+end;
+$$;
+
+drop trigger if exists games_remove_from_season_aggregates on games;
+create trigger games_remove_from_season_aggregates
+    before delete on games
+    for each row
+    execute function remove_deleted_game_from_season_aggregates();
+
+-- Rank the contributions recorded before this migration
+select refresh_season_top_matches(array(select distinct logo_name from season_game_contributions));
@@ -0,0 +1,32 @@
+-- Read only live and recent jobs in processing_job_metrics.
+--
+-- The view used to aggregate (and sort, for the percentiles) the whole job
+-- history on every read of the admin dashboard. Every column only needs the
+-- queued, running and dead jobs plus those finished in the last 24 hours.
+
+create index if not exists processing_jobs_dead_idx
+    on processing_jobs (priority)
+    where status = 'dead';
+
+create or replace view processing_job_metrics as
+select
+    priority,
+    count(*) filter (where status = 'queued') as queued,
+    count(*) filter (where status = 'running') as running,
+    count(*) filter (where status = 'dead') as dead,
+    count(*) filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as succeeded_24h,
+    round((count(*) filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') / 24.0)::numeric, 2)
+        as jobs_per_hour,
+    avg(extract(epoch from first_started_at - created_at))
+        filter (where finished_at > now() - interval '24 hours') as avg_wait_seconds,
+    percentile_cont(0.95) within group (order by extract(epoch from first_started_at - created_at))
+        filter (where finished_at > now() - interval '24 hours') as p95_wait_seconds,
+    avg(extract(epoch from finished_at - created_at))
+        filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as avg_latency_seconds,
+    percentile_cont(0.95) within group (order by extract(epoch from finished_at - created_at))
+        filter (where status = 'succeeded' and finished_at > now() - interval '24 hours') as p95_latency_seconds
+from processing_jobs
+where status in ('queued', 'running')
+   or status = 'dead'
+   or finished_at > now() - interval '24 hours'
+group by priority;
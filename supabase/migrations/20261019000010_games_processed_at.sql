@@ -0,0 +1,13 @@
+-- Data version of a processed game.
+--
+-- The client caches a game's bundle and figures under a version derived from
+-- the game row. updated_at moves on every change, including the published_at
+-- update that follows the cache warm-up, so it would throw the warmed entries
+-- away before the first view. processed_at is only written by the processing
+-- run, when it saves the game's results.
+
+alter table games add column if not exists processed_at timestamptz;
+
+update games
+set processed_at = coalesce(updated_at, created_at, now())
+where status = 'processed' and processed_at is null;